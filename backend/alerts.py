@@ -0,0 +1,288 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+
+import requests
+from pydantic import BaseModel, Field
+
+# 임계값 알림
+# - 규칙은 로컬 JSON 파일(ALERT_RULES_PATH)에 저장, 파일이 바뀌면 다음 평가 때 다시 읽음
+# - publish 시점에 새로 들어온 행(세대 기록의 추가/변경 행)만 평가 -> 비용이 전체 이력 길이와 무관
+#     날짜 행(credit spread 등)은 마지막으로 평가한 날짜 이후 행만, 그 외(Market Pulse 종목 / Yield Gap 시장)는 바뀐 행 전부
+# - 조건이 거짓 -> 참으로 바뀔 때만 발송 (참이 계속되는 동안은 재발송 없음) + 같은 행에 대한 중복 발송 방지
+# - 발송: webhook (규칙별 또는 ALERT_WEBHOOK_URL, refresh를 실행한 인스턴스에서만) + SSE (/api/alerts/stream)
+
+ALERT_RULES_PATH = os.getenv("ALERT_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "alert_rules.json"))
+# 발송 상태 파일: 실행 중 만들어지는 파일이므로 소스 트리가 아닌 실행 데이터 디렉터리(HISTORY_DIR)에
+# (ALERT_STATE_PATH / HISTORY_DIR 둘 다 없거나 FIXTURE_MODE면 저장하지 않음 -> 재시작 시 상태 초기화)
+ALERT_STATE_PATH = os.getenv("ALERT_STATE_PATH") or (
+    os.path.join(os.environ["HISTORY_DIR"], "alert_state.json") if os.getenv("HISTORY_DIR") else None
+)
+if os.getenv("FIXTURE_MODE") == "1":
+    ALERT_STATE_PATH = None
+ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL")
+WEBHOOK_TIMEOUT = 5
+
+DATE_KEY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+OPERATORS = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+class AlertRule(BaseModel):
+    """
+    예) {"id": "credit-spread-1", "dataset": "credit_spread", "field": "spread", "op": ">", "value": 1.0}
+        {"id": "vix-30", "dataset": "market_pulse", "row": "^VIX", "field": "price", "op": ">", "value": 30}
+        {"id": "call-over-base", "dataset": "rate_spread", "field": "call_rate", "op": ">", "compare_field": "base_rate"}
+    """
+    id: str = Field(..., pattern=r"^[\w.\-]+$")
+    dataset: str
+    field: str
+    op: Literal[">", ">=", "<", "<="]
+    value: float | None = None               # 비교 기준값
+    compare_field: str | None = None         # 같은 행의 다른 필드와 비교 (value 대신)
+    row: str | None = None                   # 특정 행만 (Market Pulse 종목 / Yield Gap 시장)
+    name: str | None = None
+    webhook: str | None = None               # 없으면 ALERT_WEBHOOK_URL
+    enabled: bool = True
+
+    def threshold(self, row):
+        return row.get(self.compare_field) if self.compare_field else self.value
+
+    def check(self, row):
+        actual, threshold = row.get(self.field), self.threshold(row)
+        if not isinstance(actual, (int, float)) or not isinstance(threshold, (int, float)):
+            return None
+        return OPERATORS[self.op](actual, threshold)
+
+
+class AlertEngine:
+    def __init__(self, rules_path=ALERT_RULES_PATH, state_path=ALERT_STATE_PATH):
+        self.rules_path = rules_path
+        self.state_path = state_path
+        self.rules = {}             # id -> AlertRule
+        self.by_dataset = {}        # dataset -> [AlertRule]
+        self._rules_mtime = None
+        self.active = {}            # rule id -> 조건이 참인 행 키 집합
+        self.last_key = {}          # dataset -> 마지막으로 평가한 날짜 행 키
+        self.sent = deque(maxlen=5000)   # 발송한 알림 id (중복 방지)
+        self.recent = deque(maxlen=200)  # 최근 알림 (/api/alerts, SSE 재연결 시 재전송)
+        self._subscribers = set()        # (loop, asyncio.Queue)
+        self._lock = threading.RLock()
+        self._webhook_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="alert-webhook")
+        self._load_state()
+
+    # --- 규칙 ---
+
+    def _reload_rules(self):
+        """ 규칙 파일이 바뀌었으면 다시 읽음 """
+        try:
+            mtime = os.path.getmtime(self.rules_path)
+        except OSError:
+            mtime = None
+        if mtime == self._rules_mtime:
+            return
+        rules = {}
+        if mtime is not None:
+            try:
+                with open(self.rules_path) as f:
+                    for raw in json.load(f):
+                        rule = AlertRule(**raw)
+                        rules[rule.id] = rule
+            except Exception as e:
+                print(f"❌ [Alerts] 규칙 파일 오류 ({self.rules_path}): {e}")
+                return
+        self._set_rules(rules)
+        self._rules_mtime = mtime
+        print(f"🔔 [Alerts] {len(rules)} rules loaded")
+
+    def _set_rules(self, rules):
+        by_dataset = {}
+        for rule in rules.values():
+            if rule.enabled:
+                by_dataset.setdefault(rule.dataset, []).append(rule)
+        self.rules, self.by_dataset = rules, by_dataset
+
+    def _save_rules(self):
+        tmp = self.rules_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump([r.model_dump(exclude_none=True) for r in self.rules.values()], f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.rules_path)
+        self._rules_mtime = os.path.getmtime(self.rules_path)
+
+    def list_rules(self):
+        with self._lock:
+            self._reload_rules()
+            return [r.model_dump() for r in self.rules.values()]
+
+    def put_rule(self, rule):
+        with self._lock:
+            self._reload_rules()
+            self._set_rules({**self.rules, rule.id: rule})
+            self.active.pop(rule.id, None)
+            self._save_rules()
+
+    def delete_rule(self, rule_id):
+        with self._lock:
+            self._reload_rules()
+            if rule_id not in self.rules:
+                raise LookupError(f"알 수 없는 규칙: {rule_id}")
+            self._set_rules({k: v for k, v in self.rules.items() if k != rule_id})
+            self.active.pop(rule_id, None)
+            self._save_rules()
+
+    # --- 상태 (재시작 후 같은 알림 재발송 방지) ---
+
+    def _load_state(self):
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            self.active = {k: set(v) for k, v in state.get("active", {}).items()}
+            self.last_key = state.get("last_key", {})
+            self.sent.extend(state.get("sent", []))
+        except (OSError, ValueError):
+            pass
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        try:
+            tmp = self.state_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"active": {k: sorted(v) for k, v in self.active.items()},
+                           "last_key": self.last_key, "sent": list(self.sent)}, f)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            print(f"⚠️ [Alerts] 상태 저장 실패: {e}")
+
+    # --- 평가 ---
+
+    def _new_rows(self, dataset, upserts):
+        """ 이번 세대에서 평가할 행 [(행 키, 행)] """
+        rows = [(k, row) for k, row in upserts if isinstance(row, dict)]
+        dated = [(k, row) for k, row in rows if isinstance(k, str) and DATE_KEY.match(k)]
+        if not dated:
+            return rows
+        last = self.last_key.get(dataset)
+        dated.sort(key=lambda kv: kv[0])
+        self.last_key[dataset] = max(dated[-1][0], last or "")
+        if last is None:
+            # 처음 보는 데이터셋: 과거 이력 전체가 아니라 최신 행만으로 상태 초기화
+            return dated[-1:]
+        # 과거 날짜 수정치는 알림 대상 아님 (새로 추가된 관측치만)
+        return [(k, row) for k, row in dated if k > last]
+
+    def evaluate(self, dataset, upserts, deliver_webhooks=True):
+        """ 세대 기록의 추가/변경 행(upserts: [[행 키, 행], ...])에 대해 규칙 평가 -> 발송한 알림 목록 """
+        with self._lock:
+            self._reload_rules()
+            rules = self.by_dataset.get(dataset)
+            if not rules:
+                return []
+            fired = []
+            for key, row in self._new_rows(dataset, upserts):
+                for rule in rules:
+                    if rule.row is not None and rule.row != key:
+                        continue
+                    # 날짜 행은 규칙 단위, 종목 / 시장 행은 (규칙, 행) 단위로 상태 관리
+                    state_key = "*" if DATE_KEY.match(str(key)) else str(key)
+                    active = self.active.setdefault(rule.id, set())
+                    result = rule.check(row)
+                    if result is None:
+                        continue
+                    if not result:
+                        active.discard(state_key)
+                        continue
+                    if state_key in active:
+                        continue
+                    active.add(state_key)
+                    alert = self._alert(rule, dataset, key, row)
+                    if alert["id"] in self.sent:
+                        continue
+                    self.sent.append(alert["id"])
+                    # 발송 주소는 lock 안에서 확정 (발송 전에 규칙이 삭제될 수 있음)
+                    fired.append((alert, rule.webhook or ALERT_WEBHOOK_URL))
+            self._save_state()
+
+        for alert, url in fired:
+            self.recent.append(alert)
+            self._broadcast(alert)
+            if deliver_webhooks:
+                if url:
+                    self._webhook_pool.submit(self._post_webhook, url, alert)
+            print(f"🔔 [Alerts] {alert['message']}")
+        return [alert for alert, _ in fired]
+
+    def _alert(self, rule, dataset, key, row):
+        threshold = rule.threshold(row)
+        label = rule.compare_field or threshold
+        return {
+            "id": hashlib.sha1(f"{rule.id}|{dataset}|{key}|{row.get(rule.field)}".encode()).hexdigest()[:16],
+            "rule_id": rule.id,
+            "name": rule.name or rule.id,
+            "dataset": dataset,
+            "key": key,
+            "field": rule.field,
+            "value": row.get(rule.field),
+            "op": rule.op,
+            "threshold": threshold,
+            "message": f"{rule.name or rule.id}: {dataset}[{key}].{rule.field} = {row.get(rule.field)} {rule.op} {label}",
+            "at": time.time(),
+        }
+
+    # --- 발송 ---
+
+    def _post_webhook(self, url, alert):
+        for attempt in range(2):
+            try:
+                requests.post(url, json=alert, timeout=WEBHOOK_TIMEOUT).raise_for_status()
+                return
+            except requests.RequestException as e:
+                if attempt:
+                    print(f"❌ [Alerts] webhook 실패 ({alert['rule_id']}): {e}")
+
+    def subscribe(self):
+        """ SSE 구독 (이벤트 루프 안에서 호출) -> asyncio.Queue """
+        queue = asyncio.Queue(maxsize=100)
+        self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers = {(loop, q) for loop, q in self._subscribers if q is not queue}
+
+    def _broadcast(self, alert):
+        # refresh 스레드 -> 각 구독자의 이벤트 루프로 전달 (가득 찬 큐는 건너뜀)
+        for loop, queue in list(self._subscribers):
+            try:
+                loop.call_soon_threadsafe(_offer, queue, alert)
+            except RuntimeError:
+                self.unsubscribe(queue)
+
+    def since(self, alert_id):
+        """ SSE 재연결 (Last-Event-ID) 이후 알림 """
+        recent = list(self.recent)
+        ids = [a["id"] for a in recent]
+        return recent[ids.index(alert_id) + 1:] if alert_id in ids else []
+
+
+def _offer(queue, alert):
+    try:
+        queue.put_nowait(alert)
+    except asyncio.QueueFull:
+        pass
+
+
+ALERTS = AlertEngine()
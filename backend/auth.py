@@ -0,0 +1,18 @@
+import os
+import secrets
+
+from fastapi import Header, HTTPException
+
+# 관리자 전용 엔드포인트 인증 (/api/admin/*)
+# ADMIN_TOKEN 환경변수(fly secrets)가 없으면 관리자 엔드포인트 전체 비활성화
+# 요청: Authorization: Bearer <ADMIN_TOKEN>
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def require_admin(authorization: str | None = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="관리자 엔드포인트가 비활성화되어 있습니다 (ADMIN_TOKEN 미설정).")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="인증 실패", headers={"WWW-Authenticate": "Bearer"})
@@ -0,0 +1,245 @@
+"""
+장기 이력 backfill (서빙 프로세스 밖에서 실행)
+
+ECOS 15년 / FRED 2014년~ / Yahoo 5년 이력을 기간 단위 조각(chunk)으로 나눠 제공처별 동시 요청 수 안에서 병렬 조회하고
+앱이 시작할 때 읽는 디스크 저장소(SERIES_DIR/<key>.csv, series_service.load_series_dir)에 기록
+- 받은 조각은 SERIES_DIR/.backfill/<key>/ 에 바로 저장 -> 중단 후 다시 실행하면 남은 조각만 조회
+- 이미 저장된 시계열이 있으면 마지막 날짜 - INCREMENTAL_OVERLAP_DAYS 이후만 조회 (--force: 전체 다시)
+- 최근 RECENT_DAYS 안의 조각은 빈 응답도 성공 (당일 미공표 / 주말), MIN_CHUNK_DAYS보다 짧은 마지막 조각은 앞 조각에 합침
+- 실패한 조각이 있으면 종료 코드 1 (받은 조각까지는 저장, 다시 실행 시 이어서 조회)
+
+예)
+  SERIES_DIR=./series python backfill.py                               # refresh 그래프가 쓰는 장기 시계열 전체
+  python backfill.py --dir ./series --series fred:DGS2 yahoo:^NDX --start 2010-01-01
+  python backfill.py --dir ./series --force
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from urllib.parse import quote
+
+import pandas as pd
+
+from services import series_service, macro_service, bond_service, analysis_service
+
+# 제공처별 조각 크기(일) / 동시 요청 수 (provider_service Circuit Breaker가 열리지 않는 수준)
+CHUNK_DAYS = {"ecos": 365, "fred": 1826, "yahoo": 365}
+WORKERS = {"ecos": 4, "fred": 2, "yahoo": 2}
+MIN_CHUNK_DAYS = 30   # 마지막 조각이 이보다 짧으면 앞 조각에 합침 (오늘 / 어제만 남는 조각 방지)
+RECENT_DAYS = 7       # 전부 최근 이 기간 안인 조각은 빈 응답도 성공 (당일 미공표 / 주말, 행 없음)
+RETRIES = 3
+RETRY_BACKOFF = 2.0   # 재시도 대기(초, 시도마다 2배)
+ECOS_CHUNK_LIMIT = 1000
+
+
+def default_targets():
+    """ refresh 그래프의 장기 raw 노드와 같은 시계열 / 시작일 -> {key: 시작일} """
+    from scheduler import FRED_SERIES, YAHOO_PERIOD_DAYS, _spec_start
+
+    now = analysis_service.kst_now()
+    today = pd.Timestamp(now.date())
+    targets = {
+        f"ecos:817Y002/{item}": pd.Timestamp(bond_service.CREDIT_SPREAD_START)
+        for item, _, _ in bond_service.CREDIT_CURVE_ITEMS.values()
+    }
+    targets.update({
+        "ecos:817Y002/010210000": today - timedelta(days=1825),
+        "ecos:722Y001/0101000": today - timedelta(days=analysis_service.RATE_SPREAD_DAYS),
+        "ecos:817Y002/010101000": today - timedelta(days=analysis_service.RATE_SPREAD_DAYS),
+    })
+    for series_id, spec in FRED_SERIES.items():
+        targets[f"fred:{series_id}"] = _spec_start(spec, now)
+    for ticker in analysis_service.RISK_TICKERS.values():
+        targets[f"yahoo:{ticker}"] = today - timedelta(days=YAHOO_PERIOD_DAYS["5y"])
+    return targets
+
+
+def fetch_chunk(key, start, end, allow_empty=False):
+    """
+    시계열 1조각 조회 -> Series (저장소 기록 없이, 실패 시 예외)
+    allow_empty: 빈 응답을 행 없는 성공으로 처리 (아직 공표 전인 최근 구간)
+    """
+    source, ident = series_service.parse_series_key(key)
+    if source == "ecos":
+        stat_code, _, item_code = ident.partition("/")
+        series = series_service.fetch_ecos(stat_code, item_code, start.strftime("%Y%m%d"), end.strftime("%Y%m%d"),
+                                           limit=ECOS_CHUNK_LIMIT, store=False)
+    elif source == "fred":
+        df = macro_service.fetch_fred_csv([ident], start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+        series = df[ident].dropna()
+    else:
+        # yfinance end는 해당 날짜 미포함
+        series = series_service.fetch_yahoo(ident, start=start.date(), end=(end + timedelta(days=1)).date(), store=False)
+    if series.empty and not allow_empty:
+        # ECOS / Yahoo 조회 함수는 실패 시 빈 Series -> 다음 실행 때 다시 조회
+        raise ValueError("빈 응답")
+    return series
+
+
+def plan_chunks(source, start, end):
+    """ [start, end] -> 제공처별 크기의 [(조각 시작, 조각 끝)] (MIN_CHUNK_DAYS보다 짧은 마지막 조각은 앞 조각에 합침) """
+    step = timedelta(days=CHUNK_DAYS[source])
+    chunks = []
+    while start <= end:
+        chunk_end = min(start + step - timedelta(days=1), end)
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    if len(chunks) > 1 and (chunks[-1][1] - chunks[-1][0]).days + 1 < MIN_CHUNK_DAYS:
+        # 예: 1825일 / 365일 조각 -> [오늘, 오늘]만 남으면 당일 미공표 / 주말이라 항상 빈 응답
+        last = chunks.pop()
+        chunks[-1] = (chunks[-1][0], last[1])
+    return chunks
+
+
+class Backfill:
+    def __init__(self, directory, targets, force=False):
+        self.directory = directory
+        self.targets = targets          # key -> 시작일
+        self.force = force
+        self.chunk_root = os.path.join(directory, ".backfill")
+        self.today = pd.Timestamp(analysis_service.kst_now().date())
+
+    def _chunk_dir(self, key):
+        return os.path.join(self.chunk_root, quote(key, safe=""))
+
+    def _chunk_path(self, key, start, end):
+        return os.path.join(self._chunk_dir(key), f"{start:%Y%m%d}_{end:%Y%m%d}.csv")
+
+    def _existing(self, key):
+        path = series_service.series_path(key, self.directory)
+        return series_service.read_series(path) if os.path.exists(path) else None
+
+    def plan(self, key, start):
+        """ 조회할 조각 목록 (이미 받은 조각 제외) """
+        # 조각 폴더가 남아 있으면 이전 실행이 중단된 것 -> 저장된 이력과 관계없이 전체 구간에서 남은 조각만
+        resuming = os.path.isdir(self._chunk_dir(key))
+        existing = None if self.force or resuming else self._existing(key)
+        if existing is not None and not existing.empty \
+                and existing.index.min() <= start + timedelta(days=series_service.COVERAGE_SLACK_DAYS):
+            # 저장된 이력 이후만 (겹치는 구간은 수정치 반영용)
+            start = max(start, existing.index.max() - timedelta(days=series_service.INCREMENTAL_OVERLAP_DAYS))
+        source, _ = series_service.parse_series_key(key)
+        return [(s, e) for s, e in plan_chunks(source, start, self.today)
+                if not os.path.exists(self._chunk_path(key, s, e))]
+
+    def _run_chunk(self, key, start, end):
+        for attempt in range(RETRIES):
+            try:
+                series = fetch_chunk(key, start, end, allow_empty=start >= self.today - timedelta(days=RECENT_DAYS))
+                os.makedirs(self._chunk_dir(key), exist_ok=True)
+                series_service.write_series(self._chunk_path(key, start, end), series)
+                return len(series)
+            except Exception as e:
+                if attempt == RETRIES - 1:
+                    raise
+                print(f"   ↻ {key} {start:%Y-%m-%d}~{end:%Y-%m-%d} 재시도 ({e})")
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    def assemble(self, key, start, write=True):
+        """
+        저장된 시계열 + 받은 조각 -> SERIES_DIR/<key>.csv (모든 조각 성공 시 조각 삭제)
+        write=False: 실패한 조각이 있으면 파일을 쓰지 않음 (중간이 빈 이력은 incremental 조회가 메우지 못함 -> 조각만 남겨 다음 실행에서 이어받음)
+        """
+        parts = [] if self.force else [self._existing(key)]
+        chunk_dir = self._chunk_dir(key)
+        if os.path.isdir(chunk_dir):
+            # 파일명(조각 시작일) 순 -> 겹치는 날짜는 나중 조각 값
+            parts += [series_service.read_series(os.path.join(chunk_dir, name)) for name in sorted(os.listdir(chunk_dir))
+                      if name.endswith(".csv")]
+        parts = [p for p in parts if p is not None and not p.empty]
+        if not parts:
+            return None
+        series = pd.concat(parts)
+        series = series[~series.index.duplicated(keep="last")].sort_index().loc[start:]
+        if write:
+            series_service.save_series(key, series, self.directory)
+        return series
+
+    def run(self):
+        """ 전체 조각 병렬 조회 -> {key: {"chunks", "failed", "rows", "first", "last"}} """
+        plans = {key: self.plan(key, start) for key, start in self.targets.items()}
+        total = sum(len(chunks) for chunks in plans.values())
+        print(f"📦 [Backfill] {len(plans)} series / {total} chunks -> {self.directory}")
+
+        pools = {source: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"backfill-{source}")
+                 for source, n in WORKERS.items()}
+        futures = {}
+        for key, chunks in plans.items():
+            source, _ = series_service.parse_series_key(key)
+            for start, end in chunks:
+                futures[pools[source].submit(self._run_chunk, key, start, end)] = (key, start, end)
+
+        failed = {key: [] for key in plans}
+        done = 0
+        for future in as_completed(futures):
+            key, start, end = futures[future]
+            done += 1
+            try:
+                rows = future.result()
+                print(f"   [{done}/{total}] {key} {start:%Y-%m-%d}~{end:%Y-%m-%d}: {rows} rows")
+            except Exception as e:
+                failed[key].append(f"{start:%Y-%m-%d}~{end:%Y-%m-%d}")
+                print(f"   [{done}/{total}] ❌ {key} {start:%Y-%m-%d}~{end:%Y-%m-%d}: {e}")
+        for pool in pools.values():
+            pool.shutdown()
+
+        report = {}
+        for key, start in self.targets.items():
+            series = self.assemble(key, start, write=not failed[key])
+            if not failed[key]:
+                shutil.rmtree(self._chunk_dir(key), ignore_errors=True)
+            report[key] = {
+                "written": not failed[key] and series is not None,
+                "chunks": len(plans[key]),
+                "failed": failed[key],
+                "rows": 0 if series is None else len(series),
+                "first": None if series is None else f"{series.index.min():%Y-%m-%d}",
+                "last": None if series is None else f"{series.index.max():%Y-%m-%d}",
+            }
+        return report
+
+
+def parse_target(text, default_start):
+    """ "fred:DGS2" 또는 "fred:DGS2@2010-01-01" -> (key, 시작일) """
+    key, _, start = text.partition("@")
+    source, ident = series_service.parse_series_key(key)
+    return f"{source}:{ident}", pd.Timestamp(start) if start else default_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market Radar 장기 이력 backfill")
+    parser.add_argument("--dir", default=series_service.SERIES_DIR, help="저장 위치 (기본: SERIES_DIR)")
+    parser.add_argument("--series", nargs="+", help="대상 시계열 <ecos|fred|yahoo>:<id>[@시작일] (생략 시 refresh 그래프의 장기 시계열)")
+    parser.add_argument("--start", help="--series의 기본 시작일 (기본: 10년 전)")
+    parser.add_argument("--force", action="store_true", help="저장된 이력 / 받은 조각 무시하고 전체 다시 조회")
+    args = parser.parse_args()
+
+    if not args.dir:
+        parser.error("--dir 또는 SERIES_DIR 환경변수가 필요합니다.")
+    if args.series:
+        default_start = pd.Timestamp(args.start) if args.start else pd.Timestamp.today().normalize() - timedelta(days=3650)
+        try:
+            targets = dict(parse_target(t, default_start) for t in args.series)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        targets = default_targets()
+
+    backfill = Backfill(args.dir, targets, force=args.force)
+    if args.force:
+        shutil.rmtree(backfill.chunk_root, ignore_errors=True)
+    report = backfill.run()
+
+    print()
+    for key, r in report.items():
+        status = f"❌ {len(r['failed'])} chunks failed (not written, rerun to resume)" if r["failed"] else "OK"
+        print(f"{key:<28}{r['rows']:>7} rows  {r['first'] or '-'} ~ {r['last'] or '-'}  {status}")
+    return 1 if any(r["failed"] for r in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+import scheduler
+from watchlists import WATCHLISTS
+from services import stock_service, macro_service, bond_service, analysis_service, correlation_service, indicator_service, breadth_service
+
+# 외부 API 없이 DATA_STORE를 채우는 합성 데이터 (부하 테스트 / 프로파일링 / 로컬 개발용)
+# 실제 서비스의 build_* 함수를 그대로 거치므로 응답 크기와 계산 경로가 운영과 같음
+#   - credit spread / 신용 곡선 15년, rate spread 10년, risk ratio 5년, pulse 8종목 x 3개월 (상관계수용 2년)
+#   - KOSPI breadth 900종목 x 280 거래일
+#   - 설정 파일로 선언한 지표(indicators.json)의 입력 시계열은 주기별 10년치
+
+
+def _walk(rng, index, start, scale, floor=None):
+    values = start + np.cumsum(rng.normal(0, scale, len(index)))
+    if floor is not None:
+        values = np.maximum(values, floor)
+    return pd.Series(values, index=index)
+
+
+def build_fixture_series(seed=0, end=None):
+    """ 합성 원천 시계열 (refresh 그래프 raw 노드와 같은 이름) """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.today().normalize())
+    business = pd.bdate_range(end=end, periods=int(15 * 261))
+    daily = pd.date_range(end=end, periods=3700)
+    monthly = pd.date_range(end=end, periods=150, freq="MS")
+
+    gov = _walk(rng, business, 3.0, 0.03, floor=0.5)
+    corp = gov + _walk(rng, business, 0.8, 0.01, floor=0.2)
+    series = {
+        "yahoo:pulse": pd.DataFrame(
+            {t: _walk(rng, business[-63:], 100.0, 1.0, floor=1.0) for t in stock_service.TICKERS}
+        ),
+        "yahoo:GC=F": _walk(rng, business[-1260:], 1800.0, 15.0, floor=100.0),
+        "yahoo:SI=F": _walk(rng, business[-1260:], 23.0, 0.3, floor=1.0),
+        "yahoo:^GSPC": _walk(rng, business[-1260:], 4000.0, 30.0, floor=100.0),
+        "yahoo:^TNX": _walk(rng, business[-5:], 4.2, 0.03),
+        "yahoo:SPY/PE": 24.0,
+        "krx:1001/PER": _walk(rng, business[-1230:], 11.0, 0.05, floor=5.0),
+        "ecos:817Y002/010210000": _walk(rng, business[-1230:], 3.2, 0.02, floor=0.5),
+        f"ecos:817Y002/{bond_service.GOV_3Y_ITEM}": gov,
+        f"ecos:817Y002/{bond_service.CORP_3Y_ITEM}": corp,
+        f"ecos:817Y002/{bond_service.CORP_BBB_3Y_ITEM}": corp + _walk(rng, business, 6.0, 0.02, floor=3.0),
+        f"ecos:817Y002/{bond_service.CREDIT_CURVE_ITEMS['ktb_1y'][0]}": gov + _walk(rng, business, -0.3, 0.01),
+        f"ecos:817Y002/{bond_service.CREDIT_CURVE_ITEMS['ktb_5y'][0]}": gov + _walk(rng, business, 0.2, 0.01),
+        "ecos:722Y001/0101000": _walk(rng, daily, 3.0, 0.01, floor=0.5).round(2),
+        "ecos:817Y002/010101000": _walk(rng, business[-2500:], 3.0, 0.02, floor=0.4),
+        "fred:DGS10": _walk(rng, business[-1260:], 3.5, 0.04, floor=0.5),
+        "fred:CPIAUCSL": pd.Series(250 * np.cumprod(1 + rng.normal(0.002, 0.002, len(monthly))), index=monthly),
+        "fred:UNRATE": _walk(rng, monthly, 4.0, 0.1, floor=3.0),
+        "fred:DFEDTARU": _walk(rng, daily, 4.0, 0.01, floor=0.25).round(2),
+        "fred:DFF": _walk(rng, daily, 3.9, 0.01, floor=0.05),
+        "krx:breadth": build_fixture_breadth(rng, business[-280:]),
+    }
+    # 상관계수용 2년 종가: 3개월 종가 앞으로 이어지는 경로
+    pulse = series["yahoo:pulse"]
+    older = {t: _walk(rng, business[-520:-62], 0.0, 1.0) for t in pulse}
+    series["yahoo:pulse/history"] = pd.DataFrame({
+        t: pd.concat([(s - s.iloc[-1] + pulse[t].iloc[0]).clip(lower=1.0).iloc[:-1], pulse[t]]) for t, s in older.items()
+    })
+    cycles = {"D": business[-2610:], "M": monthly[-130:], "Q": pd.date_range(end=end, periods=44, freq="QS"),
+              "A": pd.date_range(end=end, periods=11, freq="YS")}
+    for indicator in scheduler.INDICATORS:
+        for name in indicator.nodes():
+            if name not in series:
+                series[name] = _walk(rng, cycles[indicator.cycle], 100.0, 0.5, floor=1.0)
+    return series
+
+
+def build_fixture_breadth(rng, days, tickers=900):
+    """ 합성 전 종목 일별 종가 -> breadth 행 목록 (refresh 그래프 "krx:breadth" 노드 값) """
+    store = breadth_service.BreadthStore()
+    names = pd.Index([f"{i:06d}" for i in range(tickers)])
+    closes = 10000 * np.exp(np.cumsum(rng.normal(0.0002, 0.02, (len(days), tickers)), axis=0))
+    changes = np.vstack([np.zeros(tickers), (closes[1:] / closes[:-1] - 1) * 100])
+    for date, close, change in zip(days, closes, changes):
+        store.append(date, pd.Series(close, index=names), pd.Series(change, index=names))
+    return store.rows
+
+
+def build_fixture_store(seed=0, end=None):
+    """ 합성 원천 시계열 -> DATA_STORE와 같은 구조의 결과 """
+    s = build_fixture_series(seed, end)
+    return {
+        "market_pulse": stock_service.build_market_pulse(s["yahoo:pulse"]),
+        "cpi": macro_service.build_macro_data(s["fred:CPIAUCSL"], "CPIAUCSL", "US CPI (Consumer Price Index)"),
+        "unrate": macro_service.build_macro_data(s["fred:UNRATE"], "UNRATE", "US Unemployment Rate"),
+        "risk_ratio": analysis_service.build_risk_ratio(s["yahoo:GC=F"], s["yahoo:SI=F"], s["yahoo:^GSPC"]),
+        "credit_spread": bond_service.build_credit_spread(
+            s[f"ecos:817Y002/{bond_service.GOV_3Y_ITEM}"], s[f"ecos:817Y002/{bond_service.CORP_3Y_ITEM}"]
+        ),
+        "credit_curve": bond_service.build_credit_curve(pd.DataFrame({
+            item: s[f"ecos:817Y002/{item}"] for item, _, _ in bond_service.CREDIT_CURVE_ITEMS.values()
+        })),
+        "yield_gap": analysis_service.build_yield_gap(
+            s["yahoo:SPY/PE"], s["yahoo:^TNX"], s["fred:DGS10"], s["krx:1001/PER"], s["ecos:817Y002/010210000"]
+        ),
+        "rate_spread": analysis_service.build_rate_spread(s["ecos:722Y001/0101000"], s["ecos:817Y002/010101000"]),
+        "us_rate_spread": analysis_service.build_us_rate_spread(s["fred:DFEDTARU"], s["fred:DFF"]),
+        "correlation": correlation_service.build_correlation(
+            s["yahoo:pulse"], s["yahoo:pulse/history"], s["yahoo:GC=F"], s["yahoo:SI=F"], s["yahoo:^GSPC"]
+        ),
+        "kospi_breadth": breadth_service.build_kospi_breadth(s["krx:breadth"]),
+        **{
+            indicator.key: indicator_service.build_indicator(indicator, *(s[name] for name in indicator.nodes()))
+            for indicator in scheduler.INDICATORS
+        },
+    }
+
+
+def fixture_raw_values(seed=0):
+    """ 합성 원천 시계열 -> refresh 그래프 raw 노드 값 (FRED는 일괄 조회 노드 하나로 묶음) """
+    series = build_fixture_series(seed)
+    fred = {k.split(":", 1)[1]: series.pop(k) for k in [k for k in series if k.startswith("fred:")]}
+    series["fred:bulk"] = pd.DataFrame(fred)
+    return series
+
+
+def record_raw_nodes(graph, path):
+    """ 실제 refresh 후 raw 노드 값을 파일로 기록 (오프라인 재현 / 프로파일링용) """
+    values = {name: node.value for name, node in graph.nodes.items() if node.kind == "raw" and node.value is not None}
+    with open(path, "wb") as f:
+        pickle.dump(values, f)
+    print(f"💾 [Fixtures] {len(values)} raw nodes recorded -> {path}")
+
+
+def load_raw_nodes(path):
+    # 직접 기록한 파일만 사용 (pickle)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def offline_graph(path=None, seed=0):
+    """
+    외부 API 대신 기록된 값(path) 또는 합성 값을 반환하는 raw 노드로 새 refresh 그래프 구성
+    derived 노드는 운영 그래프와 같은 함수 (DATA_STORE에는 반영하지 않음)
+    """
+    values = load_raw_nodes(path) if path else fixture_raw_values(seed)
+    graph = scheduler.build_refresh_graph()
+    for name, node in graph.nodes.items():
+        if node.kind == "raw":
+            value = values.get(name)
+            if value is None and hasattr(node.func, "columns"):
+                # ECOS 통계표 일괄 조회 노드 -> 항목별 값을 열로 묶음
+                value = pd.DataFrame({col: values[key] for col, key in node.func.columns.items() if key in values})
+            node.func = lambda value=value: value
+    return graph
+
+
+def load_fixture_store(seed=0):
+    """ 합성 데이터로 DATA_STORE 채우기 """
+    for key, value in build_fixture_store(seed).items():
+        scheduler.publish(key, value)
+    prime_symbol_cache(seed)
+
+
+def prime_symbol_cache(seed=0):
+    """ 관심 목록 조회(/api/market/pulse?watchlist=...)용 종목별 종가 캐시를 합성 3개월 종가로 채움 """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=63)
+    now = time.time()
+    for symbol in list(stock_service.TICKERS) + WATCHLISTS.symbols():
+        stock_service.cache_closes(symbol, _walk(rng, index, 100.0, 1.0, floor=1.0), now)
+
+
+def simulate_refresh(seed):
+    """
+    네트워크 없이 refresh 1회 흉내 (합성 원천 생성 -> build_* 계산 -> DATA_STORE 반영)
+    부하 테스트 중 refresh와 요청 처리가 겹치는 상황 재현용
+    """
+    load_fixture_store(seed)
@@ -0,0 +1,121 @@
+import os
+import time
+from datetime import datetime
+
+import responses
+import scheduler
+from history import KST
+from loop_monitor import LOOP_MONITOR
+
+# 상태 점검 (/healthz, /readyz)
+# - /readyz: 필수 데이터셋(READY_KEYS)이 모두 메모리에 있을 때만 200 -> Fly가 준비된 인스턴스에만 요청 전달
+#   (Mock Data도 응답은 가능하므로 준비된 것으로 봄, 대체가 없는 데이터셋은 기본적으로 준비 여부에 포함하지 않음)
+# - /healthz: 데이터셋별 마지막 성공 시각 / 경과 시간 / 조회 소요 시간 / Mock Data 여부 / 지연 여부 (항상 200)
+#   + 이벤트 루프 지연 (loop_monitor.py)
+#   원천 노드가 max(ttl, refresh 주기) x STALE_FACTOR 동안 성공하지 못하면 해당 데이터셋은 stale
+
+STARTED_AT = time.time()
+STALE_FACTOR = float(os.getenv("STALE_FACTOR", "2"))
+# 기본값: Mock Data 대체가 있는 기존 데이터셋 (제공처 장애여도 첫 refresh 후 항상 채워짐)
+# 그 외 데이터셋(correlation / kospi_breadth / credit_curve / 선언한 지표)은 대체가 없어
+# 제공처 장애 시 계속 비어 있을 수 있음 -> 필요하면 READY_KEYS에 직접 추가
+DEFAULT_READY_KEYS = ["market_pulse", "cpi", "unrate", "risk_ratio", "credit_spread", "yield_gap", "rate_spread", "us_rate_spread"]
+READY_KEYS = [k.strip() for k in os.getenv("READY_KEYS", ",".join(DEFAULT_READY_KEYS)).split(",") if k.strip()]
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, KST).isoformat(timespec="seconds") if ts else None
+
+
+def _upstream_raw(graph, name):
+    """ 노드가 의존하는 raw 노드 이름 (전이적) """
+    seen, stack, raw = set(), [name], []
+    while stack:
+        node = graph.nodes[stack.pop()]
+        for dep in node.deps:
+            if dep in seen:
+                continue
+            seen.add(dep)
+            if graph.nodes[dep].kind == "raw":
+                raw.append(dep)
+            else:
+                stack.append(dep)
+    return raw
+
+
+def dataset_health(now=None):
+    """ 데이터셋별 신선도 -> {key: {...}} """
+    now = now or time.time()
+    graph = scheduler.REFRESH_GRAPH
+    nodes = {node.publish: node for node in graph.nodes.values() if node.publish}
+    refresh_seconds = scheduler.REFRESH_MINUTES * 60
+    report = {}
+    for key in scheduler.DATA_STORE:
+        published = scheduler.PUBLISHED_AT.get(key)
+        entry = {
+            "warm": key in scheduler.SNAPSHOTS,
+            "version": scheduler.DATA_VERSION.get(key, 0),
+            "published_at": _iso(published),
+        }
+        node = nodes.get(key)
+        if node is None or node.last_success is None:
+            # refresh를 실행하지 않는 인스턴스 (FIXTURE_MODE / 공유 저장소 follower): 반영 시각 기준
+            entry.update({
+                "last_success": _iso(published),
+                "age_seconds": round(now - published, 1) if published else None,
+                "fetch_ms": None,
+                "fallback": None,
+                "stale": None,
+            })
+            report[key] = entry
+            continue
+
+        raw = [graph.nodes[name] for name in _upstream_raw(graph, node.name)]
+        # 가장 오래전에 성공한 원천 기준 (하나라도 계속 실패하면 결과가 그만큼 오래됨)
+        oldest = min((r.last_success or 0 for r in raw), default=node.last_success)
+        stale = [
+            r.name for r in raw
+            if r.last_success is None or now - r.last_success > max(r.ttl, refresh_seconds) * STALE_FACTOR
+        ]
+        entry.update({
+            "last_success": _iso(oldest or None),
+            "age_seconds": round(now - oldest, 1) if oldest else None,
+            # 원천은 병렬 조회 -> 가장 느린 원천 + 계산 시간
+            "fetch_ms": max((r.stats["duration_ms"] or 0 for r in raw), default=0),
+            "build_ms": node.stats["duration_ms"],
+            "status": node.stats["status"],
+            "fallback": node.fallback,
+            "stale": bool(stale),
+            "stale_sources": stale,
+        })
+        report[key] = entry
+    return report
+
+
+def missing_keys():
+    return [key for key in READY_KEYS if key not in scheduler.SNAPSHOTS]
+
+
+def readiness():
+    """ -> (준비 여부, 응답 본문) (필수 데이터셋 snapshot 존재 여부만 확인, 요청마다 호출되어도 가벼움) """
+    missing = missing_keys()
+    return not missing, {"ready": not missing, "missing": missing, "uptime_seconds": round(time.time() - STARTED_AT, 1)}
+
+
+def health():
+    """ 전체 상태: starting (필수 데이터셋 미적재) / degraded (Mock Data 또는 stale) / ok """
+    datasets = dataset_health()
+    missing = missing_keys()
+    fallback = [key for key, d in datasets.items() if d["fallback"]]
+    stale = [key for key, d in datasets.items() if d["stale"]]
+    status = "starting" if missing else ("degraded" if fallback or stale else "ok")
+    return {
+        "status": status,
+        "uptime_seconds": round(time.time() - STARTED_AT, 1),
+        "missing": missing,
+        "fallback": fallback,
+        "stale": stale,
+        # 이벤트 루프 지연 + 스레드풀로 넘긴 큰 응답 직렬화 수
+        "event_loop": {**LOOP_MONITOR.stats(), "offloaded": dict(responses.OFFLOAD_STATS)},
+        "datasets": datasets,
+    }
@@ -0,0 +1,374 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, time as dt_time, timedelta
+from zoneinfo import ZoneInfo
+
+from services import memory_service
+
+# 데이터셋 세대(generation) 기록 -> 과거 시점(as_of) 조회
+# - publish(또는 공유 저장소 sync)마다 1세대 추가 (버전, 시각)
+# - 세대는 행 참조 목록만 가짐: 이전 세대와 같은 행은 같은 객체를 공유, 바뀐 행만 새로 보관 (structural sharing)
+# - HISTORY_DIR 지정 시 데이터셋별 append-only 로그(NDJSON, 바뀐 행만)에 기록 -> 재시작 시 다시 읽음
+# - compaction: HISTORY_FULL_DAYS보다 오래된 세대는 하루 1개(그날 마지막)만, HISTORY_RETENTION_DAYS 이후는 삭제
+# - as_of 조회는 세대 시각 목록 이분 탐색 (O(log n))
+# - HISTORY_EXCLUDE 데이터셋은 마지막 세대만 유지 (Market Pulse 스파크라인 / 상관계수 rolling 배열처럼 refresh마다 거의 모든 행이 바뀌어
+#   행 공유 효과가 없음, 알림 평가용 변경분 계산과 재시작 후 버전 연속에는 마지막 세대만 필요)
+# - 데이터셋별 보관 바이트(세대마다 새로 보관한 행 크기 합계)가 HISTORY_MAX_MB를 넘으면 오래된 세대부터 제거
+
+KST = ZoneInfo("Asia/Seoul")
+
+HISTORY_DIR = os.getenv("HISTORY_DIR")
+HISTORY_FULL_DAYS = float(os.getenv("HISTORY_FULL_DAYS", "7"))
+HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", "365"))
+HISTORY_EXCLUDE = {k.strip() for k in os.getenv("HISTORY_EXCLUDE", "market_pulse,correlation").split(",") if k.strip()}
+HISTORY_MAX_MB = float(os.getenv("HISTORY_MAX_MB", "8"))    # 데이터셋별 (512MB VM, 데이터셋 약 25개)
+
+
+class Generation:
+    __slots__ = ("version", "at", "shape", "meta", "keys", "rows", "upserts", "deletes", "nbytes")
+
+    def __init__(self, version, at, shape, meta, keys, rows, upserts, deletes, nbytes=0):
+        self.version = version
+        self.at = at
+        self.shape = shape        # "list" | "data" ({..., "data": [...]}) | "map" ({"us": {...}, ...})
+        self.meta = meta          # "data" 형태의 data 외 필드 (title 등)
+        self.keys = keys          # 행 식별자 (date / ticker / 시장 / 위치)
+        self.rows = rows          # 행 객체 (이전 세대와 공유)
+        self.upserts = upserts    # 이전 세대 대비 추가/변경된 행 수
+        self.deletes = deletes    # 이전 세대 대비 삭제된 행 수
+        self.nbytes = nbytes      # 이 세대가 새로 보관한 행 크기 (이전 세대와 공유하는 행 제외)
+
+    def value(self):
+        """ 이 세대의 데이터셋 값 (DATA_STORE와 같은 구조) """
+        if self.shape == "map":
+            return dict(zip(self.keys, self.rows))
+        if self.shape == "data":
+            return {**self.meta, "data": list(self.rows)}
+        return list(self.rows)
+
+    def summary(self):
+        return {"version": self.version, "at": self.at, "rows": len(self.rows),
+                "upserts": self.upserts, "deletes": self.deletes}
+
+
+def _split(value):
+    """ 데이터셋 값 -> (형태, 메타데이터, 행 식별자, 행) """
+    if isinstance(value, dict) and isinstance(value.get("data"), list):
+        shape, meta, rows = "data", {k: v for k, v in value.items() if k != "data"}, value["data"]
+    elif isinstance(value, dict):
+        return "map", {}, tuple(value.keys()), tuple(value.values())
+    else:
+        shape, meta, rows = "list", {}, list(value)
+
+    keys = tuple(
+        row.get("date") or row.get("ticker") if isinstance(row, dict) else None
+        for row in rows
+    )
+    if None in keys or len(set(keys)) != len(keys):
+        # 식별 필드가 없거나 중복되면 위치로 구분
+        keys = tuple(range(len(rows)))
+    return shape, meta, keys, tuple(rows)
+
+
+def _rows_bytes(rows):
+    return sum(memory_service.deep_sizeof(row) for row in rows)
+
+
+class DatasetHistory:
+    def __init__(self, key, latest_only=False, max_bytes=None):
+        self.key = key
+        self.generations = []
+        self.times = []           # generations[i].at (이분 탐색용)
+        self.latest_only = latest_only
+        self.max_bytes = max_bytes
+        self.nbytes = 0           # 보관 중인 행 크기 합계 (세대별 nbytes 합)
+        self.trimmed = 0          # 크기 제한 / latest_only로 제거한 세대 수
+        self._lock = threading.Lock()
+
+    def _build(self, version, at, shape, meta, keys, rows):
+        """
+        이전 세대와 비교해 같은 행은 이전 객체를 재사용한 새 세대 + 로그 항목(바뀐 행만)
+        """
+        previous = self.generations[-1] if self.generations else None
+        previous_rows = dict(zip(previous.keys, previous.rows)) if previous else {}
+        shared, upserts = [], []
+        for k, row in zip(keys, rows):
+            old = previous_rows.get(k)
+            if old is not None and old == row:
+                shared.append(old)
+            else:
+                shared.append(row)
+                upserts.append([k, row])
+        key_set = set(keys)
+        deletes = [k for k in previous_rows if k not in key_set]
+
+        entry = {"v": version, "at": at, "shape": shape, "meta": meta, "upserts": upserts, "deletes": deletes}
+        # 이전 순서에서 삭제분을 빼고 추가분을 뒤에 붙인 것과 다르면 전체 순서 기록
+        expected = [k for k in previous_rows if k in key_set]
+        expected += [k for k, _ in upserts if k not in previous_rows]
+        if tuple(expected) != keys:
+            entry["order"] = list(keys)
+
+        nbytes = _rows_bytes(row for _, row in upserts)
+        generation = Generation(version, at, shape, meta, keys, tuple(shared), len(upserts), len(deletes), nbytes)
+        return generation, entry
+
+    def append(self, version, value, at=None):
+        """ 새 세대 추가 -> 로그 항목 """
+        shape, meta, keys, rows = _split(value)
+        with self._lock:
+            generation, entry = self._build(version, at or time.time(), shape, meta, keys, rows)
+            self._push(generation)
+        return entry
+
+    def _push(self, generation):
+        self.generations.append(generation)
+        self.times.append(generation.at)
+        self.nbytes += generation.nbytes
+        self._trim()
+
+    def _trim(self):
+        """ latest_only면 마지막 세대만, 아니면 보관 바이트가 max_bytes 이하가 될 때까지 오래된 세대 제거 (마지막 세대는 유지) """
+        while len(self.generations) > 1 and (self.latest_only or (self.max_bytes and self.nbytes > self.max_bytes)):
+            self.nbytes -= self.generations.pop(0).nbytes
+            self.times.pop(0)
+            self.trimmed += 1
+            # 새 첫 세대는 공유하던 이전 세대가 없으므로 모든 행을 보관하는 것으로 계산
+            first = self.generations[0]
+            full = _rows_bytes(first.rows)
+            self.nbytes += full - first.nbytes
+            first.nbytes = full
+
+    def _recount(self):
+        """ 중간 세대를 제거한 뒤 세대별 nbytes 다시 계산 (이전 세대와 같은 객체인 행 제외) """
+        previous, total = (), 0
+        for g in self.generations:
+            shared = {id(row) for row in previous}
+            g.nbytes = _rows_bytes(row for row in g.rows if id(row) not in shared)
+            total += g.nbytes
+            previous = g.rows
+        self.nbytes = total
+
+    def at(self, timestamp):
+        """ timestamp 시점에 보이던 세대 (그 이전 기록이 없으면 None) """
+        with self._lock:
+            i = bisect_right(self.times, timestamp)
+            return self.generations[i - 1] if i else None
+
+    # --- 로그 ---
+
+    def replay(self, entry):
+        """ 로그 1줄 적용 (이전 세대 + 변경분 -> 새 세대) """
+        previous = self.generations[-1] if self.generations else None
+        rows = dict(zip(previous.keys, previous.rows)) if previous else {}
+        for k in entry["deletes"]:
+            rows.pop(k, None)
+        upserts = entry["upserts"]
+        for k, row in upserts:
+            rows[k] = row
+        keys = tuple(entry.get("order") or rows.keys())
+        generation = Generation(entry["v"], entry["at"], entry["shape"], entry["meta"],
+                                keys, tuple(rows[k] for k in keys), len(upserts), len(entry["deletes"]),
+                                _rows_bytes(row for _, row in upserts))
+        self._push(generation)
+
+    def compact(self, now=None):
+        """ 오래된 세대 정리 -> 남은 세대 목록으로 교체, 제거된 세대 수 반환 """
+        now = now or time.time()
+        full_after = now - HISTORY_FULL_DAYS * 86400
+        drop_before = now - HISTORY_RETENTION_DAYS * 86400
+        with self._lock:
+            kept = []
+            for i, g in enumerate(self.generations):
+                latest = i == len(self.generations) - 1
+                if g.at < drop_before and not latest:
+                    continue
+                if g.at < full_after and not latest:
+                    # 하루에 마지막 세대 1개만 유지
+                    next_g = self.generations[i + 1]
+                    if _kst_day(next_g.at) == _kst_day(g.at):
+                        continue
+                kept.append(g)
+            removed = len(self.generations) - len(kept)
+            if removed:
+                self.generations = kept
+                self.times = [g.at for g in kept]
+                self._recount()
+            return removed
+
+    def stats(self):
+        return {"generations": len(self.generations), "bytes": self.nbytes, "max_bytes": self.max_bytes,
+                "latest_only": self.latest_only, "trimmed": self.trimmed}
+
+
+def _dumps(entry):
+    # numpy 스칼라는 Python 값으로
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":"),
+                      default=lambda o: o.item() if hasattr(o, "item") else str(o))
+
+
+def _kst_day(ts):
+    return datetime.fromtimestamp(ts, KST).date()
+
+
+def parse_as_of(text):
+    """
+    as_of -> timestamp
+    "2026-03-02" (그날 KST 자정 직전까지 반영된 값), "2026-03-02T09:00" (KST), "2026-03-02T00:00:00Z" 등
+    """
+    try:
+        if len(text) == 10:
+            day = datetime.strptime(text, "%Y-%m-%d").date()
+            return datetime.combine(day + timedelta(days=1), dt_time.min, KST).timestamp() - 1e-6
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"as_of 형식 오류: '{text}' (YYYY-MM-DD 또는 ISO 8601 시각)")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=KST)
+    return parsed.timestamp()
+
+
+class History:
+    """ 데이터셋별 세대 기록 + (선택) 디스크 append-only 로그 """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.datasets = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.ndjson")
+
+    def _dataset(self, key):
+        with self._lock:
+            if key not in self.datasets:
+                self.datasets[key] = DatasetHistory(key, latest_only=key in HISTORY_EXCLUDE,
+                                                    max_bytes=int(HISTORY_MAX_MB * 1024 * 1024))
+            return self.datasets[key]
+
+    def _load(self):
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".ndjson"):
+                continue
+            dataset = self._dataset(name[:-len(".ndjson")])
+            with open(os.path.join(self.directory, name)) as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            dataset.replay(json.loads(line))
+                        except (ValueError, KeyError) as e:
+                            # 마지막 줄이 기록 중 중단된 경우 등
+                            print(f"⚠️ [History] {name} 손상된 줄 무시: {e}")
+            print(f"📜 [History] {dataset.key}: {len(dataset.generations)} generations loaded")
+
+    def record(self, key, version, value):
+        """ 새 세대 기록 -> 로그 항목 (upserts: 추가/변경된 [행 키, 행]) """
+        dataset = self._dataset(key)
+        entry = dataset.append(version, value)
+        if self.directory:
+            if dataset.latest_only:
+                # 마지막 세대 1줄로 교체 (재시작 후 버전 연속 / 알림 변경분 계산용)
+                self._rewrite(key, dataset)
+            else:
+                with open(self._path(key), "a") as f:
+                    f.write(_dumps(entry) + "\n")
+        return entry
+
+    def stats(self):
+        """ 데이터셋별 세대 수 / 보관 바이트 (/api/refresh/memory) """
+        return {key: dataset.stats() for key, dataset in list(self.datasets.items())}
+
+    def epoch(self):
+        """
+        버전 번호 기준 (HISTORY_DIR이 있을 때만, 없으면 None)
+        처음 기동할 때 만든 값을 HISTORY_DIR/epoch에 보관 -> 기록을 다시 읽어 버전이 이어지는 동안은 재시작해도 같은 값
+        """
+        if not self.directory:
+            return None
+        path = os.path.join(self.directory, "epoch")
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value:
+                return value
+        except FileNotFoundError:
+            pass
+        value = str(int(time.time()))
+        with open(path + ".tmp", "w") as f:
+            f.write(value)
+        os.replace(path + ".tmp", path)
+        return value
+
+    def last_versions(self):
+        """ 데이터셋별 마지막 세대 버전 (재시작 후 버전 번호를 이어가는 데 사용) """
+        return {key: dataset.generations[-1].version for key, dataset in list(self.datasets.items()) if dataset.generations}
+
+    def resolve(self, key, as_of):
+        """ as_of(문자열) 시점의 세대 (형식 오류는 ValueError, 기록 없음은 LookupError) """
+        timestamp = parse_as_of(as_of)
+        dataset = self.datasets.get(key)
+        generation = dataset.at(timestamp) if dataset else None
+        if generation is None:
+            raise LookupError(f"{key}: {as_of} 이전 기록이 없습니다.")
+        return generation
+
+    def generations(self, key):
+        dataset = self.datasets.get(key)
+        if dataset is None:
+            raise LookupError(f"{key}: 기록이 없습니다.")
+        return [g.summary() for g in dataset.generations]
+
+    def changes(self, key, version):
+        """ 해당 세대에서 추가/변경/삭제된 행 (ECOS 수정치 확인 등) """
+        dataset = self.datasets.get(key)
+        if dataset is None:
+            raise LookupError(f"{key}: 기록이 없습니다.")
+        with dataset._lock:
+            index = next((i for i, g in enumerate(dataset.generations) if g.version == version), None)
+            if index is None:
+                raise LookupError(f"{key}: 버전 {version} 기록이 없습니다.")
+            current = dataset.generations[index]
+            previous = dataset.generations[index - 1] if index else None
+        before = dict(zip(previous.keys, previous.rows)) if previous else {}
+        after = dict(zip(current.keys, current.rows))
+        return {
+            **current.summary(),
+            "previous_version": previous.version if previous else None,
+            "upserts": [{"key": k, "before": before.get(k), "after": row}
+                        for k, row in after.items() if before.get(k) is not row],
+            "deletes": [{"key": k, "before": row} for k, row in before.items() if k not in after],
+        }
+
+    def compact(self):
+        """ 모든 데이터셋 compaction + 로그 파일 재작성 (임시 파일 -> 교체) """
+        total = 0
+        for key, dataset in list(self.datasets.items()):
+            removed = dataset.compact()
+            total += removed
+            if removed and self.directory:
+                self._rewrite(key, dataset)
+        if total:
+            print(f"🗜️ [History] compaction: {total} generations removed")
+        return total
+
+    def _rewrite(self, key, dataset):
+        path = self._path(key)
+        tmp = path + ".tmp"
+        rebuilt = DatasetHistory(key)
+        with dataset._lock:
+            generations = list(dataset.generations)
+        with open(tmp, "w") as f:
+            for g in generations:
+                generation, entry = rebuilt._build(g.version, g.at, g.shape, g.meta, g.keys, g.rows)
+                rebuilt._push(generation)
+                f.write(_dumps(entry) + "\n")
+        os.replace(tmp, path)
+
+
+HISTORY = History(HISTORY_DIR)
@@ -0,0 +1,157 @@
+import json
+import os
+from typing import Literal
+
+import pandas as pd
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from services import series_service
+from services.indicator_service import TRANSFORMS
+
+# 설정 파일로 선언하는 지표 (indicators.json)
+# - 지표마다 함수 / DATA_STORE 키 / 라우트 / refresh 작업을 따로 만들지 않고 선언 1개로 추가
+# - 앱 시작 시 1회 읽음: DATA_STORE 키 + 라우트(GET <route>) + refresh 그래프 노드 등록 (변경은 재시작 후 반영)
+# - 시계열 조회는 제공처별로 묶음 (fetch_plan)
+#     FRED: 기존 FRED 시계열과 함께 fredgraph.csv 요청 1회 (scheduler.FRED_SERIES)
+#     ECOS: "ecos_tables"에 적은 통계표는 항목 코드 없이 요청 1회로 모든 항목 -> 선언한 항목만 사용
+#           그 외는 항목별 요청 1회 (같은 항목은 지표 여러 개가 써도 1번, 직접 등록한 raw 노드가 있으면 그대로 사용)
+
+INDICATORS_PATH = os.getenv("INDICATORS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "indicators.json"))
+DEFAULT_DAYS = 3650
+LOOKBACK_DAYS = 400     # 변동률 / 차이 계산용으로 표시 구간보다 앞서 조회하는 기간 (yoy 1년 + 여유)
+
+
+class Indicator(BaseModel):
+    """
+    예) {"key": "us_yield_curve", "title": "US 10Y-2Y", "series": {"us_10y": "fred:DGS10", "us_2y": "fred:DGS2"},
+         "transform": "spread"}
+        {"key": "kr_cpi_yoy", "title": "Korea CPI (YoY %)", "series": {"cpi": "ecos:901Y009/0"},
+         "transform": "yoy", "cycle": "M", "start": "2014-01-01", "columns": ["value"]}
+    """
+    key: str = Field(..., pattern=r"^[a-z][a-z0-9_]*$")     # DATA_STORE 키
+    title: str
+    series: dict[str, str] = Field(..., min_length=1)       # 열 이름 -> 시계열 키 (ecos:<통계표>/<항목> | fred:<id>)
+    transform: Literal["level", "yoy", "pct_change", "diff", "spread", "ratio"] = "level"
+    periods: int = Field(1, ge=1)                          # pct_change / diff 비교 간격 (관측치 수)
+    cycle: Literal["D", "M", "Q", "A"] = "D"               # 관측 주기 (ECOS 조회 주기)
+    start: str | None = None                               # 표시 시작일 (YYYY-MM-DD, 없으면 최근 days일)
+    days: int = Field(DEFAULT_DAYS, ge=1)
+    ttl: int = Field(86400, ge=60)                         # 원천 재조회 주기(초)
+    fill_limit: int | None = Field(None, ge=0)             # 시계열 여러 개일 때 직전 값으로 채울 최대 일수
+    decimals: int = Field(2, ge=0)
+    columns: list[str] | None = None                       # 응답 열 (기본: 시계열 열 + value)
+    route: str | None = Field(None, pattern=r"^/api/[\w\-/]+$")
+
+    @field_validator("series")
+    @classmethod
+    def _check_series(cls, series):
+        checked = {}
+        for name, key in series.items():
+            source, ident = series_service.parse_series_key(key)
+            if source not in ("ecos", "fred"):
+                raise ValueError(f"지원하지 않는 제공처: '{key}' (ecos | fred)")
+            checked[name] = f"{source}:{ident}"
+        return checked
+
+    @model_validator(mode="after")
+    def _check_transform(self):
+        count = TRANSFORMS[self.transform]
+        if count is not None and len(self.series) != count:
+            raise ValueError(f"{self.transform}에는 시계열 {count}개가 필요합니다 ({len(self.series)}개).")
+        if self.start:
+            pd.Timestamp(self.start)
+        return self
+
+    @property
+    def path(self):
+        return self.route or f"/api/indicators/{self.key.replace('_', '-')}"
+
+    def nodes(self):
+        """ 입력 시계열의 refresh 그래프 노드 이름 (series 순서) """
+        return [series_node(key, self.cycle) for key in self.series.values()]
+
+    def fetch_spec(self):
+        """ 원천 조회 구간 ({"start"} 또는 {"days"}, 변환에 필요한 앞부분 포함) + 재조회 주기 """
+        lookback = 0 if self.transform in ("level", "spread", "ratio") else LOOKBACK_DAYS
+        if self.start:
+            return {"start": pd.Timestamp(self.start) - pd.Timedelta(days=lookback), "ttl": self.ttl}
+        return {"days": self.days + lookback, "ttl": self.ttl}
+
+    def describe(self):
+        return {**self.model_dump(exclude_none=True), "route": self.path}
+
+
+def series_node(key, cycle="D"):
+    """ 시계열 키 -> refresh 그래프 노드 이름 (ECOS 일별 외 주기는 "@주기", 예: ecos:901Y009/0@M) """
+    source, ident = series_service.parse_series_key(key)
+    if source == "ecos" and cycle != "D":
+        return f"ecos:{ident}@{cycle}"
+    return f"{source}:{ident}"
+
+
+def merge_spec(a, b):
+    """ 조회 구간 2개 -> 둘 다 포함하는 구간 (start는 더 이른 날, days는 더 긴 기간, ttl은 더 짧은 주기) """
+    if a is None:
+        return dict(b)
+    merged = dict(a)
+    if b.get("days"):
+        merged["days"] = max(merged.get("days") or 0, b["days"])
+    if b.get("start") is not None:
+        merged["start"] = min(pd.Timestamp(merged["start"]), pd.Timestamp(b["start"])) if merged.get("start") is not None else b["start"]
+    if b.get("ttl"):
+        merged["ttl"] = min(merged.get("ttl") or b["ttl"], b["ttl"])
+    return merged
+
+
+class Registry:
+    def __init__(self, indicators=(), ecos_tables=()):
+        self.indicators = list(indicators)
+        self.ecos_tables = set(ecos_tables)    # 항목 코드 없이 한 번에 조회할 ECOS 통계표
+
+    @classmethod
+    def load(cls, path=INDICATORS_PATH):
+        """ 설정 파일 -> Registry (잘못된 지표는 건너뜀, 파일이 없으면 빈 목록) """
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path) as f:
+                config = json.load(f)
+        except Exception as e:
+            print(f"❌ [Indicators] 설정 파일 오류 ({path}): {e}")
+            return cls()
+
+        indicators, keys = [], set()
+        for raw in config.get("indicators", []):
+            try:
+                indicator = Indicator(**raw)
+            except Exception as e:
+                print(f"❌ [Indicators] {raw.get('key', '?')} 건너뜀: {e}")
+                continue
+            if indicator.key in keys:
+                print(f"❌ [Indicators] {indicator.key} 중복 -> 건너뜀")
+                continue
+            keys.add(indicator.key)
+            indicators.append(indicator)
+        print(f"📐 [Indicators] {len(indicators)} indicators loaded")
+        return cls(indicators, config.get("ecos_tables", []))
+
+    def fetch_plan(self, indicators=None):
+        """
+        선언한 지표의 입력 시계열을 제공처별로 묶은 조회 계획
+        -> {"fred": {series_id: spec}, "ecos": {(통계표, 주기): {항목: spec}}} (같은 시계열은 조회 구간을 합쳐 1번)
+        """
+        fred, ecos = {}, {}
+        for indicator in self.indicators if indicators is None else indicators:
+            spec = indicator.fetch_spec()
+            for key in indicator.series.values():
+                source, ident = series_service.parse_series_key(key)
+                if source == "fred":
+                    fred[ident] = merge_spec(fred.get(ident), spec)
+                else:
+                    stat_code, _, item_code = ident.partition("/")
+                    items = ecos.setdefault((stat_code, indicator.cycle), {})
+                    items[item_code] = merge_spec(items.get(item_code), spec)
+        return {"fred": fred, "ecos": ecos}
+
+
+REGISTRY = Registry.load()
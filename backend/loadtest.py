@@ -0,0 +1,310 @@
+"""
+API 부하 테스트 (응답 지연 SLO 확인 / Fly 머신 크기 산정용)
+
+합성 데이터(fixtures.py)로 main:app을 직접 띄우고, 10개 데이터 라우트에 동시 요청을 보낸 뒤
+라우트별 처리량과 p50 / p95 / p99 지연을 기준값과 비교해 출력 (기준 초과 시 종료 코드 1)
+
+예)
+  python loadtest.py                                  # 동시 16, 20초
+  python loadtest.py -c 64 -d 60 --refresh-every 2    # 2초마다 refresh를 흉내 내며 측정
+  python loadtest.py --accept application/msgpack     # MessagePack 응답 측정
+  python loadtest.py --url https://<app>.fly.dev      # 이미 떠 있는 서버 측정
+  python loadtest.py --latency-check                  # 큰 응답을 계속 보내는 동안 / 지연이 기준 이내인지 (회귀 확인)
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import requests
+
+ROUTES = [
+    "/api/market/pulse",
+    "/api/macro/cpi",
+    "/api/macro/unrate",
+    "/api/macro/risk-ratio",
+    "/api/market/credit-spread",
+    "/api/market/credit-curve",
+    "/api/market/yield-gap",
+    "/api/macro/rate-spread",
+    "/api/macro/us-rate-spread",
+    "/api/analytics/correlation",
+    "/api/market/kospi-breadth",
+]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_local_server():
+    """ FIXTURE_MODE로 main:app을 같은 프로세스의 스레드에서 기동 -> (base_url, server) """
+    os.environ["FIXTURE_MODE"] = "1"
+    import uvicorn
+    import main
+
+    port = _free_port()
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+def start_server_process(switch_interval=None):
+    """
+    FIXTURE_MODE로 main:app을 별도 프로세스로 기동 -> (base_url, process)
+    (--latency-check: 요청을 보내는 스레드와 서버가 GIL을 나눠 쓰지 않도록 분리)
+    switch_interval: 서버의 GIL 전환 간격(초, GIL_SWITCH_INTERVAL_SECONDS)
+    """
+    port = _free_port()
+    env = {**os.environ, "FIXTURE_MODE": "1"}
+    if switch_interval:
+        env["GIL_SWITCH_INTERVAL_SECONDS"] = str(switch_interval)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if requests.get(base_url + "/readyz", timeout=1).status_code == 200:
+                return base_url, process
+        except requests.RequestException:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("로컬 서버 기동 실패")
+
+
+def _worker(base_url, routes, offset, headers, stop_at, warmup_until, results):
+    session = requests.Session()
+    i = offset
+    while True:
+        now = time.perf_counter()
+        if now >= stop_at:
+            break
+        route = routes[i % len(routes)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            resp = session.get(base_url + route, headers=headers, timeout=10)
+            ok = resp.status_code == 200
+            size = len(resp.content)
+        except requests.RequestException:
+            ok, size = False, 0
+        elapsed = time.perf_counter() - started
+        if started >= warmup_until:
+            results.append((route, elapsed, ok, size))
+
+
+def _refresh_loop(interval, stop_event, counter):
+    import fixtures
+
+    seed = 1
+    while not stop_event.wait(interval):
+        fixtures.simulate_refresh(seed)
+        seed += 1
+        counter[0] += 1
+
+
+def run_load(base_url, routes, concurrency, duration, warmup, accept=None, refresh_every=None):
+    """ 동시 요청 실행 -> [(route, 지연(초), 성공 여부, 응답 바이트)] + refresh 횟수 """
+    headers = {"Accept": accept} if accept else {}
+    results = []   # list.append는 스레드 안전
+    start = time.perf_counter()
+    warmup_until = start + warmup
+    stop_at = warmup_until + duration
+
+    stop_event = threading.Event()
+    refresh_count = [0]
+    if refresh_every:
+        threading.Thread(target=_refresh_loop, args=(refresh_every, stop_event, refresh_count), daemon=True).start()
+
+    workers = [
+        threading.Thread(target=_worker, args=(base_url, routes, n, headers, stop_at, warmup_until, results))
+        for n in range(concurrency)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    stop_event.set()
+    return results, refresh_count[0]
+
+
+def heavy_route():
+    """ 큰 응답 라우트: 오늘 시점 as_of 조회 (세대 기록에서 복원 + 3,650행 직렬화, snapshot / 캐시 없음) """
+    return f"/api/macro/rate-spread?as_of={datetime.now(ZoneInfo('Asia/Seoul')):%Y-%m-%d}"
+
+
+def run_latency_check(base_url, heavy, probe, concurrency, duration, warmup):
+    """
+    큰 응답(heavy)을 concurrency개 스레드로 계속 요청하는 동안 작은 라우트(probe)를 1개 스레드로 요청
+    -> (probe 결과, heavy 결과) (큰 응답 직렬화가 이벤트 루프를 막으면 probe 지연이 커짐)
+    """
+    probe_results, heavy_results = [], []
+    start = time.perf_counter()
+    warmup_until = start + warmup
+    stop_at = warmup_until + duration
+    workers = [
+        threading.Thread(target=_worker, args=(base_url, [heavy], n, {}, stop_at, warmup_until, heavy_results))
+        for n in range(concurrency)
+    ]
+    workers.append(threading.Thread(target=_worker, args=(base_url, [probe], 0, {}, stop_at, warmup_until, probe_results)))
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return probe_results, heavy_results
+
+
+def loop_stats(base_url):
+    """ 서버 /healthz의 이벤트 루프 지연 (조회 실패 시 None) """
+    try:
+        return requests.get(base_url + "/healthz", timeout=10).json().get("event_loop")
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def summarize(results, duration, p95_ms, p99_ms):
+    """ 라우트별 처리량 / 지연 백분위 / 기준 통과 여부 """
+    by_route = defaultdict(list)
+    for route, elapsed, ok, size in results:
+        by_route[route].append((elapsed, ok, size))
+
+    report = []
+    for route, rows in by_route.items():
+        latencies = np.array([r[0] for r in rows]) * 1000
+        errors = sum(1 for r in rows if not r[1])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report.append({
+            "route": route,
+            "requests": len(rows),
+            "errors": errors,
+            "rps": round(len(rows) / duration, 1),
+            "bytes": int(np.mean([r[2] for r in rows])),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(latencies.max()), 2),
+            "pass": errors == 0 and p95 <= p95_ms and p99 <= p99_ms,
+        })
+    return sorted(report, key=lambda r: r["p95_ms"], reverse=True)
+
+
+def print_report(report, duration, concurrency, refresh_count, p95_ms, p99_ms):
+    total = sum(r["requests"] for r in report)
+    print(f"\n동시 요청 {concurrency} / 측정 {duration}s / 전체 {total / duration:.1f} req/s"
+          f" / refresh {refresh_count}회 / 기준 p95<={p95_ms}ms, p99<={p99_ms}ms\n")
+    header = f"{'route':<28}{'req':>7}{'err':>5}{'req/s':>8}{'bytes':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>9}  result"
+    print(header)
+    print("-" * len(header))
+    for r in report:
+        print(f"{r['route']:<28}{r['requests']:>7}{r['errors']:>5}{r['rps']:>8}{r['bytes']:>9}"
+              f"{r['p50_ms']:>8}{r['p95_ms']:>8}{r['p99_ms']:>8}{r['max_ms']:>9}  {'PASS' if r['pass'] else 'FAIL'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market Radar API 부하 테스트")
+    parser.add_argument("--url", help="측정할 서버 주소 (생략 시 합성 데이터로 로컬 서버 기동)")
+    parser.add_argument("-c", "--concurrency", type=int, help="동시 요청 수 (기본 16, --latency-check는 큰 응답 동시 요청 4)")
+    parser.add_argument("-d", "--duration", type=float, default=20, help="측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=2, help="집계에서 제외할 시작 구간(초)")
+    parser.add_argument("--routes", nargs="+", default=ROUTES, help="측정할 라우트 (기본: 10개 데이터 라우트)")
+    parser.add_argument("--accept", help="Accept 헤더 (예: application/msgpack)")
+    parser.add_argument("--refresh-every", type=float, help="N초마다 refresh를 흉내 냄 (로컬 서버에서만)")
+    parser.add_argument("--p95-ms", type=float, default=10, help="라우트별 p95 기준(ms)")
+    parser.add_argument("--p99-ms", type=float, default=50, help="라우트별 p99 기준(ms)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    parser.add_argument("--profile", metavar="PATH", help="측정 구간을 샘플링해 speedscope JSON으로 저장 (로컬 서버에서만)")
+    parser.add_argument("--latency-check", action="store_true",
+                        help="큰 응답을 동시 요청하는 동안 작은 라우트 지연만 기준과 비교 (-c: 큰 응답 동시 요청 수)")
+    parser.add_argument("--heavy-route", help="--latency-check 큰 응답 라우트 (기본: 오늘 시점 as_of rate-spread)")
+    parser.add_argument("--probe-route", default="/", help="--latency-check 지연을 잴 작은 라우트")
+    parser.add_argument("--probe-p99-ms", type=float, default=150, help="--latency-check 작은 라우트 p99 기준(ms)")
+    parser.add_argument("--switch-interval", type=float, default=0.001,
+                        help="--latency-check 로컬 서버의 GIL 전환 간격(초, 배포 설정 fly.toml과 동일, 0이면 Python 기본값)")
+    args = parser.parse_args()
+    if args.concurrency is None:
+        args.concurrency = 4 if args.latency_check else 16
+
+    if args.latency_check:
+        if args.url:
+            return latency_check(args.url.rstrip("/"), args)
+        base_url, process = start_server_process(args.switch_interval)
+        try:
+            return latency_check(base_url, args)
+        finally:
+            process.terminate()
+            process.wait()
+
+    if args.url:
+        base_url = args.url.rstrip("/")
+        if args.refresh_every:
+            print("⚠️ --refresh-every는 로컬 서버에서만 동작합니다 (무시)")
+            args.refresh_every = None
+    else:
+        base_url, _ = start_local_server()
+
+    if args.profile and not args.url:
+        import profiler
+        with profiler.Sampler(f"loadtest -c {args.concurrency}") as profile:
+            results, refresh_count = run_load(
+                base_url, args.routes, args.concurrency, args.duration, args.warmup, args.accept, args.refresh_every
+            )
+        profiler.write_output(profile, "speedscope", args.profile)
+    else:
+        results, refresh_count = run_load(
+            base_url, args.routes, args.concurrency, args.duration, args.warmup, args.accept, args.refresh_every
+        )
+    report = summarize(results, args.duration, args.p95_ms, args.p99_ms)
+
+    if args.json:
+        print(json.dumps({"concurrency": args.concurrency, "duration": args.duration,
+                          "refresh_count": refresh_count, "routes": report}, indent=2))
+    else:
+        print_report(report, args.duration, args.concurrency, refresh_count, args.p95_ms, args.p99_ms)
+
+    return 0 if report and all(r["pass"] for r in report) else 1
+
+
+def latency_check(base_url, args):
+    heavy = args.heavy_route or heavy_route()
+    probe_results, heavy_results = run_latency_check(
+        base_url, heavy, args.probe_route, args.concurrency, args.duration, args.warmup
+    )
+    # 작은 라우트만 기준 비교 (큰 응답은 처리량 / 지연 참고용, 기준 없음)
+    probe = summarize(probe_results, args.duration, args.probe_p99_ms, args.probe_p99_ms)
+    heavy_report = summarize(heavy_results, args.duration, float("inf"), float("inf"))
+    loop = loop_stats(base_url)
+
+    if args.json:
+        print(json.dumps({"concurrency": args.concurrency, "duration": args.duration, "probe": probe,
+                          "heavy": heavy_report, "event_loop": loop}, indent=2))
+    else:
+        print(f"\n큰 응답 {heavy} x {args.concurrency} 동시 요청 중 {args.probe_route} 지연 (기준 p95, p99<={args.probe_p99_ms}ms)")
+        print_report(probe + heavy_report, args.duration, args.concurrency + 1, 0, args.probe_p99_ms, args.probe_p99_ms)
+        if loop:
+            print(f"\nevent loop lag: p50 {loop['p50_ms']}ms / p99 {loop['p99_ms']}ms / max {loop['window_max_ms']}ms"
+                  f" / stalls {loop['stalls']} / offloaded {loop['offloaded']['responses']} responses")
+    return 0 if probe and all(r["pass"] for r in probe) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
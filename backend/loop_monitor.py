@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import os
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 이벤트 루프 지연(lag) 측정
+# - INTERVAL초마다 asyncio.sleep을 걸고, 실제로 깨어난 시각이 예정보다 늦은 만큼을 lag로 기록
+#   (루프에서 동기 작업 - 큰 JSON 직렬화 등 - 이 실행 중이면 그동안 다른 요청도 처리되지 않음)
+# - 최근 WINDOW개 표본의 p50 / p99 / 최대, 기동 후 최대, STALL_MS 이상 지연 횟수 -> /healthz "event_loop"
+
+INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.1"))
+WINDOW = 600                     # 최근 표본 수 (기본 간격이면 약 1분)
+STALL_MS = float(os.getenv("LOOP_STALL_MS", "100"))
+
+
+class LoopMonitor:
+    def __init__(self, interval=INTERVAL, window=WINDOW, stall_ms=STALL_MS):
+        self.interval = interval
+        self.stall_ms = stall_ms
+        self.samples = deque(maxlen=window)     # lag (ms)
+        self.max_ms = 0.0                       # 기동 후 최대
+        self.stalls = 0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, loop.time() - scheduled) * 1000
+            self.samples.append(lag_ms)
+            self.max_ms = max(self.max_ms, lag_ms)
+            if lag_ms >= self.stall_ms:
+                self.stalls += 1
+                logger.warning(f"🐢 [Loop] event loop blocked for {lag_ms:.0f}ms")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        samples = np.array(self.samples) if self.samples else np.zeros(1)
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "samples": len(self.samples),
+            "lag_ms": round(float(samples[-1]), 2),
+            "p50_ms": round(float(p50), 2),
+            "p99_ms": round(float(p99), 2),
+            "window_max_ms": round(float(samples.max()), 2),
+            "max_ms": round(self.max_ms, 2),
+            "stalls": self.stalls,
+            "stall_ms": self.stall_ms,
+        }
+
+
+LOOP_MONITOR = LoopMonitor()
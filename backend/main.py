@@ -1,24 +1,60 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 import scheduler # 스케줄러 모듈 임포트
-import threading
+from services import series_service, provider_service, memory_service, stock_service, correlation_service, breadth_service
+from responses import dataset_response, export_response, payload_response, render_payload
+from auth import require_admin
+from history import HISTORY
+from alerts import ALERTS, AlertRule
+from watchlists import WATCHLISTS, Watchlist, parse_symbols
+import json
+import health
+from loop_monitor import LOOP_MONITOR
+import profiler
+import asyncio
+import os
+import sys
+
+# GIL 전환 간격 (설정한 경우만, 예: 5ms -> 1ms): 스레드풀에서 큰 응답을 직렬화 / refresh 계산하는 동안에도 이벤트 루프 스레드가 빨리 GIL을 받음
+# 인터프리터 전역 설정이라 import만으로 바꾸지 않음 (배포 설정 fly.toml에서 지정)
+if os.getenv("GIL_SWITCH_INTERVAL_SECONDS"):
+    sys.setswitchinterval(float(os.getenv("GIL_SWITCH_INTERVAL_SECONDS")))
+
+# FIXTURE_MODE=1: 외부 API / 스케줄러 없이 합성 데이터(fixtures.py)로 기동 (부하 테스트, 로컬 개발용)
+FIXTURE_MODE = os.getenv("FIXTURE_MODE") == "1"
 
 # Lifespan: 앱 시작/종료 시 실행될 로직
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # 이벤트 루프 지연 측정 (/healthz "event_loop")
+    LOOP_MONITOR.start()
+    if FIXTURE_MODE:
+        import fixtures
+        fixtures.load_fixture_store()
+        yield
+        await LOOP_MONITOR.stop()
+        return
+
+    # 0. backfill.py로 받아둔 장기 이력 (SERIES_DIR) -> refresh는 최근 구간만 조회
+    series_service.load_series_dir()
+
     # 1. 스케줄러 시작
     sched_obj = scheduler.start_scheduler()
     
     # 2. 초기 데이터 적재 (비동기적으로는 너무 늦을 수 있으므로, 스레드 돌려서 백그라운드 즉시 실행)
     # 이렇게 하면 앱 시작은 막지 않으면서(FastAPI 뜸) 곧 데이터가 채워짐
-    update_thread = threading.Thread(target=scheduler.update_all_data)
-    update_thread.start()
+    # (coordinator가 별도 스레드에서 실행, 그동안 주기 작업이 시작되면 새로 실행하지 않고 이 refresh에 합류)
+    scheduler.COORDINATOR.trigger(source="startup")
     
     yield # 앱 실행 중...
     
-    # 3. 종료 시 스케줄러 셧다운
+    # 3. 종료 시 스케줄러 셧다운 (공유 저장소 leader lock은 다른 인스턴스가 바로 이어받도록 해제)
     sched_obj.shutdown()
+    scheduler.STORE.release_leader()
+    await LOOP_MONITOR.stop()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -34,50 +70,354 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["GET"],
     allow_headers=["*"],
+    expose_headers=["X-Data-Version"],
 )
 
 @app.get("/")
-async def read_root():
-    return {"status": "Market Radar v2.0 API Ready"}
+async def read_root(request: Request):
+    return await payload_response(request, {"status": "Market Radar v2.0 API Ready"})
+
+# 상태 점검: 데이터셋별 마지막 성공 시각 / 경과 시간 / 조회 소요 시간 / Mock Data 여부 (항상 200)
+@app.get("/healthz")
+async def get_healthz(request: Request):
+    return await payload_response(request, health.health())
+
+# 준비 여부: 필수 데이터셋이 모두 메모리에 있으면 200, 아니면 503 (fly.toml http check -> 준비 전 인스턴스로 요청 전달 안 함)
+@app.get("/readyz")
+async def get_readyz():
+    ready, body = health.readiness()
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+# 데이터셋별 현재 버전 (프론트엔드 IndexedDB 캐시 확인용, 버전이 같은 데이터셋은 다시 받지 않음)
+@app.get("/api/versions")
+async def get_versions(request: Request):
+    return await payload_response(request, {"epoch": scheduler.VERSION_EPOCH, "versions": scheduler.DATA_VERSION})
 
 # --- Endpoints now read from Memory (DATA_STORE) ---
+# ?as_of=2026-03-02 (그날 마지막 값) 또는 ISO 시각(KST 기준)이면 그 시점에 제공하던 값 (세대 기록에서 복원)
+AS_OF = Query(None, description="과거 시점 (YYYY-MM-DD 또는 ISO 8601, KST)")
+# Accept: application/vnd.apache.arrow.stream 요청 시 Arrow IPC stream으로 응답
+# Accept: application/msgpack 요청 시 MessagePack으로 응답 (모든 라우트 공통, layout=columnar면 숫자 열을 float64 배열로)
 
 # 1. 상단 8개 지표 (Market Pulse)
+# ?symbols=AAPL,MSFT 또는 ?watchlist=<이름>이면 해당 종목만 (종목별 캐시, 캐시에 없는 종목은 동시 요청과 합쳐 일괄 조회)
 @app.get("/api/market/pulse")
-async def get_pulse():
-    return scheduler.DATA_STORE["market_pulse"]
+async def get_pulse(
+    request: Request,
+    as_of: str | None = AS_OF,
+    symbols: str | None = Query(None, description="쉼표로 구분한 종목 코드 (최대 100개)"),
+    watchlist: str | None = Query(None, description="관심 목록 이름 (/api/market/watchlists)"),
+):
+    if symbols is None and watchlist is None:
+        return await dataset_response(request, "market_pulse", as_of)
+    if as_of:
+        raise HTTPException(status_code=400, detail="as_of는 기본 Market Pulse에서만 지원합니다.")
+    try:
+        if watchlist is not None:
+            names = WATCHLISTS.get(watchlist).names()
+        else:
+            names = {s: stock_service.TICKERS.get(s, s) for s in parse_symbols(symbols)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    # 캐시에 없는 종목은 yfinance 조회 -> 스레드풀에서 실행
+    try:
+        results, missing = await run_in_threadpool(stock_service.get_watchlist_pulse, names)
+    except stock_service.SymbolLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    headers = {"X-Missing-Symbols": ",".join(missing)} if missing else None
+    return await payload_response(request, results, headers)
+
+# 1-1. 관심 목록 (default = 기존 8개 지표)
+@app.get("/api/market/watchlists")
+async def get_watchlists(request: Request):
+    return await payload_response(request, WATCHLISTS.list())
 
 # 2. CPI 데이터 (거시경제)
 @app.get("/api/macro/cpi")
-async def get_cpi():
-    return scheduler.DATA_STORE["cpi"]
+async def get_cpi(request: Request, as_of: str | None = AS_OF):
+    return await dataset_response(request, "cpi", as_of)
 
 # 3. 실업률 데이터 (거시경제)
 @app.get("/api/macro/unrate")
-async def get_unrate():
-    return scheduler.DATA_STORE["unrate"]
+async def get_unrate(request: Request, as_of: str | None = AS_OF):
+    return await dataset_response(request, "unrate", as_of)
 
 # 4. 위험 신호 (금/은 비율)
 @app.get("/api/macro/risk-ratio")
-async def get_risk_radar():
-    return scheduler.DATA_STORE["risk_ratio"]
+async def get_risk_radar(request: Request, as_of: str | None = AS_OF):
+    return await dataset_response(request, "risk_ratio", as_of)
 
 # 5. 크레딧 스프레드 (Credit Spread)
 @app.get("/api/market/credit-spread")
-async def get_credit_spread():
-    return scheduler.DATA_STORE["credit_spread"]
+async def get_credit_spread(request: Request, as_of: str | None = AS_OF):
+    return await dataset_response(request, "credit_spread", as_of)
+
+# 5-1. 신용 곡선 (국고채 1 / 3 / 5년 + 회사채 AA- / BBB- 3년: 최근 / 1개월 / 1년 전 곡선 + 스프레드 이력)
+@app.get("/api/market/credit-curve")
+async def get_credit_curve(request: Request, as_of: str | None = AS_OF):
+    return await dataset_response(request, "credit_curve", as_of)
 
 # 6. 일드갭 (Yield Gap)
 @app.get("/api/market/yield-gap")
-async def get_yield_gap():
-    return scheduler.DATA_STORE["yield_gap"]
+async def get_yield_gap(request: Request, as_of: str | None = AS_OF):
+    return await dataset_response(request, "yield_gap", as_of)
 
 # 7. 콜금리 vs 기준금리 스프레드 (Rate Spread)
 @app.get("/api/macro/rate-spread")
-async def get_rate_spread():
-    return scheduler.DATA_STORE["rate_spread"]
+async def get_rate_spread(request: Request, as_of: str | None = AS_OF):
+    return await dataset_response(request, "rate_spread", as_of)
 
 # 8. 미국 금리 스프레드 (US Rate Spread)
 @app.get("/api/macro/us-rate-spread")
-async def get_us_rate_spread():
-    return scheduler.DATA_STORE["us_rate_spread"]
\ No newline at end of file
+async def get_us_rate_spread(request: Request, as_of: str | None = AS_OF):
+    return await dataset_response(request, "us_rate_spread", as_of)
+
+# 7-1. KOSPI 시장 폭 (상승 / 하락 종목 수, A/D line, 52주 신고가 / 신저가, 50 / 200일선 상회 비율)
+@app.get("/api/market/kospi-breadth")
+async def get_kospi_breadth(request: Request, as_of: str | None = AS_OF):
+    return await dataset_response(request, "kospi_breadth", as_of)
+
+# 8-1. 자산 간 상관계수 / 베타 / 실현 변동성 / 낙폭 (Market Pulse 8종목 + 금 / 은)
+# 기본값(전체 종목, window=60, 기준 ^GSPC)은 refresh 때 계산된 snapshot, 그 외 조합은 요청 시 계산 + 캐시
+# 예) /api/analytics/correlation?window=250&symbols=^GSPC,GC=F,SI=F
+@app.get("/api/analytics/correlation")
+async def get_correlation(
+    request: Request,
+    as_of: str | None = AS_OF,
+    window: int = Query(correlation_service.DEFAULT_WINDOW, description="수익률 구간 (20 | 60 | 120 | 250 영업일)"),
+    symbols: str | None = Query(None, description="쉼표로 구분한 종목 코드 (기본: 전체)"),
+    benchmark: str = Query(correlation_service.BENCHMARK, description="베타 / rolling 상관계수 기준 종목"),
+):
+    if window == correlation_service.DEFAULT_WINDOW and symbols is None and benchmark == correlation_service.BENCHMARK:
+        return await dataset_response(request, "correlation", as_of)
+    if as_of:
+        raise HTTPException(status_code=400, detail="as_of는 기본 조회에서만 지원합니다.")
+    try:
+        selected = parse_symbols(symbols) if symbols else None
+        result = await run_in_threadpool(correlation_service.get_correlation, window, selected, benchmark.upper())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return await payload_response(request, result)
+
+# 8-2. 설정 파일(indicators.json)로 선언한 지표: 지표별 GET <route> 자동 등록 (기본 /api/indicators/<key>)
+@app.get("/api/indicators")
+async def get_indicators(request: Request):
+    return await payload_response(request, [
+        {**indicator.describe(), "version": scheduler.DATA_VERSION.get(indicator.key, 0)} for indicator in scheduler.INDICATORS
+    ])
+
+def _indicator_endpoint(key):
+    async def get_indicator(request: Request, as_of: str | None = AS_OF):
+        return await dataset_response(request, key, as_of)
+    return get_indicator
+
+for _indicator in scheduler.INDICATORS:
+    app.add_api_route(_indicator.path, _indicator_endpoint(_indicator.key), methods=["GET"],
+                      name=f"indicator_{_indicator.key}", summary=_indicator.title)
+
+# 9. 데이터 갱신 그래프 노드별 상태 / 소요 시간 (느린 노드 순)
+@app.get("/api/refresh/nodes")
+async def get_refresh_nodes(request: Request):
+    return await payload_response(request, scheduler.REFRESH_GRAPH.stats())
+
+# 10. 외부 제공처별 Circuit Breaker 상태 (closed / open / half_open)
+@app.get("/api/refresh/providers")
+async def get_refresh_providers(request: Request):
+    return await payload_response(request, provider_service.breaker_states())
+
+# 11. 메모리 사용량: 데이터셋 / 원천 시계열 / refresh 노드 / 캐시별 바이트, RSS 기록, refresh 전후 할당 상위 위치
+# 크기 계산에 시간이 걸리므로 async가 아닌 def (스레드풀에서 실행)
+@app.get("/api/refresh/memory")
+def get_refresh_memory(request: Request):
+    report = memory_service.memory_report({
+        "data_store": scheduler.DATA_STORE,
+        "history": {key: [g.rows for g in dataset.generations] for key, dataset in list(HISTORY.datasets.items())},
+        "snapshots": {key: payload for key, (_, payload) in list(scheduler.SNAPSHOTS.items())},
+        "series_store": {key: entry["series"] for key, entry in list(series_service.SERIES_STORE.items())},
+        "correlation": {"price_matrix": correlation_service.PRICE_MATRIX["prices"]},
+        "kospi_breadth": {name: getattr(breadth_service.BREADTH, name) for name in ("closes", "changes", "csum", "ccount")},
+        "refresh_nodes": {name: node.value for name, node in scheduler.REFRESH_GRAPH.nodes.items()},
+    })
+    # 세대 기록의 데이터셋별 보관 바이트 / 제한 (HISTORY_MAX_MB, HISTORY_EXCLUDE)
+    report["history"] = HISTORY.stats()
+    return render_payload(request, report)
+
+# 12. 임의 시계열 간 스프레드/비율 (on-demand 계산 + 캐시)
+# 예) /api/series/spread?a=fred:DGS10&b=fred:DGS2
+#     /api/series/spread?a=ecos:817Y002/010210000&b=fred:DGS10
+#     /api/series/spread?a=yahoo:GC=F&b=yahoo:SI=F&op=ratio
+# 저장소에 없는 시계열은 허용 목록(ON_DEMAND_SERIES)에 있는 것만 직접 조회하므로 async가 아닌 def (스레드풀에서 실행)
+@app.get("/api/series/spread")
+def get_series_spread(
+    request: Request,
+    a: str = Query(..., description="<ecos|fred|yahoo>:<id>"),
+    b: str = Query(..., description="<ecos|fred|yahoo>:<id>"),
+    op: str = Query("spread", description="spread (a - b) | ratio (a / b)"),
+    fill_limit: int | None = Query(None, ge=0, description="직전 값으로 채울 최대 일수 (0 = 같은 날짜만)"),
+):
+    try:
+        result = series_service.get_derived_series(a, b, op, fill_limit)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return render_payload(request, result)
+
+
+# 13. 데이터셋 일괄 내보내기 (분석용, refresh당 1회 생성 후 캐시)
+# 예) /api/export/credit_spread.parquet, /api/export/rate_spread.arrow
+@app.get("/api/export/{key}.parquet")
+async def export_parquet(key: str, as_of: str | None = AS_OF):
+    return await export_response(key, "parquet", as_of)
+
+@app.get("/api/export/{key}.arrow")
+async def export_arrow(key: str, as_of: str | None = AS_OF):
+    return await export_response(key, "arrow", as_of)
+
+
+# 14. 데이터셋 세대 기록 (버전 / 시각 / 바뀐 행 수) 및 특정 버전에서 바뀐 행 (수정치 확인용)
+@app.get("/api/history/{key}")
+async def get_history(request: Request, key: str):
+    try:
+        return await payload_response(request, HISTORY.generations(key))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/api/history/{key}/{version}")
+def get_history_changes(request: Request, key: str, version: int):
+    try:
+        return render_payload(request, HISTORY.changes(key, version))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+# 15. 알림 (임계값 규칙, refresh 시 새 관측치만 평가)
+@app.get("/api/alerts")
+async def get_alerts(request: Request):
+    return await payload_response(request, list(ALERTS.recent))
+
+@app.get("/api/alerts/rules")
+def get_alert_rules(request: Request):
+    return render_payload(request, ALERTS.list_rules())
+
+# SSE: 새 알림을 실시간 전송 (재연결 시 Last-Event-ID 이후 알림부터)
+@app.get("/api/alerts/stream")
+async def stream_alerts(request: Request, last_event_id: str | None = Header(None)):
+    queue = ALERTS.subscribe()
+
+    def event(alert):
+        return f"id: {alert['id']}\nevent: alert\ndata: {json.dumps(alert, ensure_ascii=False)}\n\n"
+
+    async def events():
+        try:
+            for alert in ALERTS.since(last_event_id):
+                yield event(alert)
+            while not await request.is_disconnected():
+                try:
+                    alert = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield event(alert)
+        finally:
+            ALERTS.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.put("/api/admin/alerts/rules/{rule_id}", dependencies=[Depends(require_admin)])
+def put_alert_rule(rule_id: str, rule: AlertRule):
+    if rule.id != rule_id:
+        raise HTTPException(status_code=400, detail="경로의 rule_id와 본문의 id가 다릅니다.")
+    ALERTS.put_rule(rule)
+    return rule
+
+@app.delete("/api/admin/alerts/rules/{rule_id}", dependencies=[Depends(require_admin)])
+def delete_alert_rule(rule_id: str):
+    try:
+        ALERTS.delete_rule(rule_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"deleted": rule_id}
+
+# 관심 목록 추가 / 변경 / 삭제 (관리자 전용, default는 변경 불가)
+@app.put("/api/admin/watchlists/{name}", dependencies=[Depends(require_admin)])
+def put_watchlist(name: str, watchlist: Watchlist):
+    if watchlist.name != name:
+        raise HTTPException(status_code=400, detail="경로의 name과 본문의 name이 다릅니다.")
+    try:
+        WATCHLISTS.put(watchlist)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return watchlist
+
+@app.delete("/api/admin/watchlists/{name}", dependencies=[Depends(require_admin)])
+def delete_watchlist(name: str):
+    try:
+        WATCHLISTS.delete(name)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"deleted": name}
+
+
+# 수동 refresh (관리자 전용): ?keys=cpi,unrate 이면 해당 데이터셋에 필요한 노드만, force=true면 원천 ttl 무시
+# 실행 중인 refresh가 요청을 포함하면 합류 / 아니면 끝난 뒤 1회 / 같은 요청이 ADMIN_REFRESH_DEBOUNCE초 안에 반복되면 이전 실행 반환
+ADMIN_REFRESH_DEBOUNCE = float(os.getenv("ADMIN_REFRESH_DEBOUNCE_SECONDS", "60"))
+
+@app.post("/api/admin/refresh", dependencies=[Depends(require_admin)], status_code=202)
+async def admin_refresh(
+    keys: str | None = Query(None, description="쉼표로 구분한 데이터셋 키 (생략 시 전체)"),
+    force: bool = Query(False, description="원천 노드 ttl 무시하고 재조회"),
+):
+    if FIXTURE_MODE:
+        raise HTTPException(status_code=409, detail="FIXTURE_MODE에서는 refresh를 실행하지 않습니다.")
+    selected = [k.strip() for k in keys.split(",") if k.strip()] if keys else None
+    unknown = [k for k in selected or [] if k not in scheduler.DATA_STORE]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 데이터셋: {', '.join(unknown)}")
+    run, state = scheduler.COORDINATOR.trigger(selected, force, source="admin", debounce=ADMIN_REFRESH_DEBOUNCE)
+    return {"state": state, "run": run.describe()}
+
+# 실행 중 / 대기 중 refresh와 최근 실행 기록
+@app.get("/api/admin/refresh", dependencies=[Depends(require_admin)])
+async def admin_refresh_status(request: Request):
+    return await payload_response(request, scheduler.COORDINATOR.status())
+
+# 16. 프로파일링 (관리자 전용, Authorization: Bearer <ADMIN_TOKEN>)
+# format: speedscope (JSON, speedscope.app) | collapsed (flamegraph.pl) | summary (모듈 / 서비스 함수별 시간)
+PROFILE_FORMAT = Query("speedscope", pattern="^(speedscope|collapsed|summary)$")
+
+def _profile_response(profile, fmt):
+    if fmt == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    return profile.render(fmt)
+
+# refresh 1회 실행 + 프로파일 (FIXTURE_MODE에서는 합성 데이터 그래프로 실행)
+@app.post("/api/admin/profile/refresh", dependencies=[Depends(require_admin)])
+def profile_refresh(
+    mode: str = Query("sampling", pattern="^(sampling|deterministic)$"),
+    format: str = PROFILE_FORMAT,
+):
+    try:
+        profile = profiler.profile_refresh(mode, offline=FIXTURE_MODE)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _profile_response(profile, format)
+
+# 지금부터 seconds초 동안 처리되는 요청 샘플링
+@app.post("/api/admin/profile/requests", dependencies=[Depends(require_admin)])
+async def profile_requests(
+    seconds: float = Query(10, gt=0, le=60),
+    format: str = PROFILE_FORMAT,
+):
+    try:
+        profile = await asyncio.to_thread(profiler.profile_window, seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _profile_response(profile, format)
@@ -0,0 +1,322 @@
+"""
+refresh / 요청 처리 프로파일링 (flamegraph 호환 출력)
+
+- sampling: 별도 스레드가 interval마다 모든 스레드의 Python 스택을 수집 (오버헤드 작음, 요청 처리 구간에도 사용)
+- deterministic: sys.setprofile로 모든 함수 호출/반환 시간을 기록 (정확하지만 느림, 측정 시작 후 생성된 스레드 + 현재 스레드만)
+
+출력 형식
+- collapsed: "frame;frame;frame weight" 한 줄씩 (flamegraph.pl / speedscope / inferno에서 열기)
+- speedscope: https://www.speedscope.app 에 바로 올릴 수 있는 JSON
+- summary: 모듈별 self time, 서비스 함수별 누적 time (pandas 등 라이브러리 시간은 그 함수를 부른 서비스 함수에 귀속)
+
+CLI 예)
+  python profiler.py --offline -o refresh.speedscope.json                 # 합성 데이터로 refresh 1회
+  python profiler.py --offline --fixtures raw_nodes.pkl --format summary  # 기록된 원천 데이터로 refresh 1회
+  python profiler.py --record raw_nodes.pkl                               # 실제 refresh 1회 실행 후 원천 데이터 기록
+"""
+import argparse
+import json
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+
+# 대기 중인 스레드의 최상단 프레임 (sampling에서 유휴 샘플로 분류)
+IDLE_FRAMES = {
+    ("threading.py", "wait"), ("selectors.py", "select"), ("queue.py", "get"),
+    ("thread.py", "_worker"), ("base_events.py", "_run_once"), ("threading.py", "_wait_for_tstate_lock"),
+}
+
+_profile_lock = threading.Lock()
+
+
+def _frame_key(code):
+    return (code.co_name, code.co_filename, code.co_firstlineno)
+
+
+def _module_of(filename):
+    """ 파일 경로 -> 모듈 구분 (backend 코드는 모듈 경로, 라이브러리는 패키지명) """
+    if filename.startswith(BACKEND_DIR):
+        rel = os.path.relpath(filename, BACKEND_DIR)
+        return rel[:-3].replace(os.sep, ".") if rel.endswith(".py") else rel
+    if "site-packages" in filename:
+        return filename.split("site-packages" + os.sep, 1)[1].split(os.sep, 1)[0].removesuffix(".py")
+    if filename.startswith(STDLIB_DIR):
+        return os.path.relpath(filename, STDLIB_DIR).removesuffix(".py").replace(os.sep, ".")
+    return "builtin" if filename == "~" else filename
+
+
+def _label(frame):
+    name, filename, line = frame
+    if filename == "~":
+        return f"{name} (builtin)"
+    return f"{name} ({_module_of(filename)}:{line})"
+
+
+class Profile:
+    """ 스택(루트 -> 말단 프레임 튜플)별 가중치 (sampling: 샘플 수 x interval ms, deterministic: self time ms) """
+
+    def __init__(self, name, mode):
+        self.name = name
+        self.mode = mode
+        self.stacks = Counter()
+        self.idle = 0.0
+        self.started = time.time()
+        self.duration_s = None
+        self.nodes = None         # refresh 프로파일: 그래프 노드별 상태 / 소요 시간
+
+    def add(self, stack, weight):
+        self.stacks[stack] += weight
+
+    # --- 출력 ---
+
+    def collapsed(self):
+        lines = [
+            ";".join(_label(f) for f in stack) + f" {max(1, round(weight * 1000))}"   # 정수 가중치 (마이크로초)
+            for stack, weight in self.stacks.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self):
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, weight in self.stacks.most_common():
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    name, filename, line = frame
+                    entry = {"name": _label(frame)}
+                    if filename != "~":
+                        entry.update({"file": filename, "line": line})
+                    frames.append(entry)
+                ids.append(index[frame])
+            samples.append(ids)
+            weights.append(round(weight, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "market-radar profiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.name} ({self.mode})",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def summary(self, top=20):
+        """ 모듈별 self time + 서비스 함수별 누적 time (ms) """
+        by_module = Counter()
+        by_service = Counter()
+        by_function = Counter()
+        for stack, weight in self.stacks.items():
+            by_module[_module_of(stack[-1][1])] += weight
+            # 가장 안쪽의 backend 코드 프레임 = 이 시간을 쓰게 만든 서비스 함수
+            owner = next((f for f in reversed(stack) if f[1].startswith(BACKEND_DIR)), None)
+            if owner is not None:
+                by_service[_module_of(owner[1])] += weight
+                by_function[_label(owner)] += weight
+
+        def ranked(counter):
+            return [{"name": k, "ms": round(v, 1)} for k, v in counter.most_common(top)]
+
+        return {
+            "name": self.name,
+            "mode": self.mode,
+            "duration_s": self.duration_s,
+            "total_ms": round(sum(self.stacks.values()), 1),
+            "idle_ms": round(self.idle, 1),
+            "self_by_module": ranked(by_module),
+            "by_service": ranked(by_service),
+            "by_service_function": ranked(by_function),
+            "nodes": self.nodes,
+        }
+
+    def render(self, fmt):
+        if fmt == "collapsed":
+            return self.collapsed()
+        if fmt == "speedscope":
+            return self.speedscope()
+        return self.summary()
+
+
+# --- Sampling ---
+
+class Sampler:
+    """ interval(초)마다 모든 스레드 스택 수집 (자기 자신 제외) """
+
+    def __init__(self, name, interval=0.005):
+        self.profile = Profile(name, "sampling")
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="profiler-sampler", daemon=True)
+
+    def _loop(self):
+        own = threading.get_ident()
+        weight = self.interval * 1000
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                top = frame.f_code
+                if (os.path.basename(top.co_filename), top.co_name) in IDLE_FRAMES:
+                    self.profile.idle += weight
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_key(frame.f_code))
+                    frame = frame.f_back
+                self.profile.add(tuple(reversed(stack)), weight)
+
+    def __enter__(self):
+        self._thread.start()
+        return self.profile
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.profile.duration_s = round(time.time() - self.profile.started, 2)
+
+
+# --- Deterministic ---
+
+class Tracer:
+    """ 함수 호출/반환마다 self time을 스택별로 누적 (현재 스레드 + 측정 중 새로 시작된 스레드) """
+
+    def __init__(self, name):
+        self.profile = Profile(name, "deterministic")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._active = False
+
+    def _callback(self, frame, event, arg):
+        if not self._active:
+            # 측정 종료 후에도 살아 있는 작업 스레드는 여기서 훅 해제
+            sys.setprofile(None)
+            return
+        now = time.perf_counter()
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        if event == "call":
+            stack.append([_frame_key(frame.f_code), now, 0.0])
+        elif event == "c_call":
+            stack.append([(getattr(arg, "__qualname__", str(arg)), "~", 0), now, 0.0])
+        elif stack:
+            # return / c_return / c_exception (측정 시작 전에 진입한 프레임의 반환은 stack이 비어 있어 무시)
+            frame_key, started, child = stack.pop()
+            total = now - started
+            if stack:
+                stack[-1][2] += total
+            key = tuple(f[0] for f in stack) + (frame_key,)
+            with self._lock:
+                if self._active:
+                    self.profile.add(key, (total - child) * 1000)
+
+    def __enter__(self):
+        self._active = True
+        threading.setprofile(self._callback)
+        sys.setprofile(self._callback)
+        return self.profile
+
+    def __exit__(self, *exc):
+        sys.setprofile(None)
+        threading.setprofile(None)
+        with self._lock:
+            self._active = False
+        self.profile.duration_s = round(time.time() - self.profile.started, 2)
+
+
+def profiler(name, mode="sampling", interval=0.005):
+    if mode == "deterministic":
+        return Tracer(name)
+    if mode == "sampling":
+        return Sampler(name, interval)
+    raise ValueError(f"지원하지 않는 모드: {mode} (sampling | deterministic)")
+
+
+# --- 실행 ---
+
+def profile_refresh(mode="sampling", offline=False, fixtures_path=None, interval=0.005):
+    """
+    refresh 1회를 프로파일링
+    offline=True: 외부 API 대신 기록된 원천 데이터(fixtures_path) 또는 합성 데이터로 새 그래프 실행 (DATA_STORE는 건드리지 않음)
+    """
+    import scheduler
+
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("이미 프로파일링 중입니다.")
+    try:
+        if offline:
+            import fixtures
+            graph = fixtures.offline_graph(fixtures_path)
+            with profiler("refresh (offline)", mode, interval) as profile:
+                graph.run()
+            profile.nodes = graph.stats()
+        else:
+            with profiler("refresh", mode, interval) as profile:
+                scheduler.update_all_data(source="profile")
+            profile.nodes = scheduler.REFRESH_GRAPH.stats()
+        return profile
+    finally:
+        _profile_lock.release()
+
+
+def profile_window(seconds, interval=0.005):
+    """ 지금부터 seconds초 동안 처리되는 요청 (모든 스레드) 샘플링 """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("이미 프로파일링 중입니다.")
+    try:
+        with Sampler(f"requests ({seconds}s)", interval) as profile:
+            time.sleep(seconds)
+        return profile
+    finally:
+        _profile_lock.release()
+
+
+def write_output(profile, fmt, path=None):
+    output = profile.render(fmt)
+    text = output if isinstance(output, str) else json.dumps(output, ensure_ascii=False, indent=None if fmt == "speedscope" else 2)
+    if path:
+        with open(path, "w") as f:
+            f.write(text)
+        print(f"💾 [Profiler] {path} ({len(text)} bytes)")
+    else:
+        print(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market Radar refresh 프로파일링")
+    parser.add_argument("--mode", choices=["sampling", "deterministic"], default="sampling")
+    parser.add_argument("--format", choices=["speedscope", "collapsed", "summary"], default="speedscope")
+    parser.add_argument("--interval", type=float, default=0.005, help="sampling 간격(초)")
+    parser.add_argument("--offline", action="store_true", help="외부 API 없이 기록된/합성 원천 데이터로 실행")
+    parser.add_argument("--fixtures", help="--offline에서 사용할 기록 파일 (생략 시 합성 데이터)")
+    parser.add_argument("--record", metavar="PATH", help="실제 refresh 1회 실행 후 원천 노드 값을 PATH에 기록하고 종료")
+    parser.add_argument("-o", "--output", help="결과 파일 (생략 시 stdout)")
+    args = parser.parse_args()
+
+    if args.record:
+        import fixtures
+        import scheduler
+        scheduler.update_all_data(source="record")
+        fixtures.record_raw_nodes(scheduler.REFRESH_GRAPH, args.record)
+        return 0
+
+    profile = profile_refresh(args.mode, args.offline, args.fixtures, args.interval)
+    write_output(profile, args.format, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
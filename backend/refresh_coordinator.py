@@ -0,0 +1,130 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# refresh 실행 조정 (한 번에 refresh 1개만 실행)
+# - 기동 직후 초기 refresh / 20분 주기 작업 / 관리자 수동 요청이 겹쳐도 외부 API 조회와 DATA_STORE 반영은 동시에 일어나지 않음
+# - 실행 중인 refresh가 요청한 데이터셋을 이미 포함하면 새로 실행하지 않고 그 실행에 합류 (coalesced)
+# - 포함하지 않으면 끝난 뒤 1회 더 실행 (그동안 들어온 요청은 데이터셋을 합쳐 1회로, queued)
+# - 수동 요청은 debounce: 같은 데이터셋을 포함하는 refresh가 debounce초 안에 시작됐으면 그 결과를 돌려줌 (debounced)
+
+
+class RefreshRun:
+    """ refresh 실행 1회 (keys=None이면 전체 데이터셋) """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, keys, force, source):
+        self.id = next(self._ids)
+        self.keys = keys
+        self.force = force
+        self.sources = [source]
+        self.requested_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def covers(self, keys, force):
+        """ 이 실행이 요청(keys, force)을 포함하는지 (force 요청은 force 실행만 포함) """
+        if force and not self.force:
+            return False
+        return self.keys is None or (keys is not None and keys <= self.keys)
+
+    def merge(self, keys, force, source):
+        self.keys = None if self.keys is None or keys is None else self.keys | keys
+        self.force = self.force or force
+        self.sources.append(source)
+
+    def describe(self):
+        return {
+            "id": self.id,
+            "keys": sorted(self.keys) if self.keys is not None else None,
+            "force": self.force,
+            "sources": list(self.sources),
+            "requested_at": self.requested_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_ms": round((self.finished_at - self.started_at) * 1000, 1) if self.finished_at else None,
+            "changed": self.result,
+            "error": self.error,
+        }
+
+
+class RefreshCoordinator:
+    def __init__(self, refresh, history=20):
+        self._refresh = refresh            # refresh(keys, force) -> 바뀐 데이터셋 키 목록
+        self._lock = threading.Lock()
+        self._current = None               # 실행 중
+        self._next = None                  # 실행 중 refresh가 끝난 뒤 실행할 요청 (합친 것)
+        self._last = None                  # 가장 최근에 시작한 실행 (debounce 기준)
+        self._history = deque(maxlen=history)
+
+    def trigger(self, keys=None, force=False, source="manual", debounce=0):
+        """
+        refresh 요청 -> (RefreshRun, 상태) (기다리지 않음)
+        상태: "started" / "coalesced" (실행 중인 refresh에 합류) / "queued" (실행 중 refresh 이후 1회) / "debounced"
+        """
+        keys = frozenset(keys) if keys else None
+        with self._lock:
+            current = self._current
+            if current is not None and current.covers(keys, force):
+                current.sources.append(source)
+                return current, "coalesced"
+            if self._next is not None and self._next.covers(keys, force):
+                self._next.sources.append(source)
+                return self._next, "coalesced"
+            last = self._last
+            if debounce and last is not None and last.covers(keys, force) and time.time() - last.started_at < debounce:
+                return last, "debounced"
+            if current is not None:
+                if self._next is None:
+                    self._next = RefreshRun(keys, force, source)
+                else:
+                    self._next.merge(keys, force, source)
+                return self._next, "queued"
+            run = self._current = self._last = RefreshRun(keys, force, source)
+            run.started_at = time.time()
+        threading.Thread(target=self._execute, args=(run,), name="refresh", daemon=True).start()
+        return run, "started"
+
+    def run(self, keys=None, force=False, source="schedule"):
+        """ refresh 요청 후 완료까지 대기 (실행 중인 refresh에 합류한 경우 그 실행 완료까지) -> RefreshRun """
+        run, state = self.trigger(keys, force, source)
+        if state != "started":
+            logger.info(f"🔗 [Refresh] {source} request {state} into run #{run.id}")
+        run.done.wait()
+        return run
+
+    def _execute(self, run):
+        while run is not None:
+            logger.info(f"🚦 [Refresh] run #{run.id} started ({', '.join(run.sources)}; keys={run.describe()['keys'] or 'all'})")
+            try:
+                run.result = self._refresh(run.keys, run.force)
+            except Exception as e:
+                run.error = str(e)
+                logger.error(f"❌ [Refresh] run #{run.id} failed: {e}")
+            run.finished_at = time.time()
+            with self._lock:
+                self._history.append(run)
+                # 실행 중 들어온 요청이 있으면 이어서 실행
+                following, self._next = self._next, None
+                self._current = following
+                if following is not None:
+                    following.started_at = time.time()
+                    self._last = following
+            run.done.set()
+            run = following
+
+    def status(self):
+        with self._lock:
+            return {
+                "running": self._current.describe() if self._current else None,
+                "queued": self._next.describe() if self._next else None,
+                "recent": [run.describe() for run in reversed(self._history)],
+            }
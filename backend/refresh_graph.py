@@ -0,0 +1,247 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+
+from services import provider_service
+
+logger = logging.getLogger(__name__)
+
+# 데이터 갱신을 DAG(의존성 그래프)로 실행
+# - raw 노드: 외부 API 원천 조회 (ECOS 817Y002/010200000, FRED DGS10, Yahoo ^GSPC 등)
+# - derived 노드: raw(또는 다른 derived) 노드 값으로 계산되는 결과 (credit spread, yield gap 등)
+# derived 노드는 입력 노드들의 content hash가 바뀐 경우에만 다시 계산
+# 실패 / 시간 초과 / Mock Data fallback 시에는 마지막 정상 값(last-known-good)을 유지
+# 시간 초과된 노드가 나중에 끝나 값을 바꾸면 다음 run()에서 반환 (마지막으로 반환한 해시와 비교)
+
+
+def content_hash(value):
+    """ 노드 값의 내용 기반 해시 (값이 없으면 None) """
+    if value is None:
+        return None
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        h = hashlib.sha1(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        if isinstance(value, pd.DataFrame):
+            # 컬럼 구성도 내용의 일부
+            h.update(repr(list(value.columns)).encode())
+        return h.hexdigest()
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _is_empty(value):
+    if value is None:
+        return True
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return value.empty
+    return False
+
+
+class Node:
+    def __init__(self, name, func, deps=(), kind="raw", ttl=0, publish=None, priority="normal"):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.kind = kind
+        self.ttl = ttl            # raw 노드: 마지막 성공 후 이 시간(초) 동안은 재조회하지 않음
+        self.publish = publish    # derived 노드: 결과를 기록할 DATA_STORE 키
+        self.priority = priority  # raw 노드: 외부 요청 우선순위 (provider_service.PRIORITIES)
+
+        # 실행 상태 (마지막 성공 값 유지)
+        self.value = None
+        self.hash = None
+        self.input_hashes = None
+        self.published_hash = None  # run()이 마지막으로 반환한 값의 해시 (publish 노드)
+        self.last_success = None
+        self.last_changed = None
+        self.fallback = False     # 현재 값이 Mock Data fallback 결과인지
+        self.running = False      # 이전 refresh에서 시간 초과 후 아직 실행 중인지
+        self.stats = {"status": "pending", "duration_ms": None, "queue_ms": None, "last_run": None, "error": None}
+
+
+class RefreshGraph:
+    def __init__(self, max_workers=8):
+        self.nodes = {}
+        self.max_workers = max_workers
+        self._run_lock = threading.Lock()
+        self._commit_lock = threading.Lock()   # 시간 초과 후에도 실행 중인 노드의 기록 <-> run() 반환
+
+    def raw(self, name, func, ttl=0, priority="normal"):
+        """ 원천 조회 노드 등록 (func() -> 값, 빈 값이면 실패로 보고 이전 값 유지) """
+        return self._add(Node(name, func, kind="raw", ttl=ttl, priority=priority))
+
+    def derived(self, name, func, deps, publish=None):
+        """ 파생 노드 등록 (func(*deps 값) -> 결과) """
+        return self._add(Node(name, func, deps=deps, kind="derived", publish=publish))
+
+    def _add(self, node):
+        if node.name in self.nodes:
+            raise ValueError(f"중복 노드: {node.name}")
+        missing = [d for d in node.deps if d not in self.nodes]
+        if missing:
+            # 의존 노드를 먼저 등록해야 하므로 순환이 생길 수 없음
+            raise ValueError(f"{node.name}: 등록되지 않은 의존 노드 {missing}")
+        self.nodes[node.name] = node
+        return node
+
+    # --- 실행 ---
+
+    def _run_node(self, node, deadline=None, force=False):
+        started = time.perf_counter()
+        now = time.time()
+        status, error = None, None
+        node.running = True
+        # 이 스레드의 모든 외부 요청 timeout을 refresh 남은 시간으로 제한
+        provider_service.set_deadline(deadline)
+        provider_service.set_priority(node.priority)
+        provider_service.reset_fallback()
+        provider_service.reset_queue_wait()
+        try:
+            if node.kind == "raw":
+                if not force and node.value is not None and now - node.last_success < node.ttl:
+                    status = "fresh"
+                else:
+                    value = node.func()
+                    if _is_empty(value):
+                        raise ValueError("빈 응답")
+                    status = self._commit(node, value, now)
+            else:
+                input_hashes = tuple(self.nodes[d].hash for d in node.deps)
+                if node.input_hashes is not None and input_hashes == node.input_hashes:
+                    status = "skipped"
+                else:
+                    value = node.func(*(self.nodes[d].value for d in node.deps))
+                    if provider_service.fallback_used() and node.value is not None and not node.fallback:
+                        # Mock Data로 정상 값을 덮어쓰지 않음
+                        status = "fallback_kept"
+                    else:
+                        status = self._commit(node, value, now)
+                        node.fallback = provider_service.fallback_used()
+                    node.input_hashes = input_hashes
+        except Exception as e:
+            status, error = "failed", str(e)
+        finally:
+            node.running = False
+            provider_service.set_deadline(None)
+            provider_service.set_priority(None)
+
+        node.stats = {
+            "status": status,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "queue_ms": round(provider_service.queue_wait() * 1000, 1),   # 요청 예산 대기열에서 기다린 시간
+            "last_run": now,
+            "error": error,
+        }
+        if status == "failed":
+            logger.error(f"❌ [Graph] {node.name} failed ({node.stats['duration_ms']}ms): {error}")
+        else:
+            logger.info(f"✅ [Graph] {node.name} {status} ({node.stats['duration_ms']}ms)")
+        return status
+
+    def _commit(self, node, value, now):
+        new_hash = content_hash(value)
+        with self._commit_lock:
+            changed = new_hash != node.hash or node.value is None
+            node.value = value
+            node.hash = new_hash
+        node.last_success = now
+        if changed:
+            node.last_changed = now
+            return "changed"
+        return "unchanged"
+
+    def _mark(self, name, status):
+        self.nodes[name].stats = {**self.nodes[name].stats, "status": status, "last_run": time.time()}
+
+    def upstream(self, targets):
+        """ publish 키 목록 -> 그 결과를 만드는 노드 + 의존 노드 전체 (전이적) 이름 집합 """
+        stack = [name for name, node in self.nodes.items() if node.publish in targets]
+        selected = set()
+        while stack:
+            name = stack.pop()
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.nodes[name].deps)
+        return selected
+
+    def run(self, timeout=None, targets=None, force=False):
+        """
+        의존성 순서대로 전체 그래프 실행 (의존 노드가 끝나는 즉시 다음 노드 투입)
+        timeout(초)이 지나면 대기 중인 노드는 취소하고, 실행 중인 노드의 외부 요청은 남은 시간 안에서 끝나도록 제한
+        targets: publish 키 목록이면 그 데이터셋에 필요한 노드만 실행 / force: raw 노드 ttl 무시하고 재조회
+        반환: 마지막 반환 이후 값이 바뀐 publish 노드의 {publish 키: 값}
+        (이번 실행에서 바뀐 노드 + 이전 실행에서 시간 초과 후 늦게 끝나 바뀐 노드)
+        """
+        with self._run_lock:
+            deadline = time.monotonic() + timeout if timeout else None
+            selected = self.upstream(targets) if targets is not None else self.nodes
+            pending = {name: set(node.deps) for name, node in self.nodes.items() if name in selected}
+            done = set()
+            statuses = {}
+            running = {}
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+            def submit_ready():
+                # 실행 가능한 노드는 우선순위 순으로 투입 (Market Pulse 등 먼저)
+                ready = [n for n, deps in pending.items() if deps <= done]
+                for name in sorted(ready, key=lambda n: provider_service.PRIORITIES[self.nodes[n].priority]):
+                    del pending[name]
+                    node = self.nodes[name]
+                    if node.running:
+                        # 지난 refresh에서 시간 초과된 노드가 아직 끝나지 않음 -> 이전 값 그대로 사용
+                        statuses[name] = "busy"
+                        self._mark(name, "busy")
+                        done.add(name)
+                        continue
+                    running[executor.submit(self._run_node, node, deadline, force)] = name
+
+            try:
+                submit_ready()
+                while running:
+                    left = None if deadline is None else max(0, deadline - time.monotonic())
+                    finished, _ = wait(running, timeout=left, return_when=FIRST_COMPLETED)
+                    if not finished:
+                        logger.warning(f"⏰ [Graph] refresh deadline ({timeout}s) exceeded: "
+                                       f"{len(running)} running, {len(pending)} pending cancelled")
+                        for name in running.values():
+                            statuses[name] = "timeout"
+                            self._mark(name, "timeout")
+                        for name in pending:
+                            statuses[name] = "cancelled"
+                            self._mark(name, "cancelled")
+                        break
+                    for future in finished:
+                        name = running.pop(future)
+                        statuses[name] = future.result()
+                        done.add(name)
+                    submit_ready()
+            finally:
+                # 시간 초과 시 남은 작업을 기다리지 않음
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            updates = {}
+            with self._commit_lock:
+                for node in self.nodes.values():
+                    if node.publish and node.value is not None and node.hash != node.published_hash:
+                        updates[node.publish] = node.value
+                        node.published_hash = node.hash
+            return updates
+
+    def stats(self):
+        """ 노드별 최근 실행 상태 / 소요 시간 (느린 노드 순) """
+        rows = []
+        for node in self.nodes.values():
+            rows.append({
+                "node": node.name,
+                "kind": node.kind,
+                "deps": list(node.deps),
+                **node.stats,
+                "last_success": node.last_success,
+                "last_changed": node.last_changed,
+                "fallback": node.fallback,
+                "hash": node.hash,
+            })
+        return sorted(rows, key=lambda r: r["duration_ms"] or 0, reverse=True)
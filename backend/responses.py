@@ -0,0 +1,200 @@
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+
+import os
+from datetime import datetime
+
+import scheduler
+import store
+from history import HISTORY, KST
+from services import export_service
+
+# API 응답 공통 처리 (Accept 헤더 기반 content negotiation)
+# - application/vnd.apache.arrow.stream       -> Arrow IPC stream (DATA_STORE 데이터셋만)
+# - application/msgpack                       -> MessagePack (JSON과 같은 구조)
+# - application/msgpack; layout=columnar      -> MessagePack, 행 목록은 열 단위 + 숫자 열은 float64 배열
+# - application/x-ndjson (application/jsonl)  -> NDJSON 스트리밍 (한 줄에 1행)
+# - application/json; stream=chunked          -> 일반 JSON과 같은 본문을 행 단위 청크로 스트리밍
+# - 그 외                                      -> JSON (기존 동작)
+#
+# 큰 응답의 직렬화는 이벤트 루프 밖(스레드풀)에서 실행 (단일 worker에서 다른 요청이 밀리지 않도록)
+# - 행 수가 OFFLOAD_ROWS 이상이면 render_*를 스레드풀에서 실행, 작은 응답 / publish 시 미리 직렬화한 snapshot은 바로 전송
+# - async 라우트는 dataset_response / export_response / payload_response (await),
+#   def 라우트(이미 스레드풀에서 실행)는 render_* 를 직접 호출
+
+OFFLOAD_ROWS = int(os.getenv("OFFLOAD_ROWS", "500"))
+
+# 스레드풀로 넘긴 응답 수 / 행 수 (/healthz)
+OFFLOAD_STATS = {"responses": 0, "rows": 0}
+
+
+def estimate_rows(value, depth=3):
+    """ 응답 크기 추정 (목록 길이 합, dict는 depth 단계까지만 확인 -> 큰 응답도 바로 계산) """
+    if isinstance(value, list):
+        return len(value)
+    if isinstance(value, dict) and depth:
+        return sum(estimate_rows(v, depth - 1) for v in value.values())
+    return 0
+
+
+async def _offload(rows, render, *args):
+    """ rows가 기준 이상이면 render(*args)를 스레드풀에서, 아니면 바로 실행 """
+    if rows < OFFLOAD_ROWS:
+        return render(*args)
+    OFFLOAD_STATS["responses"] += 1
+    OFFLOAD_STATS["rows"] += rows
+    return await run_in_threadpool(render, *args)
+
+
+def _accept_entries(request: Request):
+    """ Accept 헤더 -> [(media_type, {파라미터})] """
+    entries = []
+    for part in request.headers.get("accept", "").split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        options = dict(p.split("=", 1) for p in params if "=" in p)
+        entries.append((media_type.lower(), {k.strip().lower(): v.strip() for k, v in options.items()}))
+    return entries
+
+
+def negotiate(request: Request):
+    """ 요청이 원하는 표현: "arrow" / "msgpack" / "msgpack_packed" / "ndjson" / "json_stream" / None(JSON) """
+    for media_type, options in _accept_entries(request):
+        if media_type == export_service.ARROW_STREAM_MEDIA_TYPE:
+            return "arrow"
+        if media_type in export_service.MSGPACK_MEDIA_TYPES:
+            return "msgpack_packed" if options.get("layout") == "columnar" else "msgpack"
+        if media_type in export_service.NDJSON_MEDIA_TYPES:
+            return "ndjson"
+        if media_type == "application/json" and options.get("stream") == "chunked":
+            return "json_stream"
+    return None
+
+
+def stream_response(value, fmt, headers=None):
+    """
+    NDJSON / chunked JSON 스트리밍 응답 (청크 단위 인코딩, 전체 본문을 만들지 않음)
+    행 목록이 아닌 값(상태 조회 등)의 NDJSON 요청은 일반 JSON으로 응답 (스트리밍 도중 실패하지 않도록 헤더 전송 전에 확인)
+    """
+    if fmt == "ndjson" and not export_service.has_rows(value):
+        return Response(content=store.serialize(jsonable_encoder(value)), media_type="application/json",
+                        headers={"Vary": "Accept", **(headers or {})})
+    if fmt == "ndjson":
+        return StreamingResponse(
+            export_service.iter_ndjson(value),
+            media_type=export_service.NDJSON_MEDIA_TYPES[0],
+            headers={"Vary": "Accept", **(headers or {})},
+        )
+    return StreamingResponse(
+        export_service.iter_json(value),
+        media_type="application/json",
+        headers={"Vary": "Accept", **(headers or {})},
+    )
+
+
+def _media_type(fmt):
+    if fmt == "arrow":
+        return export_service.ARROW_STREAM_MEDIA_TYPE
+    if fmt == "parquet":
+        return export_service.PARQUET_MEDIA_TYPE
+    return export_service.MSGPACK_MEDIA_TYPES[0]
+
+
+def _check_available(fmt):
+    if not export_service.available(fmt):
+        raise HTTPException(status_code=503, detail=f"{fmt} 변환에 필요한 라이브러리가 설치되어 있지 않습니다.")
+
+
+def _generation(key, as_of):
+    """ as_of 시점의 세대 -> (값, 응답 헤더) """
+    if key not in scheduler.DATA_STORE:
+        raise HTTPException(status_code=404, detail=f"알 수 없는 데이터셋: {key}")
+    try:
+        generation = HISTORY.resolve(key, as_of)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    headers = {
+        "X-Data-Version": str(generation.version),
+        "X-As-Of": datetime.fromtimestamp(generation.at, KST).isoformat(timespec="seconds"),
+        "Vary": "Accept",
+    }
+    return generation.value(), headers
+
+
+def render_export(key, fmt, as_of=None):
+    """ 데이터셋을 바이너리 응답으로 (refresh 버전 단위 캐시, as_of 조회는 캐시 없음) """
+    if key not in scheduler.DATA_STORE:
+        raise HTTPException(status_code=404, detail=f"알 수 없는 데이터셋: {key}")
+    _check_available(fmt)
+
+    if as_of:
+        value, headers = _generation(key, as_of)
+        return Response(content=export_service.serialize(key, value, fmt), media_type=_media_type(fmt), headers=headers)
+
+    version = scheduler.DATA_VERSION.get(key, 0)
+    payload = export_service.export(key, scheduler.DATA_STORE[key], version, fmt)
+    return Response(
+        content=payload,
+        media_type=_media_type(fmt),
+        headers={"X-Data-Version": str(version), "Vary": "Accept"},
+    )
+
+
+def render_dataset(request: Request, key, as_of=None):
+    """ DATA_STORE[key]를 요청한 표현(JSON / Arrow / MessagePack)으로 반환 (as_of: 과거 시점 값) """
+    fmt = negotiate(request)
+    if as_of:
+        if fmt in ("ndjson", "json_stream"):
+            value, headers = _generation(key, as_of)
+            return stream_response(value, fmt, headers)
+        if fmt is not None:
+            return render_export(key, fmt, as_of)
+        value, headers = _generation(key, as_of)
+        return Response(content=store.serialize(value), media_type="application/json", headers=headers)
+    if fmt in ("ndjson", "json_stream"):
+        headers = {"X-Data-Version": str(scheduler.DATA_VERSION.get(key, 0))}
+        return stream_response(scheduler.DATA_STORE[key], fmt, headers)
+    if fmt is not None:
+        return render_export(key, fmt)
+    snapshot = scheduler.SNAPSHOTS.get(key)
+    if snapshot is None:
+        # 아직 refresh 전 (초기 빈 값)
+        return scheduler.DATA_STORE[key]
+    # publish 시 미리 직렬화한 JSON 그대로 전송
+    version, payload = snapshot
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers={"X-Data-Version": str(version), "Vary": "Accept"},
+    )
+
+
+def render_payload(request: Request, payload, headers=None):
+    """ DATA_STORE 밖의 응답(상태 조회, on-demand 계산 등)도 MessagePack 요청이면 변환 (캐시 없음) """
+    fmt = negotiate(request)
+    if fmt in ("ndjson", "json_stream"):
+        return stream_response(jsonable_encoder(payload), fmt, headers)
+    if fmt not in ("msgpack", "msgpack_packed"):
+        # FastAPI 기본 직렬화는 라우트 밖(이벤트 루프)에서 실행되므로 여기서 JSON 바이트까지 만듦
+        return Response(content=store.serialize(jsonable_encoder(payload)), media_type="application/json", headers=headers)
+    _check_available(fmt)
+    content = export_service.to_msgpack(jsonable_encoder(payload), packed=(fmt == "msgpack_packed"))
+    return Response(content=content, media_type=_media_type(fmt), headers={"Vary": "Accept", **(headers or {})})
+
+
+async def dataset_response(request: Request, key, as_of=None):
+    """ render_dataset (JSON snapshot은 바로 전송, 그 외 큰 데이터셋은 스레드풀에서 변환) """
+    if not as_of and negotiate(request) is None and key in scheduler.SNAPSHOTS:
+        return render_dataset(request, key)
+    return await _offload(estimate_rows(scheduler.DATA_STORE.get(key)), render_dataset, request, key, as_of)
+
+
+async def export_response(key, fmt, as_of=None):
+    return await _offload(estimate_rows(scheduler.DATA_STORE.get(key)), render_export, key, fmt, as_of)
+
+
+async def payload_response(request: Request, payload, headers=None):
+    return await _offload(estimate_rows(payload), render_payload, request, payload, headers)
@@ -1,11 +1,20 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+import os
+import time
+import pandas as pd
 
 # Services
-from services import stock_service, macro_service, bond_service, analysis_service
+from services import stock_service, macro_service, bond_service, analysis_service, series_service, memory_service, correlation_service, indicator_service, breadth_service
+from refresh_graph import RefreshGraph
+from refresh_coordinator import RefreshCoordinator
+import store
+from history import HISTORY
+from alerts import ALERTS
+from watchlists import WATCHLISTS
+from indicators import REGISTRY, merge_spec, series_node
 
 # Configure Logging
 class PyKrxFilter(logging.Filter):
@@ -31,48 +40,373 @@ DATA_STORE = {
     "credit_spread": [],
     "yield_gap": {},
     "rate_spread": [],
-    "us_rate_spread": []
+    "us_rate_spread": [],
+    "correlation": {},
+    "kospi_breadth": {},
+    "credit_curve": {}
 }
 
-def _fetch_task(name, func, *args):
-    """개별 서비스 호출을 래핑하여 (key, result) 튜플을 반환"""
+# 설정 파일로 선언한 지표 (indicators.json, 기존 데이터셋과 키가 겹치면 제외)
+INDICATORS = []
+for _indicator in REGISTRY.indicators:
+    if _indicator.key in DATA_STORE:
+        logger.error(f"❌ [Indicators] {_indicator.key}: 기존 데이터셋과 키가 겹쳐 제외")
+        continue
+    INDICATORS.append(_indicator)
+    DATA_STORE[_indicator.key] = {}
+INDICATOR_PLAN = REGISTRY.fetch_plan(INDICATORS)
+
+# 데이터셋별 버전 (DATA_STORE[key]가 바뀔 때마다 증가, 공유 저장소 사용 시 인스턴스 간 동일)
+# 응답 직렬화 결과(Arrow / Parquet 등)는 이 버전 단위로 캐시 -> refresh당 1회만 생성
+DATA_VERSION = {key: 0 for key in DATA_STORE}
+
+# 데이터셋별 (버전, JSON 직렬화 결과) (publish 시 1회 생성, JSON 응답은 이 바이트를 그대로 전송)
+SNAPSHOTS = {}
+
+# 데이터셋별 마지막 반영 시각 (publish / 공유 저장소 sync, health.py 신선도 판단용)
+PUBLISHED_AT = {}
+
+# 저장소 (STORE_URL 없으면 프로세스 내 MemoryStore, redis://...면 인스턴스 간 공유)
+STORE = store.from_env()
+if not STORE.shared:
+    # 프로세스 내 저장소는 버전이 1부터 다시 시작 -> HISTORY_DIR에서 다시 읽은 마지막 세대 다음 번호부터
+    STORE.continue_from(HISTORY.last_versions())
+
+# 버전 번호의 기준 (클라이언트 캐시는 (VERSION_EPOCH, 버전)이 같을 때만 재사용)
+# - 공유 저장소: 인스턴스 / 재시작과 관계없이 같은 버전 -> "shared"
+# - HISTORY_DIR: 재시작 후에도 버전이 이어지므로(continue_from) 보관한 값 재사용 -> 배포해도 클라이언트 캐시 유지
+# - 그 외: 재시작하면 버전이 1부터 다시 시작 -> 기동 시각으로 구분
+VERSION_EPOCH = "shared" if STORE.shared else HISTORY.epoch() or str(int(time.time()))
+
+# leader lock 유지 시간 (refresh 주기 20분 + 여유) / 다른 인스턴스 결과 확인 주기
+LEADER_TTL = float(os.getenv("LEADER_TTL_SECONDS", "1500"))
+STORE_SYNC_SECONDS = int(os.getenv("STORE_SYNC_SECONDS", "15"))
+
+def _apply(key, value, version, payload, leader=True):
+    DATA_STORE[key] = value
+    DATA_VERSION[key] = version
+    SNAPSHOTS[key] = (version, payload)
+    PUBLISHED_AT[key] = time.time()
+    # 세대 기록 (as_of 조회용) + 새로 들어온 행만 알림 규칙 평가 (webhook은 refresh를 실행한 인스턴스만)
     try:
-        result = func(*args)
-        logger.info(f"✅ [Scheduler] {name} updated")
-        return (name, result)
+        entry = HISTORY.record(key, version, value)
+        ALERTS.evaluate(key, entry["upserts"], deliver_webhooks=leader)
     except Exception as e:
-        logger.error(f"❌ [Scheduler] {name} failed: {e}")
-        return (name, None)
+        logger.error(f"❌ [History] {key} 기록 / 알림 평가 실패: {e}")
+
+def publish(key, value):
+    """ 저장소에 snapshot 기록 + DATA_STORE 갱신 + 버전 증가 """
+    payload = store.serialize(value)
+    try:
+        version = STORE.put(key, payload)
+    except Exception as e:
+        # 공유 저장소 장애 시에도 이 인스턴스의 응답은 갱신
+        logger.error(f"❌ [Store] {key} 저장 실패: {e}")
+        version = DATA_VERSION.get(key, 0) + 1
+    _apply(key, value, version, payload)
+
+def sync_from_store():
+    """ 공유 저장소에서 버전이 바뀐 데이터셋만 받아와 DATA_STORE에 반영 (다른 인스턴스가 refresh한 결과) """
+    if not STORE.shared:
+        return 0
+    try:
+        remote = STORE.versions(list(DATA_STORE))
+        changed = 0
+        for key, version in remote.items():
+            if version <= DATA_VERSION.get(key, 0):
+                continue
+            entry = STORE.get(key)
+            if entry is None:
+                continue
+            version, payload = entry
+            _apply(key, store.deserialize(payload), version, payload, leader=False)
+            changed += 1
+        if changed:
+            logger.info(f"📥 [Store] {changed} datasets synced from shared store")
+        return changed
+    except Exception as e:
+        logger.error(f"❌ [Store] sync failed: {e}")
+        return 0
+
+def _spec_start(spec, now_kst):
+    """ 조회 구간 {"start"} / {"days"} -> 시작일 (둘 다 있으면 더 이른 날) """
+    candidates = []
+    if spec.get("start") is not None:
+        candidates.append(pd.Timestamp(spec["start"]))
+    if spec.get("days"):
+        candidates.append(pd.Timestamp((now_kst - timedelta(days=spec["days"])).date()))
+    return min(candidates)
+
+def _ecos(stat_code, item_code, days=None, start=None, limit=20000, cycle="D"):
+    """
+    ECOS raw 노드용 조회 함수 (조회 구간은 실행 시점 기준으로 계산)
+    SERIES_DIR(backfill.py 결과)에 이어진 이력이 있으면 최근 구간만 조회
+    """
+    def fetch():
+        now_kst = analysis_service.kst_now()
+        end_str = series_service.ecos_period(now_kst, cycle)
+        return series_service.fetch_incremental(
+            series_node(f"ecos:{stat_code}/{item_code}", cycle), _spec_start({"start": start, "days": days}, now_kst),
+            lambda since: series_service.fetch_ecos(stat_code, item_code, series_service.ecos_period(since, cycle), end_str,
+                                                    cycle=cycle, limit=limit, store=False),
+        )
+    return fetch
+
+def _fetch_bulk(starts, fetch, in_memory=False):
+    """
+    여러 시계열을 요청 1회로 받는 raw 노드 공통 (starts: {열: (저장소 키, 시작일)}, fetch(시작일) -> 날짜 x 열 DataFrame)
+    SERIES_DIR(backfill.py 결과)에 모든 열의 이력이 있으면 가장 이른 마지막 날짜 - overlap 이후만 조회해 이어붙임
+    in_memory: SERIES_DIR 없이도 이전 refresh가 저장소에 남긴 시계열로 이어받음
+    """
+    start = min(s for _, s in starts.values())
+    stored = {col: series_service.SERIES_STORE.get(key) for col, (key, _) in starts.items()}
+    if not (series_service.SERIES_DIR or in_memory) or any(
+        entry is None or entry["series"].index.min() > starts[col][1] + timedelta(days=series_service.COVERAGE_SLACK_DAYS)
+        for col, entry in stored.items()
+    ):
+        return fetch(start)
+
+    resume = min(entry["series"].index.max() for entry in stored.values()) - timedelta(days=series_service.INCREMENTAL_OVERLAP_DAYS)
+    recent = fetch(max(resume, start))
+    if recent.empty:
+        return recent
+    return pd.DataFrame({
+        col: series_service.merge_series(stored[col]["series"], recent[col].dropna()) if col in recent else stored[col]["series"]
+        for col in starts
+    })
+
+def _bulk_column(key, column, spec):
+    """ 일괄 조회 결과에서 시계열 하나를 조회 구간만큼 잘라냄 (해당 열이 바뀐 경우에만 하위 노드 재계산) """
+    def select(bulk):
+        if bulk is None or column not in bulk:
+            return pd.Series(dtype=float)
+        series = bulk[column].dropna().loc[_spec_start(spec, analysis_service.kst_now()):]
+        series_service.store_series(key, series)
+        if series_service.SERIES_DIR and not series.empty:
+            series_service.save_series(key, series)
+        return series
+    return select
+
+def _ecos_table(stat_code, cycle, items):
+    """
+    ECOS 통계표 raw 노드: 선언한 항목 전체를 요청 1회로 조회 (items: {항목: 조회 구간})
+    응답에는 쓰지 않는 항목까지 모두 들어 있으므로 SERIES_DIR가 없어도 두 번째 refresh부터는 최근 구간만 조회
+    """
+    def fetch():
+        now_kst = analysis_service.kst_now()
+        starts = {item: (series_node(f"ecos:{stat_code}/{item}", cycle), _spec_start(spec, now_kst)) for item, spec in items.items()}
+        return _fetch_bulk(starts, lambda since: series_service.fetch_ecos_table(
+            stat_code, series_service.ecos_period(since, cycle), series_service.ecos_period(now_kst, cycle), cycle, items=list(items),
+        ), in_memory=True)
+    # 합성 데이터(fixtures.offline_graph)가 항목별 값으로 표를 만들 때 사용
+    fetch.columns = {item: series_node(f"ecos:{stat_code}/{item}", cycle) for item in items}
+    return fetch
+
+# FRED series별 조회 구간 (일수 또는 시작일) -> 전체를 CSV 요청 1회로 받은 뒤 series별로 나눠 씀
+FRED_SERIES = {
+    "DGS10": {"days": 1825},
+    "CPIAUCSL": {"start": macro_service.MACRO_START},
+    "UNRATE": {"start": macro_service.MACRO_START},
+    "DFEDTARU": {"days": analysis_service.RATE_SPREAD_DAYS},
+    "DFF": {"days": analysis_service.RATE_SPREAD_DAYS},
+}
+# 기존 데이터셋 입력의 원래 조회 구간 (지표 선언으로 조회 구간이 넓어져도 기존 계산은 이 구간만 사용, _builtin_input)
+BUILTIN_SPANS = {f"fred:{sid}": dict(spec) for sid, spec in FRED_SERIES.items()}
+# 선언한 지표의 FRED 시계열도 같은 요청에 포함 (이미 있는 series는 조회 구간만 넓힘)
+for _series_id, _spec in INDICATOR_PLAN["fred"].items():
+    FRED_SERIES[_series_id] = merge_spec(FRED_SERIES.get(_series_id), {k: v for k, v in _spec.items() if k != "ttl"})
+
+def _fred_bulk():
+    """
+    FRED raw 노드: FRED_SERIES 전체를 한 번에 조회 (가장 이른 시작일 기준)
+    SERIES_DIR(backfill.py 결과)에 모든 series 이력이 있으면 가장 이른 마지막 날짜 - overlap 이후만 조회해 이어붙임
+    """
+    now_kst = analysis_service.kst_now()
+    starts = {sid: (f"fred:{sid}", _spec_start(spec, now_kst)) for sid, spec in FRED_SERIES.items()}
+    return _fetch_bulk(starts, lambda start: macro_service.get_fred_bulk(list(FRED_SERIES), start))
+
+# ECOS 817Y002(시장금리 일별) 항목별 조회 구간 -> 통계표 전체를 요청 1회로 받은 뒤 항목별 / 신용 곡선 노드로 나눠 씀
+# (국고채 10년: Yield Gap, 콜금리: Rate Spread, 국고채 / 회사채: Credit Spread / 신용 곡선)
+MARKET_RATE_ITEMS = {
+    "010210000": {"days": 1825, "ttl": 3600},
+    "010101000": {"days": analysis_service.RATE_SPREAD_DAYS, "ttl": 86400},
+}
+for _item, _rating, _tenor in bond_service.CREDIT_CURVE_ITEMS.values():
+    MARKET_RATE_ITEMS[_item] = {"start": bond_service.CREDIT_SPREAD_START, "ttl": 86400}
+BUILTIN_SPANS.update({f"ecos:817Y002/{item}": dict(spec) for item, spec in MARKET_RATE_ITEMS.items()})
+# 선언한 지표의 817Y002 항목도 같은 요청에 포함 (이미 있는 항목은 조회 구간만 넓힘)
+for _item, _spec in INDICATOR_PLAN["ecos"].get(("817Y002", "D"), {}).items():
+    MARKET_RATE_ITEMS[_item] = merge_spec(MARKET_RATE_ITEMS.get(_item), _spec)
+
+# 이어받기(incremental) 대상 Yahoo 조회 기간
+YAHOO_PERIOD_DAYS = {"5y": 1826}
+
+def _yahoo(ticker, period="5y"):
+    """ Yahoo raw 노드용 조회 함수 (장기 조회는 SERIES_DIR 이력이 있으면 최근 구간만) """
+    if period not in YAHOO_PERIOD_DAYS:
+        return lambda: series_service.fetch_yahoo(ticker, period=period)
+
+    def fetch():
+        start = (analysis_service.kst_now() - timedelta(days=YAHOO_PERIOD_DAYS[period])).date()
+        return series_service.fetch_incremental(
+            f"yahoo:{ticker}", start,
+            lambda since: series_service.fetch_yahoo(ticker, start=since.date(), store=False),
+        )
+    return fetch
+
+def _kospi_per(days):
+    def fetch():
+        now_kst = analysis_service.kst_now()
+        return analysis_service.fetch_kospi_per((now_kst - timedelta(days=days)).strftime("%Y%m%d"), now_kst.strftime("%Y%m%d"))
+    return fetch
+
+def _span(spec):
+    return spec.get("days"), pd.Timestamp(spec["start"]) if spec.get("start") is not None else None
+
+def _window(spec):
+    """ 시계열을 조회 구간(spec)만큼 잘라내는 derived 노드 함수 """
+    def select(series):
+        if series is None or series.empty:
+            return series
+        return series.loc[_spec_start(spec, analysis_service.kst_now()):]
+    return select
+
+def _builtin_input(graph, key, merged):
+    """
+    기존 데이터셋의 입력 노드 이름 (merged: 실제 조회 구간)
+    선언한 지표 때문에 조회 구간이 넓어졌으면 원래 구간만 잘라낸 "<key>/builtin" 노드를 대신 사용
+    (예: DGS10을 10년 받아도 Yield Gap의 5년 평균은 5년치로 계산)
+    """
+    base = BUILTIN_SPANS[key]
+    if _span(base) == _span(merged):
+        return key
+    name = f"{key}/builtin"
+    if name not in graph.nodes:
+        graph.derived(name, _window(base), [key])
+    return name
+
+def build_refresh_graph():
+    """
+    데이터 갱신 그래프 구성
+    raw 노드 ttl은 기존 서비스 캐시 주기와 동일 (Pulse/Risk 10분, Yield Gap 1시간, 나머지 24시간)
+    priority: 외부 요청 대기열 순서 (Pulse/Risk high, Yield Gap normal, 일별 이상 주기 ECOS / FRED low)
+    """
+    graph = RefreshGraph(max_workers=8)
+
+    # --- Raw (원천 조회) ---
+    # 관심 목록 종목도 같은 yf.download로 미리 조회 (종목별 캐시만 채우고 노드 값은 TICKERS)
+    graph.raw("yahoo:pulse", lambda: stock_service.fetch_pulse_prices(WATCHLISTS.symbols()), ttl=600, priority="high")
+    # 상관계수 분석용 Market Pulse 2년 종가 (yf.download 1회, 하루 1회)
+    graph.raw("yahoo:pulse/history", stock_service.fetch_pulse_history, ttl=86400, priority="low")
+    for ticker in analysis_service.RISK_TICKERS.values():
+        graph.raw(f"yahoo:{ticker}", _yahoo(ticker), ttl=600, priority="high")
+    graph.raw("yahoo:^TNX", _yahoo("^TNX", period="5d"), ttl=3600)
+    graph.raw("yahoo:SPY/PE", analysis_service.fetch_spy_pe, ttl=3600)
+    graph.raw("krx:1001/PER", _kospi_per(1825), ttl=3600)
+    # KOSPI 전 종목 일별 시세 (빠진 날 + 마지막 거래일만 조회해 배열에 추가)
+    graph.raw("krx:breadth", breadth_service.refresh_breadth, ttl=600, priority="low")
+    graph.raw("ecos:722Y001/0101000", _ecos("722Y001", "0101000", days=analysis_service.RATE_SPREAD_DAYS, limit=10000), ttl=86400, priority="low")
+    # ECOS 817Y002: 통계표 요청 1회 -> 항목별 노드로 분배 (국고채 10년이 Yield Gap에 쓰이므로 1시간 주기, 이후 최근 구간만)
+    graph.raw("ecos:817Y002@D", _ecos_table("817Y002", "D", MARKET_RATE_ITEMS),
+              ttl=min(spec["ttl"] for spec in MARKET_RATE_ITEMS.values()), priority="low")
+    for item, spec in MARKET_RATE_ITEMS.items():
+        graph.derived(f"ecos:817Y002/{item}", _bulk_column(f"ecos:817Y002/{item}", item, spec), ["ecos:817Y002@D"])
+    # FRED: CSV 요청 1회 -> series별 노드로 분배 (DGS10이 Yield Gap에 쓰이므로 1시간 주기)
+    graph.raw("fred:bulk", _fred_bulk, ttl=3600, priority="low")
+    for series_id, spec in FRED_SERIES.items():
+        graph.derived(f"fred:{series_id}", _bulk_column(f"fred:{series_id}", series_id, spec), ["fred:bulk"])
+    # ECOS: 선언한 지표의 항목 (직접 등록한 raw 노드가 있으면 그대로 사용)
+    for (stat_code, cycle), items in INDICATOR_PLAN["ecos"].items():
+        items = {item: spec for item, spec in items.items() if series_node(f"ecos:{stat_code}/{item}", cycle) not in graph.nodes}
+        if stat_code in REGISTRY.ecos_tables and len(items) > 1:
+            # 통계표 전체를 요청 1회로 -> 항목별 노드로 분배
+            table = f"ecos:{stat_code}@{cycle}"
+            graph.raw(table, _ecos_table(stat_code, cycle, items), ttl=min(spec["ttl"] for spec in items.values()), priority="low")
+            for item, spec in items.items():
+                key = series_node(f"ecos:{stat_code}/{item}", cycle)
+                graph.derived(key, _bulk_column(key, item, spec), [table])
+            continue
+        for item, spec in items.items():
+            graph.raw(series_node(f"ecos:{stat_code}/{item}", cycle),
+                      _ecos(stat_code, item, days=spec.get("days"), start=spec.get("start"), limit=100000, cycle=cycle),
+                      ttl=spec["ttl"], priority="low")
+
+    # --- Derived (DATA_STORE 결과) ---
+    fred = lambda sid: _builtin_input(graph, f"fred:{sid}", FRED_SERIES[sid])
+    market_rate = lambda item: _builtin_input(graph, f"ecos:817Y002/{item}", MARKET_RATE_ITEMS[item])
+    graph.derived("market_pulse", stock_service.build_market_pulse, ["yahoo:pulse"], publish="market_pulse")
+    graph.derived("cpi", lambda s: macro_service.build_macro_data(s, "CPIAUCSL", "US CPI (Consumer Price Index)"),
+                  [fred("CPIAUCSL")], publish="cpi")
+    graph.derived("unrate", lambda s: macro_service.build_macro_data(s, "UNRATE", "US Unemployment Rate"),
+                  [fred("UNRATE")], publish="unrate")
+    graph.derived("risk_ratio", analysis_service.build_risk_ratio,
+                  [f"yahoo:{t}" for t in analysis_service.RISK_TICKERS.values()], publish="risk_ratio")
+    graph.derived("credit_spread", bond_service.build_credit_spread,
+                  [market_rate(bond_service.GOV_3Y_ITEM), market_rate(bond_service.CORP_3Y_ITEM)], publish="credit_spread")
+    # 신용 곡선: 항목별 노드 대신 통계표 행렬을 그대로 사용
+    graph.derived("credit_curve", bond_service.build_credit_curve, ["ecos:817Y002@D"], publish="credit_curve")
+    graph.derived("yield_gap", analysis_service.build_yield_gap,
+                  ["yahoo:SPY/PE", "yahoo:^TNX", fred("DGS10"), "krx:1001/PER", market_rate("010210000")],
+                  publish="yield_gap")
+    graph.derived("rate_spread", analysis_service.build_rate_spread,
+                  ["ecos:722Y001/0101000", market_rate("010101000")], publish="rate_spread")
+    graph.derived("us_rate_spread", analysis_service.build_us_rate_spread,
+                  [fred("DFEDTARU"), fred("DFF")], publish="us_rate_spread")
+    graph.derived("correlation", correlation_service.build_correlation,
+                  ["yahoo:pulse", "yahoo:pulse/history"] + [f"yahoo:{t}" for t in analysis_service.RISK_TICKERS.values()],
+                  publish="correlation")
+    graph.derived("kospi_breadth", breadth_service.build_kospi_breadth, ["krx:breadth"], publish="kospi_breadth")
+    # 설정 파일로 선언한 지표 (indicators.json)
+    for indicator in INDICATORS:
+        graph.derived(indicator.key, lambda *series, i=indicator: indicator_service.build_indicator(i, *series),
+                      indicator.nodes(), publish=indicator.key)
+    return graph
 
-def update_all_data():
+REFRESH_GRAPH = build_refresh_graph()
+
+# refresh 주기(분) / 1회 최대 소요 시간 (초과 시 남은 작업 취소, 이전 값 유지)
+REFRESH_MINUTES = 20
+REFRESH_DEADLINE = float(os.getenv("REFRESH_DEADLINE_SECONDS", "120"))
+# 주기 작업 실행 시각을 0~N초 무작위로 늦춤 (여러 인스턴스 / 제공처 요청이 같은 시각에 몰리지 않도록)
+REFRESH_JITTER = int(os.getenv("REFRESH_JITTER_SECONDS", "60"))
+
+def _refresh(keys=None, force=False):
     """
-    Background Task: Fetches data from all services and updates DATA_STORE.
-    ThreadPoolExecutor로 모든 서비스를 병렬 실행하여 전체 업데이트 시간을 단축.
+    refresh 1회 실행 (RefreshCoordinator가 한 번에 하나만 실행) -> 바뀐 데이터셋 키 목록
+    원천 노드는 병렬 조회, 파생 노드는 입력 내용(hash)이 바뀐 경우에만 다시 계산하여 반영.
+    keys: 일부 데이터셋만 (필요한 노드만 실행) / force: 원천 노드 ttl 무시
     """
+    # 공유 저장소: 먼저 최신 snapshot을 받아두고, leader만 외부 API refresh 실행
+    sync_from_store()
+    try:
+        is_leader = STORE.acquire_leader(LEADER_TTL)
+    except Exception as e:
+        logger.error(f"❌ [Store] leader lock 확인 실패, 이 인스턴스에서 refresh 실행: {e}")
+        is_leader = True
+    if not is_leader:
+        logger.info("⏭️ [Scheduler] Another instance holds the refresh lock. Reading shared snapshots only.")
+        return []
+
     logger.info(f"🔄 [Scheduler] Starting data update at {datetime.now(ZoneInfo('Asia/Seoul'))}...")
 
-    tasks = {
-        "market_pulse": (stock_service.get_market_pulse,),
-        "cpi": (macro_service.get_macro_data, "CPIAUCSL", "US CPI (Consumer Price Index)"),
-        "unrate": (macro_service.get_macro_data, "UNRATE", "US Unemployment Rate"),
-        "risk_ratio": (analysis_service.get_risk_ratio,),
-        "credit_spread": (bond_service.get_credit_spread_data,),
-        "yield_gap": (analysis_service.get_yield_gap_data,),
-        "rate_spread": (analysis_service.get_rate_spread_data,),
-        "us_rate_spread": (analysis_service.get_us_rate_spread_data,),
-    }
-
-    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
-        futures = {
-            executor.submit(_fetch_task, key, *funcs): key
-            for key, funcs in tasks.items()
-        }
-        for future in as_completed(futures):
-            key, result = future.result()
-            if result is not None:
-                DATA_STORE[key] = result
-
-    logger.info("✨ [Scheduler] All updates completed.")
+    # refresh 전후 RSS (TRACEMALLOC=1이면 할당 상위 위치까지) 기록
+    with memory_service.track_refresh():
+        updates = REFRESH_GRAPH.run(timeout=REFRESH_DEADLINE, targets=keys, force=force)
+        for key, result in updates.items():
+            publish(key, result)
+            logger.info(f"✅ [Scheduler] {key} updated")
+
+    logger.info(f"✨ [Scheduler] All updates completed. ({len(updates)} datasets changed)")
+    return sorted(updates)
+
+COORDINATOR = RefreshCoordinator(_refresh)
+
+def update_all_data(source="schedule"):
+    """
+    Background Task: Runs the refresh graph and updates DATA_STORE.
+    이미 실행 중인 refresh가 있으면 새로 시작하지 않고 그 실행이 끝날 때까지 기다림 (refresh_coordinator.py)
+    """
+    return COORDINATOR.run(source=source)
 
 def start_scheduler():
     """
@@ -81,7 +415,14 @@ def start_scheduler():
     scheduler = BackgroundScheduler(timezone=ZoneInfo("Asia/Seoul"))
     
     # Add job: Run every 20 minutes
-    scheduler.add_job(update_all_data, 'interval', minutes=20, id='update_all')
+    scheduler.add_job(update_all_data, 'interval', minutes=REFRESH_MINUTES, jitter=REFRESH_JITTER, id='update_all')
+    # 메모리 사용량 기록 (1분 간격)
+    scheduler.add_job(memory_service.sample_rss, 'interval', minutes=1, id='sample_rss')
+    # 오래된 세대 정리 (매일 04:30)
+    scheduler.add_job(HISTORY.compact, 'cron', hour=4, minute=30, id='compact_history')
+    # 공유 저장소: leader가 아닌 인스턴스도 refresh 결과를 바로 반영
+    if STORE.shared:
+        scheduler.add_job(sync_from_store, 'interval', seconds=STORE_SYNC_SECONDS, id='sync_store')
     
     # Run immediately on startup (in a separate thread to avoid blocking startup)
     # or just let the scheduler pick it up. 
@@ -0,0 +1,103 @@
+import pandas as pd
+from functools import reduce
+
+# 여러 소스(KRX, NYSE, FRED 영업일 등)의 시계열을 하나의 날짜축으로 맞추는 공용 모듈
+# 각 서비스가 따로 하던 tz 제거 / concat / ffill / dropna / 인덱스 이름 정리를 여기서 한 번에 처리
+
+def normalize_index(obj):
+    """
+    DatetimeIndex의 timezone 제거 + 00:00:00 정규화 + 중복 제거 + 정렬
+    (서로 다른 거래소 마감 시간 차이 무시)
+    """
+    idx = pd.DatetimeIndex(obj.index)
+    if idx.tz is not None:
+        # tz_localize(None)은 UTC -> Local 변환이 아니라 tz 정보만 제거함
+        idx = idx.tz_localize(None)
+    obj = obj.copy(deep=False)
+    obj.index = idx.normalize()
+    # 같은 날짜가 여러 번 있으면 마지막 값 사용
+    obj = obj[~obj.index.duplicated(keep='last')]
+    return obj.sort_index()
+
+
+def extract_close(df, name="series"):
+    """
+    yfinance 다운로드 결과에서 종가(Close) Series를 안전하게 추출 (버전 호환성 확보)
+    """
+    if df is None or df.empty:
+        print(f"❌ {name}: Empty DataFrame")
+        return None
+
+    # 1) 1차원 Series인 경우
+    if isinstance(df, pd.Series):
+        return df
+
+    # 2) MultiIndex 처리
+    if isinstance(df.columns, pd.MultiIndex):
+        if 'Close' in df.columns.get_level_values(0):
+            series = df.xs('Close', axis=1, level=0)
+            # Ticker가 컬럼으로 남아있는 경우
+            if isinstance(series, pd.DataFrame):
+                return series.iloc[:, 0]
+            return series
+
+    # 3) 일반 Index ('Close' or 'Price')
+    if 'Close' in df.columns:
+        return df['Close']
+    if 'Price' in df.columns:
+        return df['Price']
+
+    # 4) 정 안되면 첫 번째 컬럼
+    print(f"⚠️ {name}: 'Close' not found. Using {df.columns[0]}")
+    return df.iloc[:, 0]
+
+
+def align_series(series, base=None, fill_limit=None, dropna=True):
+    """
+    N개의 시계열을 하나의 날짜축으로 as-of 병합
+
+    - series: {컬럼명: pd.Series} (입력 순서대로 컬럼 생성)
+    - base: 기준 날짜축
+        None  -> 모든 시계열 날짜의 합집합 (기존 concat + ffill 동작)
+        "B"   -> 전체 구간의 평일(영업일) 캘린더
+        컬럼명 -> 해당 시계열의 날짜(예: KRX 거래일)를 기준으로 나머지를 as-of로 붙임
+    - fill_limit: 직전 관측값으로 채울 최대 연속 칸 수
+        None -> 제한 없음, 0 -> 채우지 않음 (같은 날짜끼리만 매칭 = inner join)
+    - dropna: 하나라도 값이 없는 행 제거
+    """
+    normed = {}
+    for name, s in series.items():
+        s = normalize_index(s.dropna())
+        normed[name] = pd.to_numeric(s, errors='coerce').astype(float)
+
+    if base is None:
+        target = reduce(lambda a, b: a.union(b), (s.index for s in normed.values()))
+    elif base == "B":
+        start = min(s.index.min() for s in normed.values() if not s.empty)
+        end = max(s.index.max() for s in normed.values() if not s.empty)
+        target = pd.bdate_range(start, end)
+    else:
+        target = normed[base].index
+
+    columns = {}
+    for name, s in normed.items():
+        if fill_limit == 0:
+            columns[name] = s.reindex(target)
+        else:
+            # 정렬된 인덱스 기준 ffill reindex = 벡터화된 as-of merge
+            columns[name] = s.reindex(target, method='ffill', limit=fill_limit)
+
+    df = pd.DataFrame(columns, index=target)
+    df.index.name = 'date'
+    if dropna:
+        df = df.dropna()
+    return df
+
+
+def to_records(df, columns, decimals=2):
+    """
+    날짜 인덱스 DataFrame -> [{"date": "YYYY-MM-DD", col: value, ...}] (iterrows 없이 벡터화)
+    """
+    out = df[columns].round(decimals)
+    out.insert(0, 'date', df.index.strftime('%Y-%m-%d'))
+    return out.to_dict('records')
@@ -1,119 +1,95 @@
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-from cachetools import TTLCache, cached
+from cachetools import cached
 from dotenv import load_dotenv
 import os
 
+from .align_service import align_series, to_records
+from .series_service import fetch_ecos
+from . import provider_service, memory_service
+
 load_dotenv()
 
 # 캐시 설정
-credit_cache = TTLCache(maxsize=100, ttl=86400) # 24시간 캐시 (장기 데이터)
+credit_cache = memory_service.byte_cache("credit", ttl=86400, max_mb=8) # 24시간 캐시 (장기 데이터)
 
 # API 키 설정
 ecos_key = os.getenv("ECOS_API_KEY")
 
-# 4. Credit Spread (ECOS API)
-@cached(cache=credit_cache)
-def get_credit_spread_data():
-    """
-    한국은행 ECOS API를 통해 국고채(3년)와 회사채(AA-, 3년) 금리 차이(Credit Spread)를 계산
-    """
-    
-    # 비상용 Mock Data
-    def generate_mock_spread():
-        print("⚠️ [Fallback] Credit Spread - Mock Data Used")
-        today = datetime.now(ZoneInfo("Asia/Seoul")) # Mock Data generation also needs timezone
-        data = []
-        base_val = 0.8
-        # 15년치 데이터 생성 (약 5400일)
-        for i in range(180): # 180개월 (15년)
-            d = today - timedelta(days=30 * (179 - i))
-            
-            # 국고채 3년 (약 3.0 ~ 4.5% 사이 변동)
-            # numpy random fix for deterministic behavior if needed, or simple update
-            gov_val = 3.5 + (np.sin(i / 20) * 1.0) + (np.random.normal(0, 0.05))
-            if gov_val < 1.0: gov_val = 1.0
-            
-            # 스프레드 (0.4 ~ 1.5% 사이)
-            spread_val = base_val + (i * 0.002) + (np.sin(i / 10) * 0.3)
-            if spread_val < 0.3: spread_val = 0.3
-            
-            # 회사채 = 국고채 + 스프레드
-            corp_val = gov_val + spread_val
-            
-            data.append({
-                "date": d.strftime("%Y-%m-%d"), 
-                "gov": round(gov_val, 2),
-                "corp": round(corp_val, 2),
-                "spread": round(spread_val, 2)
-            })
-        return data
+# Credit Spread 조회 시작일 (2011년 1월 1일부터, 약 15년)
+CREDIT_SPREAD_START = "20110101"
 
-    if not ecos_key:
-        print("⚠️ 경고: ECOS API 키가 없습니다. Credit Spread 기능이 제한됩니다.")
-        return generate_mock_spread()
+# 817Y002(시장금리 일별) 항목 코드
+GOV_3Y_ITEM = "010200000"   # 국고채 3년
+CORP_3Y_ITEM = "010300000"  # 회사채 3년 AA-
+CORP_BBB_3Y_ITEM = "010320000"  # 회사채 3년 BBB-
 
-    try:
-        # KST 기준 오늘 날짜
-        now_kst = datetime.now(ZoneInfo("Asia/Seoul"))
-        end_date = now_kst.strftime("%Y%m%d")
-        # 2011년 1월 1일부터 (약 15년)
-        start_date = "20110101"
-
-        # ECOS API 호출 함수
-        def fetch_ecos(stat_code, item_code):
-            # URL: /StatisticSearch/apikey/json/kr/1/20000/stat_code/DD/start/end/item_code
-            # 15년치면 약 5500일 이므로 넉넉하게 20000
-            url = f"http://ecos.bok.or.kr/api/StatisticSearch/{ecos_key}/json/kr/1/20000/{stat_code}/D/{start_date}/{end_date}/{item_code}"
-            
-            # Timeout 추가 (안정성 개선)
-            resp = requests.get(url, timeout=10)
-            data = resp.json()
-            
-            if 'StatisticSearch' not in data:
-                return None
-                
-            rows = data['StatisticSearch']['row']
-            df = pd.DataFrame(rows)
-            # 필요한 컬럼만
-            df = df[['TIME', 'DATA_VALUE']]
-            df.columns = ['date', 'value']
-            df['date'] = pd.to_datetime(df['date'], format='%Y%m%d')
-            df['value'] = pd.to_numeric(df['value'])
-            return df.set_index('date')
-
-        # 1. 국고채 3년 (Stat: 817Y002, Item: 010200000)
-        gov_df = fetch_ecos("817Y002", "010200000")
+# 신용 곡선 종목: 이름 -> (817Y002 항목 코드, 등급, 만기(년)), 등급 "KTB" = 국고채 (스프레드 기준 곡선)
+# 스케줄러가 817Y002 통계표 전체를 요청 1회로 받으므로 종목을 늘려도 ECOS 요청 수는 그대로
+# (817Y002의 회사채 금리는 3년 만기만 고시 -> 1년 / 5년은 국고채 곡선, 회사채는 같은 만기 국고채 대비 스프레드)
+CREDIT_CURVE_ITEMS = {
+    "ktb_1y": ("010190000", "KTB", 1),
+    "ktb_3y": (GOV_3Y_ITEM, "KTB", 3),
+    "ktb_5y": ("010200001", "KTB", 5),
+    "aa_3y": (CORP_3Y_ITEM, "AA-", 3),
+    "bbb_3y": (CORP_BBB_3Y_ITEM, "BBB-", 3),
+}
+# 등급 프리미엄 (낮은 등급 - 높은 등급, 같은 만기)
+RATING_PREMIUMS = {"bbb_aa_3y": ("bbb_3y", "aa_3y")}
+# 곡선 비교 시점 (마지막 고시일 기준 며칠 전)
+CURVE_SNAPSHOTS = {"latest": 0, "1M": 30, "1Y": 365}
+
+
+# 비상용 Mock Data
+@provider_service.mock_fallback
+def generate_mock_spread():
+    print("⚠️ [Fallback] Credit Spread - Mock Data Used")
+    today = datetime.now(ZoneInfo("Asia/Seoul")) # Mock Data generation also needs timezone
+    data = []
+    base_val = 0.8
+    # 15년치 데이터 생성 (약 5400일)
+    for i in range(180): # 180개월 (15년)
+        d = today - timedelta(days=30 * (179 - i))
+        
+        # 국고채 3년 (약 3.0 ~ 4.5% 사이 변동)
+        # numpy random fix for deterministic behavior if needed, or simple update
+        gov_val = 3.5 + (np.sin(i / 20) * 1.0) + (np.random.normal(0, 0.05))
+        if gov_val < 1.0: gov_val = 1.0
+        
+        # 스프레드 (0.4 ~ 1.5% 사이)
+        spread_val = base_val + (i * 0.002) + (np.sin(i / 10) * 0.3)
+        if spread_val < 0.3: spread_val = 0.3
         
-        # 2. 회사채 3년 AA- (Stat: 817Y002, Item: 010300000 ?)
-        corp_df = fetch_ecos("817Y002", "010300000") 
+        # 회사채 = 국고채 + 스프레드
+        corp_val = gov_val + spread_val
         
-        # fallback for Corp if first try fails (Try code for Corp AA-)
-        if corp_df is None or corp_df.empty:
-             # Try alternate code if known, or fail
-             pass
+        data.append({
+            "date": d.strftime("%Y-%m-%d"), 
+            "gov": round(gov_val, 2),
+            "corp": round(corp_val, 2),
+            "spread": round(spread_val, 2)
+        })
+    return data
 
-        if gov_df is None or corp_df is None:
+
+def build_credit_spread(gov, corp):
+    """
+    국고채(3년) / 회사채(AA-, 3년) 시계열 -> Credit Spread 결과 (입력이 없으면 Mock Data)
+    """
+    try:
+        if gov is None or corp is None or gov.empty or corp.empty:
             raise ValueError("ECOS 데이터 수신 실패 (데이터 없음))")
 
-        # 3. Spread 계산 (회사채 - 국고채)
-        # 인덱스 기준으로 join
-        merged = corp_df.join(gov_df, lsuffix='_corp', rsuffix='_gov').dropna()
-        merged['spread'] = merged['value_corp'] - merged['value_gov']
-        
-        # 4. 포맷팅
-        result = []
-        for date, row in merged.iterrows():
-            result.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "gov": round(row['value_gov'], 2),
-                "corp": round(row['value_corp'], 2),
-                "spread": round(row['spread'], 2)
-            })
-        
+        # Spread 계산 (회사채 - 국고채)
+        # 같은 날짜에 둘 다 고시된 값만 사용 (fill_limit=0 -> inner join)
+        merged = align_series({'corp': corp, 'gov': gov}, fill_limit=0)
+        merged['spread'] = merged['corp'] - merged['gov']
+
+        # 포맷팅
+        result = to_records(merged, ['gov', 'corp', 'spread'])
+
         print(f"✅ 데이터 처리 완료: {len(result)}건")
 
         return result
@@ -121,3 +97,90 @@ def get_credit_spread_data():
     except Exception as e:
         print(f"❌ [ECOS Error]: {e}")
         return generate_mock_spread()
+
+
+def _base_tenor(name):
+    """ 종목과 같은 만기의 국고채 종목 이름 (국고채 자신이거나 없으면 None) """
+    _, rating, tenor = CREDIT_CURVE_ITEMS[name]
+    if rating == "KTB":
+        return None
+    return next((n for n, (_, r, t) in CREDIT_CURVE_ITEMS.items() if r == "KTB" and t == tenor), None)
+
+
+def build_credit_curve(table):
+    """
+    817Y002 통계표(날짜 x 항목 코드 행렬) -> 신용 곡선 결과 (입력이 없으면 ValueError -> 이전 값 유지)
+    - curves: 최근 / 1개월 전 / 1년 전 곡선 (종목별 금리 + 같은 만기 국고채 대비 스프레드)
+    - data: 일별 스프레드 이력 (회사채 종목별 스프레드 + 등급 프리미엄)
+    """
+    names = [n for n, (item, _, _) in CREDIT_CURVE_ITEMS.items() if table is not None and item in table]
+    if not names:
+        raise ValueError("신용 곡선 데이터 없음 (Empty Data)")
+    matrix = table[[CREDIT_CURVE_ITEMS[n][0] for n in names]].set_axis(names, axis=1)
+    matrix = matrix.loc[pd.Timestamp(CREDIT_SPREAD_START):].dropna(how="all")
+    if matrix.empty:
+        raise ValueError("신용 곡선 데이터 없음 (Empty Data)")
+
+    # 스프레드 이력: 같은 날짜에 둘 다 고시된 값만 (Credit Spread와 같은 기준)
+    spreads = pd.DataFrame(index=matrix.index)
+    for name in names:
+        base = _base_tenor(name)
+        if base in matrix:
+            spreads[name] = matrix[name] - matrix[base]
+    for name, (low, high) in RATING_PREMIUMS.items():
+        if low in matrix and high in matrix:
+            spreads[name] = matrix[low] - matrix[high]
+    spreads = spreads.dropna()
+
+    # 곡선 snapshot: 기준일 이전 마지막 고시 값 (종목마다 고시일이 다르면 직전 값)
+    filled = matrix.ffill()
+    last = matrix.index[-1]
+    curves = []
+    for label, days in CURVE_SNAPSHOTS.items():
+        rows = filled.loc[:last - timedelta(days=days)]
+        if rows.empty:
+            continue
+        row = rows.iloc[-1]
+        points = []
+        for name in names:
+            if pd.isna(row[name]):
+                continue
+            _, rating, tenor = CREDIT_CURVE_ITEMS[name]
+            base = _base_tenor(name)
+            spread = row[name] - row[base] if base in row and pd.notna(row[base]) else None
+            points.append({
+                "key": name, "rating": rating, "tenor": tenor, "yield": round(float(row[name]), 3),
+                "spread": round(float(spread), 3) if spread is not None else None,
+            })
+        curves.append({"label": label, "date": rows.index[-1].strftime("%Y-%m-%d"), "points": points})
+
+    print(f"✅ 신용 곡선 처리 완료: {len(names)}개 종목 x {len(matrix)}일")
+    return {
+        "title": "Korea Credit Curve (KTB / Corporate AA- / BBB-)",
+        "instruments": [
+            {"key": n, "item": CREDIT_CURVE_ITEMS[n][0], "rating": CREDIT_CURVE_ITEMS[n][1], "tenor": CREDIT_CURVE_ITEMS[n][2]}
+            for n in names
+        ],
+        "curves": curves,
+        "data": to_records(spreads, list(spreads.columns), decimals=3),
+    }
+
+
+# 4. Credit Spread (ECOS API)
+@cached(cache=credit_cache)
+def get_credit_spread_data():
+    """
+    한국은행 ECOS API를 통해 국고채(3년)와 회사채(AA-, 3년) 금리 차이(Credit Spread)를 계산
+    """
+    if not ecos_key:
+        print("⚠️ 경고: ECOS API 키가 없습니다. Credit Spread 기능이 제한됩니다.")
+        return generate_mock_spread()
+
+    # KST 기준 오늘 날짜
+    end_date = datetime.now(ZoneInfo("Asia/Seoul")).strftime("%Y%m%d")
+
+    # 15년치면 약 5500일 이므로 넉넉하게 20000
+    gov = fetch_ecos("817Y002", GOV_3Y_ITEM, CREDIT_SPREAD_START, end_date, limit=20000)
+    corp = fetch_ecos("817Y002", CORP_3Y_ITEM, CREDIT_SPREAD_START, end_date, limit=20000)
+
+    return build_credit_spread(gov, corp)
@@ -0,0 +1,269 @@
+import os
+import threading
+import warnings
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from pykrx import stock
+
+from . import provider_service, series_service
+from .analysis_service import kst_now
+
+# KOSPI 시장 폭(breadth): 상승 / 하락 종목 수, A/D line, 52주 신고가 / 신저가, 이동평균 상회 비율
+# - 원천: pykrx 일별 전 종목 시세 (get_market_ohlcv_by_ticker(날짜, market="KOSPI")) -> 하루 1회 요청으로 전 종목
+#   (종목별 조회는 900여 회 요청)
+# - 날짜 x 종목 종가 배열(float32)에 하루씩 추가, refresh마다 마지막 거래일(장중 갱신) + 빠진 날만 조회
+# - 이동평균은 누적합 배열로 계산 (하루 추가 = 종목 수만큼 덧셈, MA_t = (S_t - S_t-N) / N)
+# - 최초 기동 시 LOOKBACK_DAYS만큼 채우되 refresh 1회당 FETCH_LIMIT일까지 (KRX 요청 예산 안에서 여러 refresh에 걸쳐 채움)
+#   최근 날짜부터 조회 -> 첫 refresh부터 최신 거래일이 반영되고, 과거 구간은 뒤 refresh에서 채움 (이전 날짜가 들어오면 전체 재계산)
+# - 시세가 비어 있는 날은 KOSPI 지수(1001) 거래일에 없을 때만 휴장일로 기록 (KRX 일시 오류로 빈 응답이면 다음 refresh에서 다시 조회)
+# - SERIES_DIR 사용 시 배열을 디스크(kospi_breadth.npz)에 저장 -> 재시작 후 이어서 조회
+
+MARKET = "KOSPI"
+LOOKBACK_DAYS = 400          # 최초 적재 구간 (52주 신고가 / 200일선 계산에 필요한 약 270 거래일)
+FETCH_LIMIT = 30             # refresh 1회당 최대 조회 일수
+HIGH_LOW_DAYS = 250          # 52주 (거래일)
+MA_WINDOWS = (50, 200)
+
+
+class BreadthStore:
+    """ 거래일 x 종목 종가 / 등락률 배열 + 종가 누적합 (이동평균용) + 일별 breadth 행 """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.dates = []                                   # 거래일 (Timestamp)
+        self.tickers = []
+        self._column = {}                                 # ticker -> 열 번호
+        # 행 여유분을 두고 할당 (하루 추가 시 배열 전체를 복사하지 않음, 앞 len(dates)행만 사용)
+        self.closes = np.empty((0, 0), dtype=np.float32)
+        self.changes = np.empty((0, 0), dtype=np.float32)
+        self.csum = np.empty((0, 0))                      # 종가 누적합 (결측은 0)
+        self.ccount = np.empty((0, 0), dtype=np.int32)    # 누적 관측 수
+        self.rows = []                                    # 일별 breadth 결과 (dates와 같은 순서)
+        self.closed = set()                               # 지수 거래일에 없는 날 (휴장일 확인됨, 다시 조회하지 않음)
+
+    def _reserve(self, n_rows, tickers):
+        """ 새 종목 열 추가 / 행 여유분이 없으면 2배로 확장 """
+        new = [t for t in tickers if t not in self._column]
+        for t in new:
+            self._column[t] = len(self.tickers)
+            self.tickers.append(t)
+        rows = self.closes.shape[0]
+        grow_rows = max(rows * 2, 64) - rows if n_rows > rows else 0
+        if not new and not grow_rows:
+            return
+        pad = ((0, grow_rows), (0, len(new)))
+        self.closes = np.pad(self.closes, pad, constant_values=np.nan)
+        self.changes = np.pad(self.changes, pad, constant_values=np.nan)
+        self.csum = np.pad(self.csum, pad)
+        self.ccount = np.pad(self.ccount, pad)
+
+    def append(self, date, closes, changes):
+        """ 하루치 전 종목 종가 / 등락률(Series, index=ticker) 추가 (마지막 날과 같으면 교체) -> breadth 행 """
+        date = pd.Timestamp(date)
+        if self.dates and date < self.dates[-1]:
+            raise ValueError(f"과거 날짜는 추가할 수 없습니다: {date:%Y-%m-%d}")
+        if self.dates and date == self.dates[-1]:
+            # 장중 갱신: 마지막 날 교체
+            self.dates.pop()
+            self.rows.pop()
+        i = len(self.dates)
+        self._reserve(i + 1, closes.index)
+
+        self.closes[i] = np.nan
+        self.closes[i, [self._column[t] for t in closes.index]] = closes.to_numpy(dtype=np.float32)
+        self.changes[i] = np.nan
+        self.changes[i, [self._column[t] for t in changes.index]] = changes.to_numpy(dtype=np.float32)
+        observed = ~np.isnan(self.closes[i])
+        self.csum[i] = (self.csum[i - 1] if i else 0) + np.where(observed, self.closes[i], 0)
+        self.ccount[i] = (self.ccount[i - 1] if i else 0) + observed
+        self.dates.append(date)
+        self.rows.append(self._breadth_row(i))
+        return self.rows[-1]
+
+    def merge(self, snapshots):
+        """
+        {날짜: (종가, 등락률)} 추가
+        마지막 날 이후 날짜만 있으면 이어 붙이고, 이전 날짜가 섞이면 저장된 날짜와 합쳐 날짜순으로 다시 계산
+        (누적합 / A/D line / 52주 고저가 앞선 날짜에 의존하므로 중간 삽입 불가)
+        """
+        if not snapshots:
+            return
+        dates = sorted(snapshots)
+        if not self.dates or dates[0] >= self.dates[-1]:
+            for date in dates:
+                self.append(date, *snapshots[date])
+            return
+        tickers = np.array(self.tickers, dtype=object)
+        items = {}
+        for i, date in enumerate(self.dates):
+            mask = ~np.isnan(self.closes[i])
+            items[date] = (pd.Series(self.closes[i][mask], index=tickers[mask]),
+                           pd.Series(self.changes[i][mask], index=tickers[mask]))
+        items.update(snapshots)
+        closed = self.closed
+        self.reset()
+        self.closed = closed
+        for date in sorted(items):
+            self.append(date, *items[date])
+
+    def _moving_average(self, i, window):
+        """ i번째 날의 종목별 window일 이동평균 (관측치가 window개 미만이면 NaN) """
+        if i + 1 < window:
+            return np.full(len(self.tickers), np.nan)
+        prev_sum = self.csum[i - window] if i >= window else 0
+        prev_count = self.ccount[i - window] if i >= window else 0
+        count = self.ccount[i] - prev_count
+        return np.where(count == window, (self.csum[i] - prev_sum) / window, np.nan)
+
+    def _breadth_row(self, i):
+        close, change = self.closes[i], self.changes[i]
+        advances = int(np.sum(change > 0))
+        declines = int(np.sum(change < 0))
+        prev_line = self.rows[i - 1]["ad_line"] if i > 0 else 0
+        row = {
+            "date": self.dates[i].strftime("%Y-%m-%d"),
+            "advances": advances,
+            "declines": declines,
+            "unchanged": int(np.sum(change == 0)),
+            "ad_line": prev_line + advances - declines,
+            "new_highs": None,
+            "new_lows": None,
+        }
+        if i >= HIGH_LOW_DAYS:
+            # 직전 52주 종가 고점 / 저점 돌파 (종가 기준, 신규 상장 종목처럼 이력이 없으면 제외)
+            window = self.closes[i - HIGH_LOW_DAYS:i]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                high, low = np.nanmax(window, axis=0), np.nanmin(window, axis=0)
+            row["new_highs"] = int(np.sum(close > high))
+            row["new_lows"] = int(np.sum(close < low))
+        for window in MA_WINDOWS:
+            ma = self._moving_average(i, window)
+            valid = ~np.isnan(ma) & ~np.isnan(close)
+            row[f"above_ma{window}"] = round(float(np.mean(close[valid] > ma[valid]) * 100), 2) if valid.any() else None
+        return row
+
+    def nbytes(self):
+        return self.closes.nbytes + self.changes.nbytes + self.csum.nbytes + self.ccount.nbytes
+
+    # --- 디스크 저장 (SERIES_DIR) ---
+
+    def save(self, path):
+        n = len(self.dates)
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp,
+            dates=np.array([d.strftime("%Y-%m-%d") for d in self.dates]),
+            tickers=np.array(self.tickers),
+            closes=self.closes[:n],
+            changes=self.changes[:n],
+            closed=np.array(sorted(d.strftime("%Y-%m-%d") for d in self.closed)),
+        )
+        os.replace(tmp, path)
+
+    def load(self, path):
+        """ 저장한 종가 / 등락률 배열 읽기 (누적합 / breadth 행은 다시 계산) """
+        data = np.load(path)
+        tickers = data["tickers"].astype(object)
+        self.reset()
+        for date, closes, changes in zip(data["dates"].tolist(), data["closes"], data["changes"]):
+            mask = ~np.isnan(closes)
+            self.append(date, pd.Series(closes[mask], index=tickers[mask]), pd.Series(changes[mask], index=tickers[mask]))
+        self.closed = {pd.Timestamp(d) for d in data["closed"].tolist()}
+
+
+BREADTH = BreadthStore()
+_loaded = False
+
+
+def _store_path():
+    return os.path.join(series_service.SERIES_DIR, "kospi_breadth.npz") if series_service.SERIES_DIR else None
+
+
+def fetch_snapshot(date):
+    """ 하루치 KOSPI 전 종목 시세 -> (종가, 등락률) Series (휴장일이면 None, 실패 시 예외) """
+    df = provider_service.call("krx", stock.get_market_ohlcv_by_ticker, date.strftime("%Y%m%d"), market=MARKET)
+    if df is None or df.empty or "종가" not in df or not (df["종가"] > 0).any():
+        return None
+    df = df[df["종가"] > 0]
+    return df["종가"].astype(float), df["등락률"].astype(float)
+
+
+def _pending_dates(today):
+    """ 조회할 날짜 (최근 날짜부터): 마지막 거래일(장중 갱신) + LOOKBACK_DAYS 안에서 빠진 평일 """
+    stored = set(BREADTH.dates[:-1])
+    days = [d for d in pd.bdate_range(today - timedelta(days=LOOKBACK_DAYS), today)
+            if d not in stored and d not in BREADTH.closed]
+    return days[::-1][:FETCH_LIMIT]
+
+
+def _confirmed_holidays(dates):
+    """ 시세가 비어 있던 날 중 KOSPI 지수(1001) 거래일에 없는 날 (지수 조회 실패 / 빈 응답이면 확인하지 않음) """
+    start, end = min(dates) - timedelta(days=14), max(dates)
+    try:
+        df = provider_service.call("krx", stock.get_index_ohlcv, start.strftime("%Y%m%d"), end.strftime("%Y%m%d"), "1001")
+    except Exception as e:
+        print(f"⚠️ [Breadth] 휴장일 확인 실패: {e}")
+        return set()
+    if df is None or df.empty:
+        return set()
+    trading = set(pd.DatetimeIndex(df.index).normalize())
+    return {d for d in dates if d not in trading}
+
+
+def refresh_breadth():
+    """
+    refresh raw 노드: 빠진 날짜 + 마지막 거래일만 조회해 배열에 추가 -> 일별 breadth 행 목록
+    (조회 중 실패하면 거기까지 반영, 남은 날짜는 다음 refresh에서)
+    """
+    global _loaded
+    path = _store_path()
+    with BREADTH.lock:
+        if not _loaded:
+            _loaded = True
+            if path and os.path.exists(path):
+                try:
+                    BREADTH.load(path)
+                    print(f"💽 [Breadth] {len(BREADTH.dates)} days x {len(BREADTH.tickers)} tickers loaded")
+                except Exception as e:
+                    print(f"⚠️ [Breadth] {path} 읽기 실패: {e}")
+
+        today = pd.Timestamp(kst_now().date())
+        snapshots, empty = {}, []
+        for date in _pending_dates(today):
+            try:
+                snapshot = fetch_snapshot(date)
+            except Exception as e:
+                print(f"⚠️ [Breadth] {date:%Y-%m-%d} 조회 실패: {e}")
+                break
+            if snapshot is None:
+                # 휴장일 후보 (오늘은 장 시작 전일 수 있으므로 제외)
+                if date < today:
+                    empty.append(date)
+                continue
+            snapshots[date] = snapshot
+        if empty:
+            BREADTH.closed |= _confirmed_holidays(empty)
+        BREADTH.merge(snapshots)
+        fetched = len(snapshots)
+        if fetched or empty:
+            print(f"📊 [Breadth] {fetched} days fetched ({len(BREADTH.dates)} days x {len(BREADTH.tickers)} tickers)")
+            if path:
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    BREADTH.save(path)
+                except OSError as e:
+                    print(f"⚠️ [Breadth] {path} 저장 실패: {e}")
+        return list(BREADTH.rows)
+
+
+def build_kospi_breadth(rows):
+    """ 일별 breadth 행 -> {"title", "data"} (입력이 없으면 ValueError -> 이전 값 유지) """
+    if not rows:
+        raise ValueError("KOSPI breadth 데이터 없음 (Empty Data)")
+    return {"title": f"{MARKET} Market Breadth", "data": rows}
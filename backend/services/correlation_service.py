@@ -0,0 +1,189 @@
+import threading
+
+import numpy as np
+from cachetools import cached
+from cachetools.keys import hashkey
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .align_service import align_series
+from .analysis_service import RISK_TICKERS
+from .stock_service import TICKERS
+from . import memory_service
+
+# 자산 간 관계 분석 (상관계수 / 베타 / 실현 변동성 / 낙폭)
+# - refresh마다 Market Pulse 8종목 + 금 / 은 / S&P 500 종가를 영업일 기준 가격 행렬(날짜 x 종목) 1개로 정렬
+#   (Market Pulse 종목은 3개월 종가에 하루 1회 받는 2년 종가를 이어붙임 -> 250일 window / rolling 상관계수까지 계산 가능)
+# - 기본 조회(전체 종목, DEFAULT_WINDOW)는 refresh 때 계산해 DATA_STORE["correlation"]으로 publish -> snapshot 그대로 전송
+# - 다른 (window, 종목, 기준 종목) 조합은 요청 시 계산 후 (행렬 버전, window, 종목, 기준 종목) 단위로 캐시
+# - 계산은 전부 NumPy 행렬 연산 (종목 수 n에 대해 공분산 1회 = O(window * n^2))
+
+WINDOWS = (20, 60, 120, 250)     # 선택 가능한 수익률 구간 (영업일)
+DEFAULT_WINDOW = 60
+BENCHMARK = "^GSPC"              # 베타 / rolling 상관계수 기준
+TRADING_DAYS = 252
+ROLLING_POINTS = 250             # rolling 상관계수 최대 길이
+FILL_LIMIT = 3                   # 휴장일(거래소별) 직전 값으로 채울 최대 일수
+
+NAMES = {**TICKERS, RISK_TICKERS["gold"]: "금 선물", RISK_TICKERS["silver"]: "은 선물"}
+
+# 최근 가격 행렬 (내용이 바뀐 경우에만 버전 증가 -> 계산 캐시 키)
+PRICE_MATRIX = {"version": 0, "symbols": (), "dates": None, "prices": None}
+_matrix_lock = threading.Lock()
+
+analytics_cache = memory_service.byte_cache("correlation", max_mb=8)
+
+
+def build_price_matrix(pulse, history, gold, silver, sp500):
+    """
+    Market Pulse 종가 DataFrame(3개월, 10분 주기) + 장기 종가 DataFrame(2년, 하루 1회) + 금 / 은 / S&P 500 종가
+    -> 영업일 기준 가격 행렬 (DataFrame, 같은 날짜는 최근 조회 값 우선)
+    """
+    series = {}
+    for ticker in TICKERS:
+        recent = pulse[ticker].dropna() if pulse is not None and ticker in pulse else None
+        older = history[ticker].dropna() if history is not None and ticker in history else None
+        if recent is not None and older is not None:
+            series[ticker] = recent.combine_first(older)
+        elif recent is not None or older is not None:
+            series[ticker] = recent if recent is not None else older
+    # S&P 500은 Risk Radar의 5년치가 더 길어 그쪽 우선
+    for ticker, s in zip(RISK_TICKERS.values(), (gold, silver, sp500)):
+        if s is not None and not s.empty:
+            series[ticker] = s
+    series = {k: s for k, s in series.items() if not s.dropna().empty}
+    if not series:
+        raise ValueError("가격 데이터 없음 (Empty Data)")
+    return align_series(series, base="B", fill_limit=FILL_LIMIT, dropna=False)
+
+
+def _set_matrix(df):
+    with _matrix_lock:
+        prices = df.to_numpy(dtype=float)
+        current = PRICE_MATRIX["prices"]
+        if current is not None and current.shape == prices.shape and np.array_equal(current, prices, equal_nan=True) \
+                and PRICE_MATRIX["symbols"] == tuple(df.columns):
+            return
+        PRICE_MATRIX.update({
+            "version": PRICE_MATRIX["version"] + 1,
+            "symbols": tuple(df.columns),
+            "dates": df.index.strftime("%Y-%m-%d").to_numpy(),
+            "prices": prices,
+        })
+
+
+def _clean(values, decimals=4):
+    """ NumPy 배열 -> JSON 목록 (NaN은 None) """
+    values = np.round(values, decimals)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def compute_analytics(prices, dates, symbols, window, benchmark):
+    """
+    가격 행렬(날짜 x 종목) -> 마지막 window 영업일 로그수익률 기준 상관계수 / 베타 행렬,
+    연율화 실현 변동성, 최대 / 현재 낙폭, 기준 종목과의 rolling 상관계수
+    window 안에 값이 빠진 종목은 해당 항목이 None
+    """
+    returns = np.diff(np.log(prices), axis=0)                 # (T-1, n)
+    recent = returns[-window:]
+    valid = (~np.isnan(recent).any(axis=0)) & (len(recent) == window)
+
+    n = len(symbols)
+    corr = np.full((n, n), np.nan)
+    beta = np.full((n, n), np.nan)
+    vol = np.full(n, np.nan)
+    if valid.sum():
+        x = recent[:, valid] - recent[:, valid].mean(axis=0)
+        cov = x.T @ x / (window - 1)
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            idx = np.ix_(valid, valid)
+            corr[idx] = cov / np.outer(std, std)
+            # beta[i][j]: 종목 i 수익률의 종목 j 수익률에 대한 베타 (cov_ij / var_j)
+            beta[idx] = cov / np.diag(cov)[np.newaxis, :]
+        vol[valid] = std * np.sqrt(TRADING_DAYS) * 100
+
+    # 낙폭: window 구간 고점 대비 (%)
+    window_prices = prices[-(window + 1):]
+    peak = np.fmax.accumulate(window_prices, axis=0)
+    drawdown = (window_prices / peak - 1) * 100
+    with np.errstate(invalid="ignore"):
+        max_dd = np.where(valid, np.nanmin(drawdown, axis=0), np.nan)
+    current_dd = np.where(valid, drawdown[-1], np.nan)
+
+    # rolling 상관계수 (기준 종목 대비, window 단위 이동)
+    b = symbols.index(benchmark)
+    tail = returns[-(ROLLING_POINTS + window - 1):]
+    rolling_dates, rolling = [], np.full((0, n), np.nan)
+    if len(tail) >= window:
+        views = sliding_window_view(tail, window, axis=0)      # (k, n, window)
+        centered = views - views.mean(axis=2, keepdims=True)
+        bench = centered[:, b:b + 1, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rolling = (centered * bench).sum(axis=2) / np.sqrt(
+                (centered ** 2).sum(axis=2) * (bench ** 2).sum(axis=2)
+            )
+        rolling_dates = dates[-len(rolling):].tolist()
+
+    corr, beta, rolling = _clean(corr), _clean(beta), _clean(rolling.T)
+    vol, max_dd, current_dd = _clean(vol, 2), _clean(max_dd, 2), _clean(current_dd, 2)
+    return {
+        "title": f"Cross-Asset Correlation ({window}D)",
+        "as_of": str(dates[-1]),
+        "window": window,
+        "benchmark": benchmark,
+        "rolling_dates": rolling_dates,
+        # 종목별 1행 (correlation / beta: 다른 종목별 값, rolling: 기준 종목과의 rolling 상관계수)
+        "data": [
+            {
+                "ticker": t,
+                "name": NAMES.get(t, t),
+                "volatility": vol[i],
+                "max_drawdown": max_dd[i],
+                "drawdown": current_dd[i],
+                "correlation": dict(zip(symbols, corr[i])),
+                "beta": dict(zip(symbols, beta[i])),
+                "rolling": rolling[i],
+            }
+            for i, t in enumerate(symbols)
+        ],
+    }
+
+
+def build_correlation(pulse, history, gold, silver, sp500):
+    """ refresh 결과 -> 가격 행렬 갱신 + 기본 조회(전체 종목, DEFAULT_WINDOW) 결과 """
+    _set_matrix(build_price_matrix(pulse, history, gold, silver, sp500))
+    return get_correlation()
+
+
+def _snapshot():
+    """ 가격 행렬 1개 시점의 (version, symbols, dates, prices) (_set_matrix는 배열을 교체만 하므로 얕은 복사로 충분) """
+    with _matrix_lock:
+        return dict(PRICE_MATRIX)
+
+
+@cached(cache=analytics_cache, lock=threading.Lock(),
+        key=lambda matrix, window, symbols, benchmark: hashkey(matrix["version"], window, symbols, benchmark))
+def _compute(matrix, window, symbols, benchmark):
+    """ (행렬 버전, window, 종목, 기준 종목) 단위로 캐시되는 실제 계산부 (matrix: _snapshot 결과) """
+    columns = [matrix["symbols"].index(s) for s in symbols]
+    return compute_analytics(matrix["prices"][:, columns], matrix["dates"], list(symbols), window, benchmark)
+
+
+def get_correlation(window=DEFAULT_WINDOW, symbols=None, benchmark=BENCHMARK):
+    """
+    종목 간 상관계수 / 베타 / 변동성 / 낙폭 (symbols: 종목 목록, 기본 전체)
+    형식 오류는 ValueError, 가격 행렬이 아직 없으면 LookupError
+    """
+    if window not in WINDOWS:
+        raise ValueError(f"지원하지 않는 window: {window} ({' | '.join(map(str, WINDOWS))})")
+    matrix = _snapshot()
+    available = matrix["symbols"]
+    if not available:
+        raise LookupError("가격 행렬이 아직 없습니다 (refresh 전).")
+    symbols = tuple(symbols or available)
+    unknown = [s for s in symbols + (benchmark,) if s not in available]
+    if unknown:
+        raise ValueError(f"알 수 없는 종목: {', '.join(unknown)} (지원: {', '.join(available)})")
+    if benchmark not in symbols:
+        symbols += (benchmark,)
+    return _compute(matrix, window, symbols, benchmark)
@@ -0,0 +1,205 @@
+import io
+import json
+import threading
+import numpy as np
+import pandas as pd
+
+from . import memory_service
+
+# pyarrow는 Arrow / Parquet 내보내기에만 필요 (없으면 해당 기능만 비활성화)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# msgpack은 MessagePack 응답에만 필요
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# DATA_STORE 데이터셋을 Arrow IPC stream / Parquet / MessagePack으로 변환
+# 변환 결과는 (key, 포맷) 별로 데이터 버전과 함께 보관 -> 같은 버전이면 다시 만들지 않음 (refresh당 1회)
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+# 스트리밍 응답에서 한 번에 인코딩 / 전송하는 행 수 (요청당 메모리는 이 크기에 비례)
+STREAM_CHUNK_ROWS = 500
+
+FORMATS = ("arrow", "parquet", "msgpack", "msgpack_packed")
+
+_export_cache = memory_service.register_cache("export", {})   # (key, fmt) -> (version, bytes)
+_export_lock = threading.Lock()
+
+
+def available(fmt="arrow"):
+    if fmt in ("msgpack", "msgpack_packed"):
+        return msgpack is not None
+    return pa is not None
+
+
+def dataset_rows(value):
+    """
+    DATA_STORE 값 -> (행 목록, 메타데이터)
+    - [{"date": ..., ...}, ...]           -> 그대로
+    - {"title": ..., "data": [...]}      -> data (title 및 data 외 필드는 메타데이터, 예: credit_curve의 curves / instruments는 JSON 문자열)
+    - {"us": {...}, "kr": {...}}         -> 시장별 1행
+    """
+    if isinstance(value, list):
+        return value, {}
+    if isinstance(value, dict) and "data" in value:
+        metadata = {k: v if isinstance(v, str) else _dumps(v) for k, v in value.items() if k not in ("data", "title")}
+        return value["data"], {"title": str(value.get("title", "")), **metadata}
+    if isinstance(value, dict):
+        return [{"market": market, **fields} for market, fields in value.items()], {}
+    raise TypeError(f"지원하지 않는 데이터 형식: {type(value).__name__}")
+
+
+def build_table(key, value):
+    """
+    DATA_STORE 값 -> pyarrow Table (행 목록 -> DataFrame -> Arrow, 행 수만큼 값 복사)
+    날짜는 date32, 숫자 열은 float64 / data 외 필드는 스키마 메타데이터
+    """
+    rows, metadata = dataset_rows(value)
+    df = pd.DataFrame(rows)
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"]).dt.date
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {"dataset": key, **metadata}
+    return table.replace_schema_metadata({k: str(v) for k, v in metadata.items()})
+
+
+def _encode_default(obj):
+    # numpy 스칼라 / 배열, 날짜 등 msgpack / json 기본 타입이 아닌 값 처리
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"msgpack 직렬화 불가: {type(obj).__name__}")
+
+
+def pack_columns(value):
+    """
+    행 목록([{...}, ...])을 열 단위로 변환, 숫자 열은 float64 little-endian 바이트(bin)로 묶음
+    -> {"length": n, "columns": {"date": [...], "gov": b"..."}}
+    (Python: np.frombuffer(b, "<f8") / JS: new Float64Array(buffer))
+    중첩된 행 목록(예: Market Pulse의 history)도 같은 방식으로 변환
+    """
+    if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+        columns = {}
+        for col in value[0]:
+            values = [row.get(col) for row in value]
+            if all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values):
+                columns[col] = np.asarray(values, dtype="<f8").tobytes()
+            else:
+                columns[col] = [pack_columns(v) for v in values]
+        return {"length": len(value), "columns": columns}
+    if isinstance(value, dict):
+        return {k: pack_columns(v) for k, v in value.items()}
+    return value
+
+
+def to_msgpack(value, packed=False):
+    """ 임의 응답 값 -> MessagePack 바이트 (packed=True면 숫자 열을 float64 배열로) """
+    if packed:
+        value = pack_columns(value)
+    return msgpack.packb(value, default=_encode_default, use_bin_type=True)
+
+
+# --- 스트리밍 (NDJSON / chunked JSON) ---
+# 전체 본문을 만들지 않고 STREAM_CHUNK_ROWS 행씩 인코딩해서 내보냄
+# (StreamingResponse는 이전 청크 전송이 끝나야 다음 청크를 요청하므로 느린 클라이언트에도 메모리가 쌓이지 않음)
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_encode_default)
+
+
+def _chunks(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def has_rows(value):
+    """ dataset_rows로 행 목록을 만들 수 있는 값인지 (행 = dict, NDJSON 스트리밍 가능 여부) """
+    if isinstance(value, dict) and "data" in value:
+        value = value["data"]
+    elif isinstance(value, dict):
+        value = list(value.values())
+        if not value:
+            return False
+    return isinstance(value, list) and all(isinstance(row, dict) for row in value)
+
+
+def iter_ndjson(value, chunk_rows=STREAM_CHUNK_ROWS):
+    """ 데이터셋 값 -> NDJSON (한 줄에 1행, 구조는 dataset_rows와 같음) """
+    rows, _ = dataset_rows(value)
+    for chunk in _chunks(rows, chunk_rows):
+        yield "".join(_dumps(row) + "\n" for row in chunk).encode("utf-8")
+
+
+def iter_json(value, chunk_rows=STREAM_CHUNK_ROWS):
+    """
+    일반 JSON 응답과 같은 본문을 청크 단위로 생성
+    행 목록([...]) 또는 {"...": ..., "data": [...]}의 data만 나눠서 인코딩, 그 외는 한 번에
+    """
+    if isinstance(value, dict) and isinstance(value.get("data"), list):
+        head = {k: v for k, v in value.items() if k != "data"}
+        prefix = _dumps(head)[:-1] + ("," if head else "") + '"data":'
+        tail = "}"
+        rows = value["data"]
+    elif isinstance(value, list):
+        prefix, tail, rows = "", "", value
+    else:
+        yield _dumps(value).encode("utf-8")
+        return
+
+    yield (prefix + "[").encode("utf-8")
+    for i, chunk in enumerate(_chunks(rows, chunk_rows)):
+        body = ",".join(_dumps(row) for row in chunk)
+        yield (("," if i else "") + body).encode("utf-8")
+    yield ("]" + tail).encode("utf-8")
+
+
+def serialize(key, value, fmt):
+    if fmt == "msgpack":
+        return to_msgpack(value)
+    if fmt == "msgpack_packed":
+        return to_msgpack(value, packed=True)
+
+    table = build_table(key, value)
+    sink = io.BytesIO()
+    if fmt == "arrow":
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, sink)
+    return sink.getvalue()
+
+
+def export(key, value, version, fmt):
+    """
+    데이터셋을 FORMATS 중 하나의 바이트로 변환 (버전 단위 캐시)
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 포맷: {fmt}")
+    if not available(fmt):
+        raise RuntimeError(f"{fmt} 변환에 필요한 라이브러리가 설치되어 있지 않습니다.")
+
+    cached_entry = _export_cache.get((key, fmt))
+    if cached_entry and cached_entry[0] == version:
+        return cached_entry[1]
+
+    with _export_lock:
+        cached_entry = _export_cache.get((key, fmt))
+        if cached_entry and cached_entry[0] == version:
+            return cached_entry[1]
+        payload = serialize(key, value, fmt)
+        _export_cache[(key, fmt)] = (version, payload)
+        return payload
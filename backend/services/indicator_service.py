@@ -0,0 +1,69 @@
+import pandas as pd
+
+from .align_service import align_series, to_records
+
+# 설정 파일(indicators.json)로 선언한 지표의 계산부
+# - 입력: 선언한 시계열(열 이름 -> Series) / 변환(transform) -> {"title", "data": [{"date", 열..., "value"}]}
+# - 시계열 조회는 refresh 그래프가 제공처별로 묶어서 처리 (indicators.py fetch_plan)
+
+# transform별 필요한 시계열 수 (None = 1개 이상)
+TRANSFORMS = {
+    "level": None,         # 원값 그대로 (여러 개면 날짜 기준으로 맞춘 표)
+    "yoy": 1,              # 전년 동기 대비 변동률(%)
+    "pct_change": 1,       # periods 관측치 전 대비 변동률(%)
+    "diff": 1,             # periods 관측치 전 대비 차이
+    "spread": 2,           # 첫째 - 둘째
+    "ratio": 2,            # 첫째 / 둘째
+}
+
+
+def _yoy(series):
+    """ 1년 전 날짜(직전 관측치 기준) 대비 변동률(%) (월 / 분기 / 일별 공통) """
+    prev = series.asof(series.index - pd.DateOffset(years=1))
+    return (series / prev.to_numpy() - 1) * 100
+
+
+def apply_transform(df, transform, periods=1):
+    """ 날짜 x 시계열 DataFrame -> value Series (level은 None) """
+    first = df.iloc[:, 0]
+    if transform == "yoy":
+        return _yoy(first)
+    if transform == "pct_change":
+        return first.pct_change(periods=periods) * 100
+    if transform == "diff":
+        return first.diff(periods=periods)
+    if transform == "spread":
+        return first - df.iloc[:, 1]
+    if transform == "ratio":
+        return first / df.iloc[:, 1]
+    return None
+
+
+def build_indicator(indicator, *series):
+    """
+    선언한 지표 1개 계산 (series: indicator.series 순서의 원천 시계열)
+    입력이 비어 있으면 ValueError -> refresh 그래프가 이전 값을 유지
+    """
+    names = list(indicator.series)
+    if any(s is None or s.empty for s in series):
+        raise ValueError(f"{indicator.key}: 원천 시계열 없음 (Empty Data)")
+
+    df = align_series(dict(zip(names, series)), fill_limit=indicator.fill_limit)
+    if indicator.start:
+        # 변환에 필요한 앞부분(1년 전 등)을 계산한 뒤 표시 구간만 남김
+        start = pd.Timestamp(indicator.start)
+    elif indicator.days:
+        start = df.index.max() - pd.Timedelta(days=indicator.days)
+    else:
+        start = None
+
+    value = apply_transform(df, indicator.transform, indicator.periods)
+    if value is not None:
+        df["value"] = value
+    columns = indicator.columns or names + (["value"] if value is not None else [])
+    df = df.dropna(subset=columns)
+    if start is not None:
+        df = df.loc[start:]
+    if df.empty:
+        raise ValueError(f"{indicator.key}: 계산 결과 없음")
+    return {"title": indicator.title, "data": to_records(df, columns, indicator.decimals)}
@@ -1,97 +1,183 @@
 import pandas as pd
+import io
+import threading
+import time
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-from cachetools import TTLCache, cached
+from cachetools import cached
 from fredapi import Fred
 from dotenv import load_dotenv
 import os
 
+from . import provider_service, memory_service
+
 load_dotenv()
 
 # 캐시 설정
-macro_cache = TTLCache(maxsize=100, ttl=86400)
+macro_cache = memory_service.byte_cache("macro", ttl=86400, max_mb=4)
 
 # API 키 설정
+# 키가 없어도 fredgraph.csv(키 불필요) 경로로 조회 가능. fredapi는 CSV 실패 시 대체 경로로만 사용
 fred_key = os.getenv("FRED_API_KEY")
 if fred_key:
     fred = Fred(api_key=fred_key)
 else:
-    print("⚠️ 경고: FRED API 키가 없습니다. 거시경제 데이터 기능이 제한됩니다.")
+    print("⚠️ 경고: FRED API 키가 없습니다. CSV 다운로드 경로만 사용합니다.")
     fred = None
 
-def get_fred_data(series_id, start, end):
+# 여러 series를 한 번에 받는 CSV 경로 (id=A,B,C)
+FRED_CSV_URL = "https://fred.stlouisfed.org/graph/fredgraph.csv"
+
+# 최근 일괄 조회 결과 재사용 시간 (같은 refresh 안의 다른 호출자들에게 나눠줌)
+FRED_FANOUT_TTL = 600
+_fred_latest = memory_service.register_cache("fred_latest", {})   # series_id -> (Series, 조회 시작일, 조회 시각)
+_fred_lock = threading.Lock()
+
+
+def _date_str(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def fetch_fred_csv(series_ids, start, end=None):
     """
-    FRED 데이터 가져오기 (fredapi 사용)
+    fredgraph.csv로 여러 series를 요청 1회에 조회 -> 날짜 x series_id DataFrame
+    결측치('.')는 NaN, 값 컬럼은 float64로 바로 파싱
     """
-    if fred is None:
-        return pd.DataFrame()
+    params = {
+        "id": ",".join(series_ids),
+        # cosd(관측 시작일) / coed(관측 종료일)는 series별로 지정
+        "cosd": ",".join([start] * len(series_ids)),
+    }
+    if end:
+        params["coed"] = ",".join([end] * len(series_ids))
+    # timeout 예산 / Circuit Breaker / hedged request 적용
+    resp = provider_service.http_get("fred", FRED_CSV_URL, params=params)
+
+    df = pd.read_csv(
+        io.StringIO(resp.text),
+        index_col=0,
+        parse_dates=[0],
+        na_values=["."],
+        dtype={series_id: "float64" for series_id in series_ids},
+    )
+    missing = [series_id for series_id in series_ids if series_id not in df.columns]
+    if missing:
+        raise ValueError(f"CSV 응답에 없는 series: {missing}")
+    df.index.name = 'DATE'
+    return df[series_ids]
+
 
+def _fetch_fred_api(series_ids, start):
+    """ fredapi로 series별 조회 (CSV 경로 실패 시 대체) """
+    columns = {}
+    for series_id in series_ids:
+        try:
+            # 관측 시작일(observation_start) 지정으로 데이터량 조절
+            columns[series_id] = provider_service.call("fred", fred.get_series, series_id, observation_start=start)
+        except Exception as e:
+            print(f"FRED Error ({series_id}): {e}")
+    df = pd.DataFrame(columns)
+    df.index.name = 'DATE'
+    return df
+
+
+def get_fred_bulk(series_ids, start):
+    """
+    여러 FRED series를 한 번에 조회 -> 날짜 x series_id DataFrame (실패 시 빈 DataFrame)
+    1) fredgraph.csv 요청 1회  2) 실패 시 fredapi로 series별 조회 (키가 있을 때만)
+    """
+    series_ids = list(dict.fromkeys(series_ids))
+    start = _date_str(start)
     try:
-        # 관측 시작일(observation_start) 지정으로 데이터량 조절
-        series = fred.get_series(series_id, observation_start=start, end=end)
-        
-        # Series를 DataFrame으로 변환 및 정제
-        df = pd.DataFrame(series, columns=[series_id])
-        df.index.name = 'DATE'
-        
-        # 결측치 제거 (그래프 끊김 방지)
-        return df.dropna()
-        
+        df = fetch_fred_csv(series_ids, start)
     except Exception as e:
-        print(f"FRED Error ({series_id}): {e}")
-        return pd.DataFrame()
+        print(f"⚠️ FRED CSV Error ({','.join(series_ids)}): {e}")
+        if fred is None:
+            return pd.DataFrame()
+        df = _fetch_fred_api(series_ids, start)
 
+    # 같은 refresh 안의 개별 호출(get_fred_data)이 재요청하지 않도록 결과를 나눠둠
+    now = time.time()
+    with _fred_lock:
+        for series_id in df.columns:
+            _fred_latest[series_id] = (df[series_id].dropna(), start, now)
+    return df
 
-# 2. Macro Health
-@cached(cache=macro_cache)
-def get_macro_data(series_id, label):
-    data = []
-    
-    # 비상용 가짜 데이터 (서버 다운 방지)
-    def generate_mock_data():
-        print(f"⚠️ [Fallback] {label} - Mock Data Used")
-        mock = []
-        base = 3.5 if "Unemployment" in label else 3.0 # CPI도 이제 %니까 3.0 근처로
-        for i in range(24):
-            # KST 기준 오늘 날짜 (목 데이터 생성 시에도 일관성 유지)
-            d = datetime.now(ZoneInfo("Asia/Seoul")) - timedelta(days=30 * (23 - i))
-            val = base + (i % 5) * 0.1
-            mock.append({"date": d.strftime("%Y-%m-%d"), "value": round(val, 2)})
-        return mock
 
+def get_fred_data(series_id, start, end):
+    """
+    FRED 데이터 가져오기 (최근 일괄 조회 결과가 있으면 재사용, 없으면 CSV 1건 조회)
+    """
+    start, end = _date_str(start), _date_str(end)
+
+    cached_entry = _fred_latest.get(series_id)
+    if cached_entry and start >= cached_entry[1] and time.time() - cached_entry[2] < FRED_FANOUT_TTL:
+        series = cached_entry[0]
+    else:
+        df = get_fred_bulk([series_id], start)
+        if series_id not in df:
+            return pd.DataFrame()
+        series = df[series_id]
+
+    # Series를 DataFrame으로 변환 및 정제 (결측치 제거 -> 그래프 끊김 방지)
+    df = pd.DataFrame({series_id: series.loc[start:end]}).dropna()
+    df.index.name = 'DATE'
+    return df
+
+
+# 조회 시작일 (변동률 계산 위해 1년 더 필요하므로 넉넉하게)
+MACRO_START = datetime(2014, 1, 1)
+
+
+# 비상용 가짜 데이터 (서버 다운 방지)
+@provider_service.mock_fallback
+def generate_mock_macro(label):
+    print(f"⚠️ [Fallback] {label} - Mock Data Used")
+    mock = []
+    base = 3.5 if "Unemployment" in label else 3.0 # CPI도 이제 %니까 3.0 근처로
+    for i in range(24):
+        # KST 기준 오늘 날짜 (목 데이터 생성 시에도 일관성 유지)
+        d = datetime.now(ZoneInfo("Asia/Seoul")) - timedelta(days=30 * (23 - i))
+        val = base + (i % 5) * 0.1
+        mock.append({"date": d.strftime("%Y-%m-%d"), "value": round(val, 2)})
+    return mock
+
+
+def build_macro_data(series, series_id, label):
+    """
+    FRED 원천 시계열 -> {"title", "data"} 결과 (입력이 없으면 Mock Data)
+    """
     try:
-        # 데이터 넉넉하게 가져오기 (변동률 계산 위해 1년 더 필요)
-        # KST 기준으로 '현재' 시점 설정
-        now_kst = datetime.now(ZoneInfo("Asia/Seoul"))
-        start = datetime(2014, 1, 1) 
-        end = now_kst
-        df = get_fred_data(series_id, start, end)
-        
-        if df.empty: raise ValueError("Empty Data")
+        if series is None or series.empty: raise ValueError("Empty Data")
 
         # ✅ [핵심 수정] CPI인 경우 -> 전년 대비 증감율(YoY %) 계산
         if series_id == "CPIAUCSL":
             # pct_change(12): 12개월 전과 비교
             # * 100: 퍼센트 단위로 변환
-            df['calculated_value'] = df[series_id].pct_change(periods=12) * 100
+            values = series.pct_change(periods=12) * 100
         else:
             # 실업률(UNRATE)은 이미 % 단위이므로 그대로 사용
-            df['calculated_value'] = df[series_id]
+            values = series
 
         # 계산하느라 앞쪽 12개월은 비게 되므로 제거 (dropna)
-        df = df.dropna()
-
-        for date, row in df.iterrows():
-            val = row['calculated_value']
-            if pd.isna(val): continue
-            
-            data.append({
-                "date": date.strftime("%Y-%m-%d"), 
-                "value": round(float(val), 2)
-            })
-            
+        values = values.dropna().astype(float).round(2)
+
+        data = [
+            {"date": date, "value": value}
+            for date, value in zip(values.index.strftime("%Y-%m-%d"), values.tolist())
+        ]
         return {"title": label, "data": data}
 
     except Exception as e:
         print(f"❌ [Macro Error] {series_id}: {e}")
-        return {"title": label, "data": generate_mock_data()}
+        return {"title": label, "data": generate_mock_macro(label)}
+
+
+# 2. Macro Health
+@cached(cache=macro_cache)
+def get_macro_data(series_id, label):
+    # KST 기준으로 '현재' 시점 설정
+    now_kst = datetime.now(ZoneInfo("Asia/Seoul"))
+    df = get_fred_data(series_id, MACRO_START, now_kst)
+    series = df[series_id] if series_id in df else None
+    return build_macro_data(series, series_id, label)
@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache, TTLCache
+
+# 메모리 사용량 추적 (Fly VM 512MB 환경에서 OOM 원인 파악용)
+# - 데이터셋 / 캐시별 바이트 크기 (pandas는 memory_usage(deep=True), 그 외는 재귀 sys.getsizeof)
+# - RSS 기록 (1분 간격 + refresh 전후)
+# - TRACEMALLOC=1이면 refresh 전후 tracemalloc 스냅샷 비교 -> 가장 많이 늘어난 할당 위치
+# - 캐시는 항목 수가 아니라 바이트 기준으로 제한 (CACHE_MB_<이름> 환경변수로 조정)
+
+RSS_HISTORY = deque(maxlen=720)      # (시각, rss 바이트, 라벨) - 1분 간격이면 12시간
+REFRESH_MEMORY = deque(maxlen=10)    # 최근 refresh별 RSS 변화 / 할당 상위 위치
+CACHES = {}                          # 이름 -> 캐시 (바이트 크기 보고 대상)
+
+TRACEMALLOC_TOP = 15
+MEMORY_WARN_MB = float(os.getenv("MEMORY_WARN_MB", "400"))
+
+if os.getenv("TRACEMALLOC") == "1" and not tracemalloc.is_tracing():
+    tracemalloc.start(int(os.getenv("TRACEMALLOC_FRAMES", "1")))
+
+
+# --- 크기 계산 ---
+
+def deep_sizeof(obj, _seen=None):
+    """ 객체가 참조하는 전체 바이트 추정 (같은 객체는 한 번만 계산) """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) if obj.base is None else obj.nbytes
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(v, _seen) for v in obj)
+    return size
+
+
+# --- 바이트 기준 캐시 ---
+
+def _budget_bytes(name, max_mb):
+    return int(float(os.getenv(f"CACHE_MB_{name.upper()}", max_mb)) * 1024 * 1024)
+
+
+def byte_cache(name, ttl=None, max_mb=16):
+    """
+    항목 크기 합계가 max_mb를 넘으면 오래된 항목부터 제거하는 캐시 (ttl 지정 시 TTLCache)
+    예산보다 큰 값 하나는 캐시하지 않음 (cachetools.cached가 ValueError를 무시)
+    """
+    maxsize = _budget_bytes(name, max_mb)
+    if ttl is None:
+        cache = LRUCache(maxsize=maxsize, getsizeof=deep_sizeof)
+    else:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl, getsizeof=deep_sizeof)
+    return register_cache(name, cache)
+
+
+def register_cache(name, cache):
+    """ 메모리 보고 대상에 추가 (dict 형태의 직접 관리 캐시도 가능) """
+    CACHES[name] = cache
+    return cache
+
+
+def cache_stats():
+    stats = {}
+    for name, cache in CACHES.items():
+        if hasattr(cache, "currsize"):
+            # byte_cache: 항목 크기 합계를 cachetools가 이미 관리
+            stats[name] = {"entries": len(cache), "bytes": int(cache.currsize), "max_bytes": int(cache.maxsize)}
+        else:
+            stats[name] = {"entries": len(cache), "bytes": deep_sizeof(dict(cache)), "max_bytes": None}
+    return stats
+
+
+# --- RSS ---
+
+def current_rss():
+    """ 현재 프로세스 RSS (바이트) """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # /proc이 없는 환경 (macOS 등): 최대 RSS로 대체
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def sample_rss(label="interval"):
+    rss = current_rss()
+    RSS_HISTORY.append((time.time(), rss, label))
+    if rss > MEMORY_WARN_MB * 1024 * 1024:
+        print(f"⚠️ [Memory] RSS {rss / 1024 / 1024:.0f}MB > {MEMORY_WARN_MB:.0f}MB")
+    return rss
+
+
+# --- Refresh 전후 추적 ---
+
+def _top_allocations(before, after):
+    stats = after.compare_to(before, "lineno")
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_diff": stat.size_diff,
+            "size": stat.size,
+            "count_diff": stat.count_diff,
+        }
+        for stat in stats[:TRACEMALLOC_TOP]
+    ]
+
+
+@contextmanager
+def track_refresh():
+    """ refresh 1회 전후 RSS / tracemalloc 스냅샷 비교 결과를 REFRESH_MEMORY에 기록 """
+    started = time.time()
+    rss_before = sample_rss("refresh_start")
+    snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+    try:
+        yield
+    finally:
+        rss_after = sample_rss("refresh_end")
+        record = {
+            "started": started,
+            "duration_s": round(time.time() - started, 1),
+            "rss_before": rss_before,
+            "rss_after": rss_after,
+            "rss_diff": rss_after - rss_before,
+            "top_allocations": None,
+        }
+        if snapshot is not None:
+            record["top_allocations"] = _top_allocations(snapshot, tracemalloc.take_snapshot())
+        REFRESH_MEMORY.append(record)
+        print(f"🧠 [Memory] refresh RSS {rss_before / 1024 / 1024:.0f}MB -> {rss_after / 1024 / 1024:.0f}MB")
+
+
+def memory_report(stores):
+    """
+    stores: {"data_store": DATA_STORE, ...} 처럼 이름 -> {키: 값}
+    키별 바이트는 큰 순으로 정렬
+    """
+    sizes = {}
+    for name, mapping in stores.items():
+        per_key = {key: deep_sizeof(value) for key, value in mapping.items()}
+        sizes[name] = {
+            "total_bytes": sum(per_key.values()),
+            "keys": dict(sorted(per_key.items(), key=lambda kv: kv[1], reverse=True)),
+        }
+    return {
+        "rss_bytes": current_rss(),
+        "stores": sizes,
+        "caches": cache_stats(),
+        "rss_history": [{"at": at, "rss_bytes": rss, "label": label} for at, rss, label in RSS_HISTORY],
+        "refreshes": list(REFRESH_MEMORY),
+        "tracemalloc": tracemalloc.is_tracing(),
+    }
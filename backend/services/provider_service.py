@@ -0,0 +1,396 @@
+import heapq
+import itertools
+import requests
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import wraps
+
+# 외부 데이터 제공처(ECOS / FRED / Yahoo / KRX) 호출 공통 처리
+# - 제공처별 Circuit Breaker: 연속 N회 실패 시 차단(open), reset 시간이 지나면 1건만 시험 호출(half-open)
+# - 요청 timeout은 제공처 기본값과 현재 refresh 남은 시간(deadline) 중 작은 값
+# - hedged request: 멱등 GET이 hedge_after초 안에 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 온 응답 사용
+# - 요청 예산: 제공처별 초당 요청 수 / 동시 요청 수 제한, 우선순위(high / normal / low) 순으로 대기
+# - 응답은 정상인데 데이터가 없으면(NoData, 예: 없는 종목) 실패로 세지 않음 -> 잘못된 입력으로 차단되지 않음
+
+PROVIDERS = {
+    # timeout: 요청 1건 최대 대기(초) / failures: 차단까지 연속 실패 수
+    # reset: 차단 후 시험 호출까지(초) / hedge_after: 중복 요청 발송 시점(초, None = 사용 안 함)
+    # rate / burst: 초당 요청 수 / 순간 최대 요청 수 (token bucket) / concurrency: 동시 요청 수
+    "ecos": {"timeout": 10, "failures": 3, "reset": 120, "hedge_after": 3.0, "rate": 5, "burst": 10, "concurrency": 4},
+    "fred": {"timeout": 10, "failures": 3, "reset": 120, "hedge_after": 3.0, "rate": 2, "burst": 5, "concurrency": 2},
+    "yahoo": {"timeout": 10, "failures": 5, "reset": 60, "hedge_after": None, "rate": 2, "burst": 5, "concurrency": 4},
+    # 공개 ?symbols= 조회 전용 (refresh와 차단 / 예산을 나눔 -> 외부 요청이 refresh의 yahoo 조회를 막지 못함)
+    "yahoo_symbols": {"timeout": 10, "failures": 5, "reset": 60, "hedge_after": None, "rate": 1, "burst": 3, "concurrency": 2},
+    "krx": {"timeout": 10, "failures": 3, "reset": 300, "hedge_after": None, "rate": 1, "burst": 2, "concurrency": 2},
+}
+
+# 요청 우선순위 (값이 작을수록 먼저): Market Pulse / 사용자 요청 > 일별 지표 > 월별 지표
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+RATE_LIMIT_PAUSE = 5    # 429 응답에 Retry-After가 없을 때 해당 제공처 요청을 멈추는 시간(초)
+
+
+class CircuitOpenError(Exception):
+    """ 제공처 차단 중 (호출하지 않고 바로 실패) """
+
+
+class DeadlineExceeded(Exception):
+    """ 이번 refresh에 할당된 시간 초과 """
+
+
+class NoData(ValueError):
+    """ 제공처는 정상 응답했지만 데이터 없음 (없는 종목 / 기간 등, Circuit Breaker 실패로 세지 않음) """
+
+
+class CircuitBreaker:
+    def __init__(self, name, failures, reset):
+        self.name = name
+        self.threshold = failures
+        self.reset = reset
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open" and time.time() - self.opened_at >= self.reset:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                # half-open 상태에서는 시험 호출 1건만 허용
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                if self.state != "open":
+                    print(f"⛔ [Circuit] {self.name} opened ({self.failures} failures)")
+                self.state = "open"
+                self.opened_at = time.time()
+            self._probing = False
+
+    def release_probe(self):
+        """ 성공 / 실패로 세지 않는 결과 (NoData): half-open 시험 호출 자리만 반납 """
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self):
+        return {"state": self.state, "failures": self.failures, "opened_at": self.opened_at}
+
+
+BREAKERS = {name: CircuitBreaker(name, cfg["failures"], cfg["reset"]) for name, cfg in PROVIDERS.items()}
+
+
+# --- Request Budget (제공처별 요청 예산) ---
+# token bucket(초당 요청 수 + burst) + 동시 요청 수 제한 + 우선순위 대기열
+# 모든 외부 호출(call / http_get)이 슬롯을 얻은 뒤 실행 -> refresh가 한꺼번에 요청을 보내도 제공처 한도(429) 안에서 순서대로
+# 대기열은 (우선순위, 도착 순서) 순, 대기 시간은 제공처 / 우선순위별로 집계 (/api/refresh/providers)
+
+class RequestBudget:
+    def __init__(self, name, rate, burst, concurrency):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0      # 429 응답 후 재개 시각
+        self.active = 0
+        self._queue = []             # heap: (우선순위, 도착 순서)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.waits = deque(maxlen=500)                        # 최근 대기 시간(초)
+        self.by_priority = {p: [0, 0.0] for p in PRIORITIES}  # 우선순위 -> [요청 수, 대기 합계(초)]
+        self.rate_limited = 0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _delay(self, now):
+        """ 대기열 맨 앞 요청이 실행 가능해질 때까지 남은 시간 (동시 요청 수 초과 시 None = release 알림 대기) """
+        if self.active >= self.concurrency:
+            return None
+        return max(self.paused_until - now, (1 - self.tokens) / self.rate, 0)
+
+    def acquire(self, priority="normal", timeout=None):
+        """ 슬롯 획득 (timeout 안에 못 얻으면 DeadlineExceeded) -> 대기 시간(초) """
+        ticket = (PRIORITIES[priority], next(self._seq))
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    delay = self._delay(now)
+                    if self._queue[0] == ticket and delay == 0:
+                        break
+                    if self._queue[0] != ticket:
+                        delay = None
+                    left = None if timeout is None else timeout - (now - started)
+                    if left is not None and left <= 0:
+                        raise DeadlineExceeded(f"{self.name}: 요청 대기 시간 초과 ({len(self._queue)} queued)")
+                    limits = [d for d in (delay, left) if d is not None]
+                    self._cond.wait(min(limits) if limits else None)
+            except BaseException:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self.tokens -= 1
+            self.active += 1
+            waited = time.monotonic() - started
+            self.waits.append(waited)
+            stats = self.by_priority[priority]
+            stats[0] += 1
+            stats[1] += waited
+            # 다음 요청이 맨 앞이 됨
+            self._cond.notify_all()
+        _local.queue_wait = getattr(_local, "queue_wait", 0.0) + waited
+        return waited
+
+    def try_acquire(self):
+        """ 대기 없이 바로 가능한 경우에만 슬롯 획득 (hedged request 추가 요청용) """
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if self._queue or self._delay(now) != 0:
+                return False
+            self.tokens -= 1
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """ 429 응답: 해당 제공처 요청을 잠시 멈춤 """
+        with self._cond:
+            self.rate_limited += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        print(f"🐢 [Budget] {self.name} rate limited, paused {seconds:.1f}s")
+
+    def snapshot(self):
+        waits = sorted(self.waits)
+        ms = lambda v: round(v * 1000, 1)
+        return {
+            "rate": self.rate, "burst": self.burst, "concurrency": self.concurrency,
+            "active": self.active, "queued": len(self._queue), "tokens": round(self.tokens, 2),
+            "rate_limited": self.rate_limited,
+            "wait_ms": {
+                "avg": ms(sum(waits) / len(waits)) if waits else None,
+                "p95": ms(waits[min(len(waits) - 1, int(len(waits) * 0.95))]) if waits else None,
+                "max": ms(waits[-1]) if waits else None,
+            },
+            "by_priority": {
+                p: {"requests": n, "avg_wait_ms": ms(total / n) if n else None}
+                for p, (n, total) in self.by_priority.items()
+            },
+        }
+
+
+BUDGETS = {
+    name: RequestBudget(name, cfg["rate"], cfg["burst"], cfg["concurrency"])
+    for name, cfg in PROVIDERS.items()
+}
+
+
+# --- Deadline (스레드별) ---
+# refresh 그래프가 노드를 실행하는 스레드마다 마감 시각을 지정 -> 그 안의 모든 요청 timeout이 남은 시간으로 제한됨
+
+_local = threading.local()
+
+
+def set_deadline(deadline):
+    """ 현재 스레드의 마감 시각 (time.monotonic 기준, None = 제한 없음) """
+    _local.deadline = deadline
+
+
+def remaining():
+    deadline = getattr(_local, "deadline", None)
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def set_priority(priority):
+    """ 현재 스레드 요청의 우선순위 (high / normal / low, None = normal) """
+    _local.priority = priority
+
+
+def current_priority():
+    return getattr(_local, "priority", None) or "normal"
+
+
+@contextmanager
+def priority(level):
+    """ with provider_service.priority("high"): ... (사용자 요청 처리 중 on-demand 조회 등) """
+    previous = getattr(_local, "priority", None)
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def reset_queue_wait():
+    _local.queue_wait = 0.0
+
+
+def queue_wait():
+    """ 현재 스레드가 요청 예산 대기열에서 기다린 시간 합계(초) """
+    return getattr(_local, "queue_wait", 0.0)
+
+
+def request_timeout(provider):
+    """ 제공처 기본 timeout과 남은 시간 중 작은 값 (남은 시간이 없으면 DeadlineExceeded) """
+    timeout = PROVIDERS[provider]["timeout"]
+    left = remaining()
+    if left is not None:
+        if left <= 0:
+            raise DeadlineExceeded(f"{provider}: refresh deadline exceeded")
+        timeout = min(timeout, left)
+    return timeout
+
+
+# --- 호출 ---
+
+def call(provider, func, *args, **kwargs):
+    """ 요청 예산 슬롯 + Circuit Breaker를 거쳐 호출 (yfinance / pykrx 등 HTTP 외 라이브러리 호출에도 사용) """
+    breaker = BREAKERS[provider]
+    if breaker.state == "open" and time.time() - breaker.opened_at < breaker.reset:
+        # 차단 중이면 대기열에 들어가지 않고 바로 실패
+        raise CircuitOpenError(f"{provider} circuit open")
+    budget = BUDGETS[provider]
+    budget.acquire(current_priority(), timeout=remaining())
+    try:
+        if not breaker.allow():
+            raise CircuitOpenError(f"{provider} circuit open")
+        try:
+            result = func(*args, **kwargs)
+        except NoData:
+            breaker.release_probe()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+    finally:
+        budget.release()
+    breaker.record_success()
+    return result
+
+
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+
+
+def _hedged(provider, attempt, hedge_after, timeout):
+    futures = {_hedge_pool.submit(attempt)}
+    done, _ = wait(futures, timeout=hedge_after)
+    budget = BUDGETS[provider]
+    if not done and budget.try_acquire():
+        # 응답이 늦으면 같은 요청을 한 번 더 (먼저 성공한 응답 사용, 요청 예산에 여유가 있을 때만)
+        def hedge():
+            try:
+                return attempt()
+            finally:
+                budget.release()
+        futures.add(_hedge_pool.submit(hedge))
+
+    end = time.monotonic() + timeout
+    error = None
+    pending = futures
+    while pending:
+        done, pending = wait(pending, timeout=max(0, end - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error or requests.Timeout(f"hedged request timed out after {timeout:.1f}s")
+
+
+def http_get(provider, url, params=None, hedge=True):
+    """
+    제공처 GET 요청 (timeout 예산 + Circuit Breaker + 선택적 hedged request)
+    HTTP 오류 응답도 실패로 집계
+    """
+    timeout = request_timeout(provider)
+    deadline = getattr(_local, "deadline", None)
+
+    def attempt():
+        # 요청 예산 대기열에서 기다린 만큼 남은 시간도 줄어듦
+        left = None if deadline is None else deadline - time.monotonic()
+        resp = requests.get(url, params=params, timeout=timeout if left is None else max(0.1, min(timeout, left)))
+        if resp.status_code == 429:
+            # 한도 초과: 이 제공처의 대기열 전체를 Retry-After만큼 멈춤
+            retry_after = resp.headers.get("Retry-After", "")
+            BUDGETS[provider].pause(float(retry_after) if retry_after.isdigit() else RATE_LIMIT_PAUSE)
+        resp.raise_for_status()
+        return resp
+
+    hedge_after = PROVIDERS[provider]["hedge_after"] if hedge else None
+    if hedge_after is None or hedge_after >= timeout:
+        return call(provider, attempt)
+    return call(provider, _hedged, provider, attempt, hedge_after, timeout)
+
+
+def yahoo_empty_error():
+    """
+    yf.download 빈 결과 -> 예외 (다운로드 직후 호출)
+    yfinance는 오류를 종목별로 기록하고 빈 DataFrame을 돌려줌 -> 모든 종목이 "종목 / 시세 없음"이면 NoData,
+    네트워크 / 한도 초과 등이 섞여 있거나 기록이 없으면 제공처 실패(ValueError)
+    """
+    from yfinance import shared
+
+    errors = list(getattr(shared, "_ERRORS", {}).values())
+    if errors and all(e.startswith(("YFTzMissingError", "YFPricesMissingError", "YFTickerMissingError")) for e in errors):
+        return NoData(f"Empty DataFrame ({len(errors)} symbols not found)")
+    return ValueError("Empty DataFrame")
+
+
+def breaker_states():
+    return {name: {**breaker.snapshot(), "budget": BUDGETS[name].snapshot()} for name, breaker in BREAKERS.items()}
+
+
+# --- Fallback (Mock Data) 추적 ---
+# Mock Data 생성 함수에 @mock_fallback을 붙이면, 같은 스레드에서 fallback이 쓰였는지 확인 가능
+# (refresh 그래프가 정상 값을 Mock Data로 덮어쓰지 않도록 판단하는 데 사용)
+
+def reset_fallback():
+    _local.fallback = False
+
+
+def mark_fallback():
+    _local.fallback = True
+
+
+def fallback_used():
+    return getattr(_local, "fallback", False)
+
+
+def mock_fallback(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        mark_fallback()
+        return func(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,377 @@
+import pandas as pd
+import numpy as np
+import yfinance as yf
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from cachetools import cached
+from cachetools.keys import hashkey
+from dotenv import load_dotenv
+from urllib.parse import quote, unquote
+import os
+
+from .macro_service import get_fred_data
+from .align_service import align_series, extract_close, to_records
+from . import provider_service, memory_service
+
+load_dotenv()
+
+# API 키 설정
+ecos_key = os.getenv("ECOS_API_KEY")
+
+# 원천 시계열 저장소 ("source:id" -> 최근 수신한 pd.Series)
+# 서비스들이 ECOS / FRED / Yahoo에서 받아온 원본을 여기 남겨두고, 파생 지표(스프레드/비율)는 여기서 계산
+# 키 형식
+#   ecos:<통계표>/<항목>   예) ecos:817Y002/010200000 (국고채 3년)
+#   ecos:<통계표>/<항목>@<주기>  일별 외 주기 (M / Q / A)  예) ecos:901Y009/0@M (소비자물가 총지수, 월)
+#   fred:<series_id>       예) fred:DGS10
+#   yahoo:<ticker>         예) yahoo:^GSPC
+SOURCES = ("ecos", "fred", "yahoo")
+SERIES_STORE = {}
+_store_lock = threading.Lock()
+
+# 요청 시점에 없던 시계열을 직접 받아올 때의 기본 조회 기간 / 재사용 시간
+DEFAULT_LOOKBACK_DAYS = 3700
+ON_DEMAND_TTL = 3600
+# 직접 조회 결과 (SERIES_STORE와 분리 -> refresh 그래프가 관리하는 시계열을 덮어쓰지 않음, 바이트 기준 상한)
+on_demand_cache = memory_service.byte_cache("on_demand_series", ttl=ON_DEMAND_TTL, max_mb=16)
+_on_demand_versions = itertools.count(1)
+
+# 파생 계산 결과 LRU 캐시 (바이트 기준, 10년치 일별 결과 1건이 약 1MB)
+derived_cache = memory_service.byte_cache("derived_series", max_mb=32)
+
+# 원천 시계열 디스크 저장소 (backfill.py가 장기 이력을 채움, 앱 시작 시 SERIES_STORE로 읽음)
+# - 형식: SERIES_DIR/<quote(key)>.csv (date,value)
+# - SERIES_DIR 사용 시 refresh는 저장된 시계열의 마지막 날짜 - INCREMENTAL_OVERLAP_DAYS 이후만 조회해 이어붙임
+#   (15년치 ECOS 등 대용량 요청을 서빙 프로세스에서 하지 않음, 겹치는 구간은 수정치 반영용)
+SERIES_DIR = os.getenv("SERIES_DIR")
+INCREMENTAL_OVERLAP_DAYS = int(os.getenv("INCREMENTAL_OVERLAP_DAYS", "30"))
+COVERAGE_SLACK_DAYS = 10    # 저장된 시계열 시작일이 요청 시작일보다 이만큼 늦어도 (휴일 등) 전체 구간이 있는 것으로 봄
+
+
+def parse_series_key(key):
+    """ "fred:DGS10" -> ("fred", "DGS10") (형식 오류는 ValueError) """
+    source, sep, ident = key.partition(":")
+    source = source.strip().lower()
+    ident = ident.strip()
+    if not sep or source not in SOURCES or not ident:
+        raise ValueError(f"잘못된 시계열 키: '{key}' (형식: <ecos|fred|yahoo>:<id>)")
+    if source == "ecos" and "/" not in ident:
+        raise ValueError(f"ECOS 키는 '<통계표>/<항목>' 형식이어야 합니다: '{key}'")
+    return source, ident.upper()
+
+
+# 공개 API(/api/series)에서 직접 조회를 허용하는 시계열 (refresh가 받아둔 시계열은 목록과 무관하게 조회 가능)
+ON_DEMAND_KEYS = {
+    "{}:{}".format(*parse_series_key(key)) for key in os.getenv(
+        "ON_DEMAND_SERIES",
+        "fred:DGS1,fred:DGS5,fred:DGS30,fred:DTB3,yahoo:^VIX,yahoo:CL=F,yahoo:HG=F,yahoo:DX-Y.NYB",
+    ).split(",") if key.strip()
+}
+
+
+def store_series(key, series):
+    """
+    원천 시계열을 저장소에 기록. 내용이 바뀐 경우에만 버전 증가
+    (버전은 파생 계산 캐시 키로 사용되므로, 같은 데이터면 캐시가 그대로 재사용됨)
+    """
+    if series is None or series.empty:
+        return
+    with _store_lock:
+        prev = SERIES_STORE.get(key)
+        if prev is not None and prev["series"].equals(series):
+            prev["fetched_at"] = time.time()
+            return
+        SERIES_STORE[key] = {
+            "series": series,
+            "version": (prev["version"] + 1) if prev else 1,
+            "fetched_at": time.time(),
+        }
+
+
+def series_path(key, directory=None):
+    return os.path.join(directory or SERIES_DIR, quote(key, safe="") + ".csv")
+
+
+def write_series(path, series):
+    """ 시계열 -> CSV (임시 파일 -> 교체) """
+    tmp = path + ".tmp"
+    series.to_csv(tmp, header=["value"], index_label="date", date_format="%Y-%m-%d")
+    os.replace(tmp, path)
+
+
+def read_series(path):
+    df = pd.read_csv(path, index_col=0, parse_dates=[0], dtype={"value": "float64"})
+    return df["value"].dropna().rename(None)
+
+
+def save_series(key, series, directory=None):
+    directory = directory or SERIES_DIR
+    os.makedirs(directory, exist_ok=True)
+    write_series(series_path(key, directory), series)
+
+
+def load_series_dir(directory=None):
+    """ 디스크 저장소의 시계열을 SERIES_STORE로 읽음 (앱 시작 시 1회) -> 읽은 개수 """
+    directory = directory or SERIES_DIR
+    if not directory or not os.path.isdir(directory):
+        return 0
+    count = 0
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".csv"):
+            continue
+        key = unquote(name[:-len(".csv")])
+        try:
+            store_series(key, read_series(os.path.join(directory, name)))
+            count += 1
+        except Exception as e:
+            print(f"⚠️ [Series] {name} 읽기 실패: {e}")
+    print(f"💽 [Series] {count} series loaded from {directory}")
+    return count
+
+
+def merge_series(old, recent):
+    """ 저장된 시계열 + 최근 구간 조회 결과 (겹치는 날짜는 최근 값) """
+    if old is None or old.empty:
+        return recent
+    return pd.concat([old[old.index < recent.index.min()], recent])
+
+
+def fetch_incremental(key, start, fetch):
+    """
+    start부터의 시계열 조회 + 저장소 기록
+    SERIES_DIR 사용 중이고 저장소에 start부터 이어진 시계열이 있으면 마지막 날짜 - INCREMENTAL_OVERLAP_DAYS 이후만
+    fetch(조회 시작일: Timestamp) -> Series (저장소 기록 없이)로 받아 이어붙임 (실패 시 빈 Series)
+    """
+    start = pd.Timestamp(start)
+    entry = SERIES_STORE.get(key)
+    old = entry["series"] if entry is not None else None
+    if SERIES_DIR and old is not None and not old.empty and old.index.min() <= start + timedelta(days=COVERAGE_SLACK_DAYS):
+        resume = old.index.max() - timedelta(days=INCREMENTAL_OVERLAP_DAYS)
+        recent = fetch(max(resume, start))
+        if recent.empty:
+            return recent
+        series = merge_series(old, recent).loc[start:]
+    else:
+        series = fetch(start)
+        if series.empty:
+            return series
+    store_series(key, series)
+    if SERIES_DIR:
+        save_series(key, series)
+    return series
+
+
+# --- Fetchers (원천별 조회 + 저장소 기록) ---
+
+# ECOS 주기별 시점(TIME) 형식: 일 20240131 / 월 202401 / 분기 2024Q1 / 연 2024
+ECOS_TIME_FORMATS = {"D": "%Y%m%d", "M": "%Y%m", "A": "%Y"}
+ECOS_PAGE_ROWS = 20000      # 통계표 전체 조회 시 요청 1회당 최대 행 수 (응답 JSON 파싱 메모리 상한)
+
+
+def ecos_period(value, cycle="D"):
+    """ 날짜 -> ECOS 조회 시점 문자열 (주기별 형식, 문자열이면 그대로) """
+    if isinstance(value, str):
+        return value
+    value = pd.Timestamp(value)
+    if cycle == "Q":
+        return f"{value.year}Q{value.quarter}"
+    return value.strftime(ECOS_TIME_FORMATS[cycle])
+
+
+def _ecos_index(times, cycle="D"):
+    """ ECOS TIME 열 -> DatetimeIndex (월 / 분기 / 연은 기간 시작일) """
+    if cycle == "Q":
+        return pd.PeriodIndex(times.str.replace("Q", "-Q"), freq="Q").to_timestamp()
+    return pd.DatetimeIndex(pd.to_datetime(times, format=ECOS_TIME_FORMATS[cycle]))
+
+
+def fetch_ecos(stat_code, item_code, start_date, end_date, cycle="D", limit=20000, store=True):
+    """
+    ECOS StatisticSearch 조회 -> 날짜 인덱스 float Series (실패 시 빈 Series, store=False면 저장소에 기록하지 않음)
+    URL: /StatisticSearch/apikey/json/kr/1/{limit}/stat_code/cycle/start/end/item_code
+    """
+    if not ecos_key:
+        return pd.Series(dtype=float)
+
+    url = f"http://ecos.bok.or.kr/api/StatisticSearch/{ecos_key}/json/kr/1/{limit}/{stat_code}/{cycle}/{start_date}/{end_date}/{item_code}"
+    try:
+        # timeout 예산 / Circuit Breaker / hedged request 적용
+        data = provider_service.http_get("ecos", url).json()
+        if 'StatisticSearch' in data and 'row' in data['StatisticSearch']:
+            df = pd.DataFrame(data['StatisticSearch']['row'])
+            series = pd.Series(
+                pd.to_numeric(df['DATA_VALUE'], errors='coerce').to_numpy(),
+                index=_ecos_index(df['TIME'], cycle),
+                name=f"{stat_code}/{item_code}",
+            ).dropna()
+            if store:
+                store_series(f"ecos:{stat_code}/{item_code}" + ("" if cycle == "D" else f"@{cycle}"), series)
+            return series
+    except Exception as e:
+        print(f"⚠️ ECOS Fetch Error ({stat_code}-{item_code}): {e}")
+
+    return pd.Series(dtype=float)
+
+
+def _ecos_table_page(rows, items=None):
+    """ ECOS 응답 행 목록 -> (TIME, item, value) DataFrame (다단계 항목은 "코드1/코드2", items 지정 시 해당 항목만) """
+    if not rows:
+        return pd.DataFrame(columns=["TIME", "item", "value"])
+    df = pd.DataFrame(rows)
+    item = df["ITEM_CODE1"].astype(str)
+    for col in ("ITEM_CODE2", "ITEM_CODE3", "ITEM_CODE4"):
+        if col in df:
+            part = df[col].fillna("").astype(str)
+            item = item.mask((part != "") & (part != "null"), item + "/" + part)
+    page = pd.DataFrame({"TIME": df["TIME"], "item": item, "value": pd.to_numeric(df["DATA_VALUE"], errors="coerce")})
+    return page[page["item"].isin(items)] if items is not None else page
+
+
+def fetch_ecos_table(stat_code, start_date, end_date, cycle="D", items=None):
+    """
+    ECOS 통계표 전체 항목을 요청 1회(행이 많으면 ECOS_PAGE_ROWS 단위 페이지)로 조회
+    -> 날짜 x 항목 코드 DataFrame (다단계 항목은 "코드1/코드2", items 지정 시 해당 열만, 실패 시 예외)
+    항목 코드를 생략하면 ECOS가 통계표의 모든 항목을 반환 -> 같은 표의 여러 시계열을 한 번에 받음
+    페이지마다 필요한 열 / 항목만 남기고 원본 행은 버림 (쓰지 않는 항목까지 JSON 행으로 쌓아두지 않음)
+    """
+    if not ecos_key:
+        raise ValueError("ECOS_API_KEY 없음")
+    base = f"http://ecos.bok.or.kr/api/StatisticSearch/{ecos_key}/json/kr"
+    pages, first = [], 1
+    while True:
+        url = f"{base}/{first}/{first + ECOS_PAGE_ROWS - 1}/{stat_code}/{cycle}/{start_date}/{end_date}"
+        data = provider_service.http_get("ecos", url).json()
+        if "StatisticSearch" not in data:
+            # 조회 결과 없음 / 인증 오류 등은 RESULT만 옴
+            raise ValueError(data.get("RESULT", {}).get("MESSAGE", "ECOS 응답 오류"))
+        page = data["StatisticSearch"]
+        pages.append(_ecos_table_page(page.get("row", []), items))
+        total = int(page.get("list_total_count", 0))
+        del data, page
+        first += ECOS_PAGE_ROWS
+        if first > total:
+            break
+
+    df = pd.concat(pages, ignore_index=True)
+    table = df.pivot_table(index="TIME", columns="item", values="value", aggfunc="last")
+    table.index = _ecos_index(table.index.to_series(), cycle)
+    table.index.name, table.columns.name = None, None
+    return table.sort_index()
+
+
+def fetch_fred(series_id, start, end, store=True):
+    """ FRED 조회 -> 날짜 인덱스 float Series (실패 시 빈 Series, store=False면 저장소에 기록하지 않음) """
+    df = get_fred_data(series_id, start, end)
+    if df.empty or series_id not in df:
+        return pd.Series(dtype=float)
+    series = df[series_id].astype(float)
+    if store:
+        store_series(f"fred:{series_id}", series)
+    return series
+
+
+def fetch_yahoo(ticker, period="5y", start=None, end=None, store=True):
+    """ Yahoo Finance 일봉 종가 -> 날짜 인덱스 float Series (실패 시 빈 Series, start 지정 시 period 대신 기간 조회) """
+    span = {"start": start, "end": end} if start is not None else {"period": period}
+
+    def download():
+        df = yf.download(ticker, interval="1d", progress=False, auto_adjust=True,
+                         timeout=provider_service.request_timeout("yahoo"), **span)
+        if df is None or df.empty:
+            raise provider_service.yahoo_empty_error()
+        return df
+
+    try:
+        df = provider_service.call("yahoo", download)
+    except Exception as e:
+        print(f"⚠️ Yahoo Fetch Error ({ticker}): {e}")
+        return pd.Series(dtype=float)
+    close = extract_close(df, ticker)
+    if close is None:
+        return pd.Series(dtype=float)
+    series = close.dropna().astype(float)
+    series.name = ticker
+    if store:
+        store_series(f"yahoo:{ticker}", series)
+    return series
+
+
+def get_series(key):
+    """
+    시계열 반환 -> {"series", "version", "fetched_at"}
+    refresh가 받아둔 시계열(SERIES_STORE)이 있으면 그대로, 없으면 ON_DEMAND_KEYS에 있는 것만 직접 조회해 on_demand_cache에 보관
+    (목록에 없으면 PermissionError, 조회 실패 시 LookupError)
+    """
+    source, ident = parse_series_key(key)
+    key = f"{source}:{ident}"
+
+    entry = SERIES_STORE.get(key)
+    if entry is not None:
+        return entry
+    entry = on_demand_cache.get(key)
+    if entry is not None:
+        return entry
+    if key not in ON_DEMAND_KEYS:
+        raise PermissionError(f"조회할 수 없는 시계열입니다: '{key}' (refresh 대상 또는 ON_DEMAND_SERIES 목록만)")
+
+    now_kst = datetime.now(ZoneInfo("Asia/Seoul"))
+    start = now_kst - timedelta(days=DEFAULT_LOOKBACK_DAYS)
+    # 사용자 요청 경로 -> 예산 대기열에서 refresh의 저빈도 조회보다 먼저
+    with provider_service.priority("high"):
+        if source == "ecos":
+            stat_code, _, item_code = ident.partition("/")
+            item_code, _, cycle = item_code.partition("@")
+            cycle = cycle or "D"
+            series = fetch_ecos(stat_code, item_code, ecos_period(start, cycle), ecos_period(now_kst, cycle), cycle=cycle, store=False)
+        elif source == "fred":
+            series = fetch_fred(ident, start, now_kst, store=False)
+        else:
+            series = fetch_yahoo(ident, store=False)
+
+    if series.empty:
+        raise LookupError(f"시계열 데이터를 가져올 수 없습니다: '{key}'")
+    # 버전은 SERIES_STORE와 겹치지 않도록 구분 (파생 계산 캐시 키)
+    entry = {"series": series, "version": ("on_demand", next(_on_demand_versions)), "fetched_at": time.time()}
+    try:
+        on_demand_cache[key] = entry
+    except ValueError:
+        pass  # 예산보다 큰 시계열은 캐시하지 않음
+    return entry
+
+
+# --- Derived (스프레드 / 비율) ---
+
+OPERATIONS = ("spread", "ratio")
+
+
+@cached(cache=derived_cache, lock=threading.Lock(),
+        key=lambda a, b, op, fill_limit, entry_a, entry_b: hashkey(a, b, op, fill_limit, entry_a["version"], entry_b["version"]))
+def _compute_derived(a, b, op, fill_limit, entry_a, entry_b):
+    """ (입력 키, 연산, 각 입력 버전) 단위로 캐시되는 실제 계산부 """
+    df = align_series({'a': entry_a["series"], 'b': entry_b["series"]}, fill_limit=fill_limit)
+    if op == "spread":
+        df['value'] = df['a'] - df['b']
+    else:
+        df['value'] = df['a'] / df['b']
+        df = df.replace([np.inf, -np.inf], np.nan).dropna()
+    return to_records(df, ['a', 'b', 'value'], decimals=4)
+
+
+def get_derived_series(a, b, op="spread", fill_limit=None):
+    """
+    임의의 두 시계열 간 스프레드(a - b) 또는 비율(a / b)
+    예) fred:DGS10 - fred:DGS2, ecos:817Y002/010210000 - fred:DGS10
+    """
+    if op not in OPERATIONS:
+        raise ValueError(f"지원하지 않는 연산: '{op}' (spread | ratio)")
+
+    key_a = "{}:{}".format(*parse_series_key(a))
+    key_b = "{}:{}".format(*parse_series_key(b))
+    entry_a = get_series(key_a)
+    entry_b = get_series(key_b)
+
+    data = _compute_derived(key_a, key_b, op, fill_limit, entry_a, entry_b)
+    return {"a": key_a, "b": key_b, "op": op, "data": data}
@@ -1,11 +1,15 @@
 import yfinance as yf
-from cachetools import TTLCache, cached
+from cachetools import cached, TTLCache
 import pandas as pd
+import threading
+import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from . import provider_service, memory_service
+
 # 캐시 설정
-stock_cache = TTLCache(maxsize=100, ttl=600)
+stock_cache = memory_service.byte_cache("stock", ttl=600, max_mb=4)
 
 TICKERS = {
     "^TNX": "미국 10년물 금리",    # 1. US 10Y Treasury
@@ -18,29 +22,222 @@ TICKERS = {
     "^KS11": "코스피 지수"         # 8. KOSPI (한국)
 }
 
-# 1. Market Pulse
-@cached(cache=stock_cache)
-def get_market_pulse():
-    results = []
-    tickers_str = " ".join(TICKERS.keys())
+# --- 종목별 종가 캐시 + 일괄 조회 ---
+# 종목(symbol)마다 3개월 종가를 따로 캐시 -> 관심 목록이 달라도 캐시에 없는 종목만 조회
+# 동시에 들어온 요청들의 미보유 종목은 BATCH_WINDOW 동안 모아 yf.download 1회로 조회 (같은 종목을 이미 조회 중이면 그 결과를 기다림)
+# 조회 실패 종목은 NEGATIVE_TTL 동안 재시도하지 않고, 이전 값이 있으면 그대로 사용
+# 공개 ?symbols= 요청(get_watchlist_pulse)은 refresh와 다른 제공처 슬롯("yahoo_symbols")으로 조회하고,
+# 캐시에 없는 종목은 전체 요청 합계 NEW_SYMBOL_RATE개/초까지만 (임의 종목으로 yf.download를 계속 일으키지 못하도록)
+
+SYMBOL_TTL = 600          # 종가 재사용 시간(초) (기존 Pulse 캐시 주기)
+NEGATIVE_TTL = 120        # 조회 실패 종목 재시도 간격(초)
+BATCH_WINDOW = 0.05       # 일괄 조회 전 다른 요청의 종목을 모으는 시간(초)
+BATCH_WAIT = 30           # 다른 요청이 조회 중인 종목을 기다리는 최대 시간(초)
+HISTORY_PERIOD = "2y"     # 상관계수 분석용 장기 종가 (250 영업일 window + rolling 250개, 하루 1회 조회)
+PUBLIC_PROVIDER = "yahoo_symbols"
+NEW_SYMBOL_RATE = 0.5     # 공개 요청의 미보유 종목 허용량 (초당, 전체 합계)
+NEW_SYMBOL_BURST = 100    # 순간 최대 (요청 1건 최대 종목 수)
+
+symbol_cache = memory_service.byte_cache("pulse_symbols", max_mb=8)   # symbol -> (조회 시각, 종가 Series)
+_failed = TTLCache(maxsize=1024, ttl=NEGATIVE_TTL)   # 최근 조회 실패 종목 (공개 ?symbols= 입력이므로 개수 제한)
+_cache_lock = threading.Lock()   # symbol_cache / _failed (batch 스레드 기록, 요청 스레드 조회)
+_inflight = {}            # symbol -> 조회 중인 _Batch
+_open_batches = {}        # 제공처 -> 아직 조회를 시작하지 않은(종목을 모으는 중인) _Batch
+_batch_lock = threading.Lock()
+
+
+class SymbolLimitExceeded(Exception):
+    """ 공개 요청의 미보유 종목 허용량 초과 (429) """
+
+
+class _Batch:
+    def __init__(self, provider):
+        self.provider = provider
+        self.symbols = set()
+        self.done = threading.Event()
+
+
+class _NewSymbolLimit:
+    """ 미보유 종목 token bucket (NEW_SYMBOL_RATE / NEW_SYMBOL_BURST) """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, n):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if n > self.tokens:
+                return False
+            self.tokens -= n
+            return True
+
+
+_new_symbols = _NewSymbolLimit(NEW_SYMBOL_RATE, NEW_SYMBOL_BURST)
+
+
+def _download_closes(symbols, period="3mo", provider="yahoo"):
+    """ 종목 목록 일봉 종가를 한 번에 다운로드 -> 날짜 x 종목 DataFrame """
     # yfinance v0.2 이상 대응 (auto_adjust=True 권장)
-    try:
-        data = yf.download(tickers_str, period="3mo", interval="1d", progress=False, auto_adjust=True)
-    except Exception as e:
-        print(f"[Pulse Error] Download failed: {e}")
-        return []
-    
+    def download():
+        data = yf.download(" ".join(sorted(symbols)), period=period, interval="1d", progress=False, auto_adjust=True,
+                           timeout=provider_service.request_timeout(provider))
+        if data is None or data.empty:
+            raise provider_service.yahoo_empty_error()
+        return data
+
+    data = provider_service.call(provider, download)
+
     # 컬럼 구조 처리 (MultiIndex 대응)
     if isinstance(data.columns, pd.MultiIndex):
         try:
-            closes = data['Close']
+            return data['Close']
         except KeyError:
             # auto_adjust=True면 'Close'가 주가일 수 있음
-            closes = data
-    else:
-        closes = data
+            return data
+    if len(symbols) == 1 and "Close" in data:
+        return data[["Close"]].rename(columns={"Close": next(iter(symbols))})
+    return data
 
-    for ticker, name in TICKERS.items():
+
+def cache_closes(symbol, series, now=None):
+    """ 종목 종가를 캐시에 기록 (빈 Series면 조회 실패로 기록) """
+    with _cache_lock:
+        if series.empty:
+            _failed[symbol] = True
+            return
+        try:
+            symbol_cache[symbol] = (now or time.time(), series)
+        except ValueError:
+            pass  # 캐시 예산보다 큰 값
+        _failed.pop(symbol, None)
+
+
+def _cached_closes(symbol):
+    with _cache_lock:
+        return symbol_cache.get(symbol)
+
+
+def _run_batch(batch):
+    """ 모은 종목을 1회 조회해 종목별 캐시에 기록 """
+    try:
+        closes = _download_closes(batch.symbols, provider=batch.provider)
+        now = time.time()
+        for symbol in batch.symbols:
+            cache_closes(symbol, closes[symbol].dropna() if symbol in closes else pd.Series(dtype=float), now)
+        print(f"📈 [Pulse] batch download: {len(batch.symbols)} symbols")
+    except Exception as e:
+        print(f"[Pulse Error] Download failed ({len(batch.symbols)} symbols): {e}")
+        for symbol in batch.symbols:
+            cache_closes(symbol, pd.Series(dtype=float))
+    finally:
+        with _batch_lock:
+            for symbol in batch.symbols:
+                if _inflight.get(symbol) is batch:
+                    del _inflight[symbol]
+        batch.done.set()
+
+
+def _fetch_missing(symbols, provider):
+    """ 미보유 종목 조회 (같은 제공처 슬롯의 동시 요청과 합쳐서 yf.download 1회) """
+    waits = set()
+    leader = None
+    with _batch_lock:
+        for symbol in symbols:
+            if symbol in _inflight:
+                waits.add(_inflight[symbol])
+                continue
+            batch = _open_batches.get(provider)
+            if batch is None:
+                batch = leader = _open_batches[provider] = _Batch(provider)
+            batch.symbols.add(symbol)
+            _inflight[symbol] = batch
+            waits.add(batch)
+
+    if leader is not None:
+        # 다른 요청의 종목이 합류할 시간을 준 뒤 조회 시작 (이후 요청은 다음 batch로)
+        time.sleep(BATCH_WINDOW)
+        with _batch_lock:
+            if _open_batches.get(provider) is leader:
+                del _open_batches[provider]
+        _run_batch(leader)
+    for batch in waits:
+        batch.done.wait(BATCH_WAIT)
+
+
+def get_closes(symbols, provider="yahoo"):
+    """
+    종목별 3개월 종가 -> 날짜 x 종목 DataFrame (캐시 우선, 실패 종목은 이전 값 또는 제외)
+    provider가 PUBLIC_PROVIDER면 캐시에 없던 종목 수를 허용량에서 차감 (초과 시 SymbolLimitExceeded)
+    """
+    now = time.time()
+    missing = []
+    for symbol in symbols:
+        entry = _cached_closes(symbol)
+        if entry and now - entry[0] < SYMBOL_TTL:
+            continue
+        with _cache_lock:
+            if symbol in _failed:
+                continue
+        missing.append(symbol)
+    if missing and provider == PUBLIC_PROVIDER:
+        new = [s for s in missing if s not in TICKERS and _cached_closes(s) is None]
+        if new and not _new_symbols.take(len(new)):
+            raise SymbolLimitExceeded(f"새 종목 조회 한도 초과 ({len(new)}개), 잠시 후 다시 시도하세요.")
+    if missing:
+        _fetch_missing(missing, provider)
+
+    columns = {}
+    for symbol in symbols:
+        entry = _cached_closes(symbol)
+        if entry:
+            columns[symbol] = entry[1]
+    return pd.DataFrame(columns)
+
+
+def fetch_pulse_prices(extra=()):
+    """
+    TICKERS 전체 3개월 일봉 종가 -> 날짜 x 티커 DataFrame (실패 시 빈 DataFrame)
+    extra: 같은 다운로드로 함께 조회해 캐시만 채울 종목 (관심 목록)
+    """
+    closes = get_closes(list(TICKERS) + [s for s in extra if s not in TICKERS])
+    return closes[[t for t in TICKERS if t in closes]]
+
+
+def fetch_pulse_history():
+    """ TICKERS 전체 HISTORY_PERIOD 일봉 종가 -> 날짜 x 티커 DataFrame (종목별 캐시와 별개, 실패 시 빈 DataFrame) """
+    try:
+        closes = _download_closes(set(TICKERS), period=HISTORY_PERIOD)
+    except Exception as e:
+        print(f"[Pulse Error] History download failed: {e}")
+        return pd.DataFrame()
+    return closes[[t for t in TICKERS if t in closes]]
+
+
+def get_watchlist_pulse(symbols):
+    """ 관심 목록 Market Pulse (symbols: {종목: 표시 이름}) -> (카드 목록, 조회 실패 종목) """
+    # 사용자 요청 경로 -> refresh와 분리된 제공처 슬롯 (refresh의 yahoo 차단 / 예산에 영향 없음)
+    with provider_service.priority("high"):
+        closes = get_closes(list(symbols), provider=PUBLIC_PROVIDER)
+    results = build_market_pulse(closes, symbols)
+    found = {row["ticker"] for row in results}
+    return results, [s for s in symbols if s not in found]
+
+
+def build_market_pulse(closes, symbols=None):
+    """ 종가 DataFrame -> Market Pulse 카드 목록 (symbols: {종목: 표시 이름}, 기본 TICKERS) """
+    results = []
+    if closes is None or closes.empty:
+        # 표시할 데이터 없음 (정상 값이 있으면 유지되도록 fallback으로 표시)
+        provider_service.mark_fallback()
+        return results
+
+    for ticker, name in (symbols or TICKERS).items():
         try:
             if ticker not in closes: continue
             
@@ -67,3 +264,9 @@ def get_market_pulse():
             print(f"[Pulse Error] {ticker}: {e}")
             continue
     return results
+
+
+# 1. Market Pulse
+@cached(cache=stock_cache)
+def get_market_pulse():
+    return build_market_pulse(fetch_pulse_prices())
@@ -0,0 +1,155 @@
+import json
+import os
+import socket
+import threading
+
+import numpy as np
+
+# redis는 STORE_URL=redis://... 사용 시에만 필요
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# 데이터셋 저장소 (DATA_STORE 원본)
+# - MemoryStore (기본): 프로세스 안에서만 유지, 인스턴스 1대 기준 (기존 동작)
+# - RedisStore (STORE_URL=redis://...): 여러 인스턴스가 같은 데이터를 공유
+#     leader lock을 가진 인스턴스 1대만 외부 API refresh 실행 -> 결과를 직렬화된 JSON(snapshot)으로 저장
+#     나머지 인스턴스는 버전만 주기적으로 확인하고 바뀐 snapshot만 받아옴
+# 데이터셋 값은 항상 JSON 바이트로 직렬화해서 저장 -> JSON 응답은 요청마다 다시 인코딩하지 않고 그대로 전송
+
+INSTANCE_ID = os.getenv("FLY_MACHINE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"JSON 직렬화 불가: {type(obj).__name__}")
+
+
+def serialize(value):
+    """ 데이터셋 값 -> JSON 바이트 (FastAPI 기본 JSONResponse와 같은 설정) """
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def deserialize(payload):
+    return json.loads(payload)
+
+
+class MemoryStore:
+    """ 프로세스 내 저장소 (인스턴스 1대, leader는 항상 자기 자신) """
+    shared = False
+
+    def __init__(self):
+        self._snapshots = {}   # key -> (version, JSON 바이트)
+        self._floor = {}       # key -> 이어서 쓸 마지막 버전 (재시작 전 기록)
+        self._lock = threading.Lock()
+
+    def continue_from(self, versions):
+        """ 재시작 전 마지막 버전 다음부터 번호를 매김 (HISTORY_DIR로 다시 읽은 세대와 번호가 겹치지 않도록) """
+        with self._lock:
+            for key, version in versions.items():
+                self._floor[key] = max(self._floor.get(key, 0), version)
+
+    def put(self, key, payload):
+        """ snapshot 저장 -> 새 버전 """
+        with self._lock:
+            version = max(self._snapshots.get(key, (0, None))[0], self._floor.get(key, 0)) + 1
+            self._snapshots[key] = (version, payload)
+            return version
+
+    def get(self, key):
+        """ -> (버전, JSON 바이트) 또는 None """
+        return self._snapshots.get(key)
+
+    def versions(self, keys):
+        return {key: self._snapshots[key][0] for key in keys if key in self._snapshots}
+
+    def acquire_leader(self, ttl):
+        return True
+
+    def release_leader(self):
+        pass
+
+
+class RedisStore:
+    """
+    Redis 저장소 (여러 인스턴스 공유)
+    - {prefix}ds:<key>  hash {version, payload}: 버전 증가와 snapshot 저장을 Lua 스크립트로 한 번에
+    - {prefix}leader    SET NX PX: refresh 실행 인스턴스 (만료 전 같은 인스턴스가 다시 잡으면 연장)
+    """
+    shared = True
+
+    PUT_SCRIPT = """
+    local version = redis.call('HINCRBY', KEYS[1], 'version', 1)
+    redis.call('HSET', KEYS[1], 'payload', ARGV[1])
+    return version
+    """
+    # 자기 자신이 leader일 때만 연장 / 해제
+    EXTEND_SCRIPT = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+    RELEASE_SCRIPT = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url, prefix="market-radar:"):
+        if redis is None:
+            raise RuntimeError("STORE_URL=redis://... 사용에는 redis 패키지가 필요합니다.")
+        self.client = redis.Redis.from_url(url, socket_timeout=5, socket_connect_timeout=5)
+        self.prefix = prefix
+        self._put = self.client.register_script(self.PUT_SCRIPT)
+        self._extend = self.client.register_script(self.EXTEND_SCRIPT)
+        self._release = self.client.register_script(self.RELEASE_SCRIPT)
+
+    def _key(self, key):
+        return f"{self.prefix}ds:{key}"
+
+    @property
+    def leader_key(self):
+        return f"{self.prefix}leader"
+
+    def put(self, key, payload):
+        return int(self._put(keys=[self._key(key)], args=[payload]))
+
+    def get(self, key):
+        version, payload = self.client.hmget(self._key(key), "version", "payload")
+        if version is None or payload is None:
+            return None
+        return int(version), payload
+
+    def versions(self, keys):
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hget(self._key(key), "version")
+        return {key: int(v) for key, v in zip(keys, pipe.execute()) if v is not None}
+
+    def acquire_leader(self, ttl):
+        """ leader lock 획득 또는 연장 (ttl: 초) """
+        ttl_ms = int(ttl * 1000)
+        if self.client.set(self.leader_key, INSTANCE_ID, nx=True, px=ttl_ms):
+            return True
+        return bool(self._extend(keys=[self.leader_key], args=[INSTANCE_ID, ttl_ms]))
+
+    def release_leader(self):
+        self._release(keys=[self.leader_key], args=[INSTANCE_ID])
+
+    def leader(self):
+        value = self.client.get(self.leader_key)
+        return value.decode() if value else None
+
+
+def from_env():
+    """ STORE_URL 환경변수로 저장소 선택 (없으면 MemoryStore) """
+    url = os.getenv("STORE_URL")
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url, prefix=os.getenv("STORE_PREFIX", "market-radar:"))
+    return MemoryStore()
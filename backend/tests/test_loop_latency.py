@@ -0,0 +1,37 @@
+"""
+이벤트 루프 응답성 회귀 테스트 (loadtest.py --latency-check와 같은 측정)
+
+FIXTURE_MODE 서버를 별도 프로세스로 띄우고, 큰 응답을 동시에 계속 요청하는 동안
+작은 라우트 지연이 기준 이내인지 확인 (큰 응답 직렬화가 이벤트 루프에서 돌면 기준 초과)
+기준은 측정값(p99 약 45ms)의 약 3배 -> 머신 부하 차이로 흔들리지 않도록 여유를 둠
+(여유를 둔 만큼 지연만으로는 큰 응답이 루프에서 직렬화되는 회귀를 놓칠 수 있어, 스레드풀로 넘긴 응답 수도 확인)
+"""
+import pytest
+
+import loadtest
+
+PROBE_P99_MS = 150
+CONCURRENCY = 4
+DURATION = 8
+WARMUP = 2
+
+
+@pytest.fixture(scope="module")
+def server():
+    base_url, process = loadtest.start_server_process(switch_interval=0.001)
+    yield base_url
+    process.terminate()
+    process.wait()
+
+
+def test_probe_latency_under_heavy_responses(server):
+    probe_results, heavy_results = loadtest.run_latency_check(
+        server, loadtest.heavy_route(), "/", CONCURRENCY, DURATION, WARMUP
+    )
+    assert heavy_results and all(ok for _, _, ok, _ in heavy_results), "큰 응답 요청 실패"
+
+    (probe,) = loadtest.summarize(probe_results, DURATION, PROBE_P99_MS, PROBE_P99_MS)
+    assert probe["errors"] == 0
+    loop = loadtest.loop_stats(server)
+    assert probe["p99_ms"] <= PROBE_P99_MS, f"/ p99 {probe['p99_ms']}ms > {PROBE_P99_MS}ms (event loop: {loop})"
+    assert loop and loop["offloaded"]["responses"] >= len(heavy_results), "큰 응답이 스레드풀에서 직렬화되지 않음"
@@ -0,0 +1,134 @@
+import json
+import os
+import re
+import threading
+
+from pydantic import BaseModel, Field, field_validator
+
+from services import stock_service
+
+# Market Pulse 관심 목록 (팀별 종목 묶음)
+# - 로컬 JSON 파일(WATCHLISTS_PATH)에 저장, 파일이 바뀌면 다음 조회 때 다시 읽음
+# - "default"는 stock_service.TICKERS (기존 Market Pulse 8종목, 파일에 없어도 항상 존재)
+# - 종가는 종목별로 캐시되므로 목록끼리 겹치는 종목은 한 번만 조회 (stock_service.get_closes)
+# - refresh 때 모든 목록의 종목을 yf.download 1회로 미리 조회 (scheduler "yahoo:pulse" 노드)
+
+WATCHLISTS_PATH = os.getenv("WATCHLISTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "watchlists.json"))
+MAX_SYMBOLS = 100    # 요청 1건 / 목록 1개당 최대 종목 수
+SYMBOL_PATTERN = r"^[A-Za-z0-9.\-=^]{1,20}$"
+
+
+class Watchlist(BaseModel):
+    """
+    예) {"name": "rates", "symbols": ["^TNX", "^IRX", "^FVX"], "labels": {"^IRX": "US 3M"}}
+    """
+    name: str = Field(..., pattern=r"^[\w.\-]+$")
+    title: str | None = None
+    symbols: list[str] = Field(..., min_length=1, max_length=MAX_SYMBOLS)
+    labels: dict[str, str] = {}      # 종목 표시 이름 (없으면 TICKERS 이름 또는 종목 코드)
+
+    @field_validator("symbols")
+    @classmethod
+    def _check_symbols(cls, symbols):
+        return parse_symbols(",".join(symbols))
+
+    def names(self):
+        """ {종목: 표시 이름} (build_market_pulse 입력) """
+        return {s: self.labels.get(s) or stock_service.TICKERS.get(s, s) for s in self.symbols}
+
+
+def parse_symbols(text):
+    """ "AAPL, ^GSPC,msft" -> ["AAPL", "^GSPC", "MSFT"] (중복 제거, 순서 유지) """
+    symbols = []
+    for raw in text.split(","):
+        symbol = raw.strip().upper()
+        if not symbol:
+            continue
+        if not re.match(SYMBOL_PATTERN, symbol):
+            raise ValueError(f"종목 코드 형식 오류: '{raw.strip()}'")
+        if symbol not in symbols:
+            symbols.append(symbol)
+    if not symbols:
+        raise ValueError("종목이 없습니다.")
+    if len(symbols) > MAX_SYMBOLS:
+        raise ValueError(f"종목은 최대 {MAX_SYMBOLS}개까지 조회할 수 있습니다 ({len(symbols)}개).")
+    return symbols
+
+
+DEFAULT = Watchlist(name="default", title="Market Pulse", symbols=list(stock_service.TICKERS))
+
+
+class Watchlists:
+    def __init__(self, path=WATCHLISTS_PATH):
+        self.path = path
+        self.lists = {}        # name -> Watchlist (default 제외)
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _reload(self):
+        """ 목록 파일이 바뀌었으면 다시 읽음 """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        lists = {}
+        if mtime is not None:
+            try:
+                with open(self.path) as f:
+                    for raw in json.load(f):
+                        watchlist = Watchlist(**raw)
+                        lists[watchlist.name] = watchlist
+            except Exception as e:
+                print(f"❌ [Watchlists] 목록 파일 오류 ({self.path}): {e}")
+                return
+        self.lists = lists
+        self._mtime = mtime
+        print(f"📋 [Watchlists] {len(lists)} watchlists loaded")
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump([w.model_dump(exclude_defaults=True) for w in self.lists.values()], f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def get(self, name):
+        with self._lock:
+            self._reload()
+            if name == DEFAULT.name:
+                return DEFAULT
+            if name not in self.lists:
+                raise LookupError(f"알 수 없는 관심 목록: {name}")
+            return self.lists[name]
+
+    def list(self):
+        with self._lock:
+            self._reload()
+            return [DEFAULT.model_dump()] + [w.model_dump() for w in self.lists.values()]
+
+    def symbols(self):
+        """ 모든 관심 목록 종목 (refresh 때 일괄 조회 대상) """
+        with self._lock:
+            self._reload()
+            return sorted({s for w in self.lists.values() for s in w.symbols})
+
+    def put(self, watchlist):
+        if watchlist.name == DEFAULT.name:
+            raise ValueError("default 목록은 변경할 수 없습니다 (stock_service.TICKERS).")
+        with self._lock:
+            self._reload()
+            self.lists = {**self.lists, watchlist.name: watchlist}
+            self._save()
+
+    def delete(self, name):
+        with self._lock:
+            self._reload()
+            if name not in self.lists:
+                raise LookupError(f"알 수 없는 관심 목록: {name}")
+            self.lists = {k: v for k, v in self.lists.items() if k != name}
+            self._save()
+
+
+WATCHLISTS = Watchlists()
@@ -1,17 +1,24 @@
 // frontend/src/App.jsx (전체 업데이트)
 
-import { useState, useEffect } from 'react';
-import api from './api';
+import { useState, useEffect, lazy, Suspense } from 'react';
+import { fetchVersions, loadDataset } from './datasets';
 import MetricCard from './components/MetricCard';
-import MacroChart from './components/MacroChart'; // 추가
-import RiskChart from './components/RiskChart';   // 추가
-import CreditSpreadChart from './components/CreditSpreadChart'; // 추가
-import RateSpreadChart from './components/RateSpreadChart'; // 추가
-import USRateSpreadChart from './components/USRateSpreadChart'; // 추가
 import { Activity, RefreshCw } from 'lucide-react';
 import PromptGenerator from './components/PromptGenerator';
 import MarketGauge from './components/MarketGauge';
 
+// 차트 컴포넌트 (Recharts 포함)는 별도 번들로 나눠서 필요할 때 로딩 -> 첫 화면(시장 현황 카드)을 먼저 그림
+const MacroChart = lazy(() => import('./components/MacroChart'));
+const RiskChart = lazy(() => import('./components/RiskChart'));
+const CreditSpreadChart = lazy(() => import('./components/CreditSpreadChart'));
+const RateSpreadChart = lazy(() => import('./components/RateSpreadChart'));
+const USRateSpreadChart = lazy(() => import('./components/USRateSpreadChart'));
+
+// 차트 번들 로딩 중 자리 표시
+const ChartSkeleton = ({ height = 'h-[350px]' }) => (
+  <div className={`${height} bg-gray-200 dark:bg-gray-800 rounded-xl animate-pulse border border-gray-200 dark:border-gray-700`}></div>
+);
+
 function App() {
   const [pulseData, setPulseData] = useState([]);
   const [cpiData, setCpiData] = useState(null);
@@ -56,15 +63,15 @@ function App() {
     fetchAllData();
   }, []);
 
-  // frontend/src/App.jsx 안의 fetchAllData 함수 수정
-
   const fetchAllData = async () => {
     setLoading(true);
 
+    // 0. 데이터셋별 서버 버전 확인 (IndexedDB 캐시와 같은 버전이면 요청 생략)
+    const versions = await fetchVersions();
+
     // 1. 주식 데이터 (Pulse) - 이건 무조건 성공해야 함
     try {
-      const pulseRes = await api.get('/api/market/pulse');
-      setPulseData(pulseRes.data);
+      setPulseData(await loadDataset('market_pulse', versions));
     } catch (err) {
       console.error("주식 데이터 로딩 실패:", err);
     }
@@ -72,25 +79,25 @@ function App() {
     // 2. 거시경제 데이터 (Macro & Risk) - 실패해도 괜찮음 (개별 처리)
     // Promise.allSettled를 쓰면 실패한 놈만 무시하고 나머지는 다 가져옴
     const results = await Promise.allSettled([
-      api.get('/api/macro/cpi'),
-      api.get('/api/macro/unrate'),
-      api.get('/api/macro/risk-ratio'),
-      api.get('/api/market/credit-spread'),
-      api.get('/api/market/yield-gap'),
-      api.get('/api/macro/rate-spread'),
-      api.get('/api/macro/us-rate-spread')
+      loadDataset('cpi', versions),
+      loadDataset('unrate', versions),
+      loadDataset('risk_ratio', versions),
+      loadDataset('credit_spread', versions),
+      loadDataset('yield_gap', versions),
+      loadDataset('rate_spread', versions),
+      loadDataset('us_rate_spread', versions)
     ]);
 
     // 결과 처리 (성공한 것만 상태에 넣기)
     const [cpiResult, unrateResult, riskResult, creditResult, yieldGapResult, rateSpreadResult, usRateSpreadResult] = results;
 
-    if (cpiResult.status === 'fulfilled') setCpiData(cpiResult.value.data);
-    if (unrateResult.status === 'fulfilled') setUnrateData(unrateResult.value.data);
-    if (riskResult.status === 'fulfilled') setRiskData(riskResult.value.data);
-    if (creditResult.status === 'fulfilled') setCreditSpreadData(creditResult.value.data);
-    if (yieldGapResult.status === 'fulfilled') setYieldGapData(yieldGapResult.value.data);
-    if (rateSpreadResult.status === 'fulfilled') setRateSpreadData(rateSpreadResult.value.data);
-    if (usRateSpreadResult.status === 'fulfilled') setUsRateSpreadData(usRateSpreadResult.value.data);
+    if (cpiResult.status === 'fulfilled') setCpiData(cpiResult.value);
+    if (unrateResult.status === 'fulfilled') setUnrateData(unrateResult.value);
+    if (riskResult.status === 'fulfilled') setRiskData(riskResult.value);
+    if (creditResult.status === 'fulfilled') setCreditSpreadData(creditResult.value);
+    if (yieldGapResult.status === 'fulfilled') setYieldGapData(yieldGapResult.value);
+    if (rateSpreadResult.status === 'fulfilled') setRateSpreadData(rateSpreadResult.value);
+    if (usRateSpreadResult.status === 'fulfilled') setUsRateSpreadData(usRateSpreadResult.value);
 
     setLastUpdated(new Date().toLocaleTimeString());
     setLoading(false);
@@ -187,19 +194,21 @@ function App() {
             거시 경제 지표
           </h2>
           <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
-            <MacroChart
-              title="🇺🇸 미국 소비자물가지수 (CPI)"
-              data={cpiData?.data}
-              color="#F59E0B"
-              showTarget={true} // 2% 타겟 라인 표시
-              isDarkMode={isDarkMode}
-            />
-            <MacroChart
-              title="🇺🇸 고용지표 (실업률)"
-              data={unrateData?.data}
-              color="#6366F1"
-              isDarkMode={isDarkMode}
-            />
+            <Suspense fallback={<><ChartSkeleton /><ChartSkeleton /></>}>
+              <MacroChart
+                title="🇺🇸 미국 소비자물가지수 (CPI)"
+                data={cpiData?.data}
+                color="#F59E0B"
+                showTarget={true} // 2% 타겟 라인 표시
+                isDarkMode={isDarkMode}
+              />
+              <MacroChart
+                title="🇺🇸 고용지표 (실업률)"
+                data={unrateData?.data}
+                color="#6366F1"
+                isDarkMode={isDarkMode}
+              />
+            </Suspense>
           </div>
         </section>
 
@@ -209,12 +218,16 @@ function App() {
             <span className="w-1 h-6 bg-yellow-500 rounded-full"></span>
             위험 신호 탐지
           </h2>
-          <RiskChart data={riskData} isDarkMode={isDarkMode} />
+          <Suspense fallback={<ChartSkeleton height="h-[400px]" />}>
+            <RiskChart data={riskData} isDarkMode={isDarkMode} />
+          </Suspense>
         </section>
 
         {/* 4. Credit Market (크레딧 스프레드) */}
         <section>
-          <CreditSpreadChart data={creditSpreadData} loading={loading} isDarkMode={isDarkMode} />
+          <Suspense fallback={<ChartSkeleton height="h-64" />}>
+            <CreditSpreadChart data={creditSpreadData} loading={loading} isDarkMode={isDarkMode} />
+          </Suspense>
         </section>
 
         {/* 5. Short-term Rate (금리 스프레드) */}
@@ -224,8 +237,10 @@ function App() {
             단기 자금 동향 (Call vs Base)
           </h2>
           <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
-            <RateSpreadChart data={rateSpreadData} isDarkMode={isDarkMode} />
-            <USRateSpreadChart data={usRateSpreadData} isDarkMode={isDarkMode} />
+            <Suspense fallback={<><ChartSkeleton /><ChartSkeleton /></>}>
+              <RateSpreadChart data={rateSpreadData} isDarkMode={isDarkMode} />
+              <USRateSpreadChart data={usRateSpreadData} isDarkMode={isDarkMode} />
+            </Suspense>
           </div>
         </section>
 
@@ -0,0 +1,49 @@
+// IndexedDB 캐시 (데이터셋 응답 저장, 서버 버전이 같으면 다시 받지 않음)
+// - 레코드: { key, tag, data }  (tag = "<epoch>:<version>", /api/versions 기준)
+// - IndexedDB를 쓸 수 없는 환경(사생활 보호 모드 등)에서는 캐시 없이 동작
+
+const DB_NAME = 'market-radar';
+const STORE_NAME = 'datasets';
+const DB_VERSION = 1;
+
+let dbPromise = null;
+
+const openDB = () => {
+    if (dbPromise) return dbPromise;
+    dbPromise = new Promise((resolve) => {
+        if (typeof indexedDB === 'undefined') {
+            resolve(null);
+            return;
+        }
+        const request = indexedDB.open(DB_NAME, DB_VERSION);
+        request.onupgradeneeded = () => {
+            request.result.createObjectStore(STORE_NAME, { keyPath: 'key' });
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => {
+            console.warn('[Cache] IndexedDB 사용 불가:', request.error);
+            resolve(null);
+        };
+    });
+    return dbPromise;
+};
+
+// 트랜잭션 1개 실행 -> 요청 결과 (실패 시 null, 캐시 오류로 화면이 멈추지 않도록 예외를 던지지 않음)
+const run = async (mode, action) => {
+    const db = await openDB();
+    if (!db) return null;
+    return new Promise((resolve) => {
+        try {
+            const request = action(db.transaction(STORE_NAME, mode).objectStore(STORE_NAME));
+            request.onsuccess = () => resolve(request.result ?? null);
+            request.onerror = () => resolve(null);
+        } catch (err) {
+            console.warn('[Cache] IndexedDB 오류:', err);
+            resolve(null);
+        }
+    });
+};
+
+export const getCached = (key) => run('readonly', (store) => store.get(key));
+
+export const putCached = (key, tag, data) => run('readwrite', (store) => store.put({ key, tag, data }));
@@ -5,6 +5,7 @@ import {
 } from 'recharts';
 import { AlertTriangle, TrendingUp, TrendingDown } from 'lucide-react';
 import { useState, useMemo } from 'react';
+import { filterByRange } from '../dates';
 
 const CreditSpreadChart = ({ data, loading, isDarkMode = true }) => {
     // data 형식: [{ date: '2024-01', value: 0.6 }, ...]
@@ -12,18 +13,8 @@ const CreditSpreadChart = ({ data, loading, isDarkMode = true }) => {
 
     // 데이터 필터링 로직
     const filteredData = useMemo(() => {
-        if (!data || data.length === 0) return [];
-
-        if (timeRange === 'MAX') return data;
-
-        const now = new Date();
-        const cutoffDate = new Date(); // 복사본 생성
-
-        if (timeRange === '1Y') cutoffDate.setFullYear(now.getFullYear() - 1);
-        else if (timeRange === '5Y') cutoffDate.setFullYear(now.getFullYear() - 5);
-        else if (timeRange === '10Y') cutoffDate.setFullYear(now.getFullYear() - 10);
-
-        return data.filter(d => new Date(d.date) >= cutoffDate);
+        // 응답을 받을 때 계산해 둔 epochDay로 시작 위치만 찾아 자름 (MAX = 전체)
+        return filterByRange(data, timeRange);
     }, [data, timeRange]);
 
     if (loading || !data || data.length === 0) {
@@ -1,7 +1,18 @@
-import React, { memo } from 'react';
-import { AreaChart, Area, ResponsiveContainer, YAxis } from 'recharts';
+import React, { memo, useMemo } from 'react';
 import { ArrowUpRight, ArrowDownRight, Minus } from 'lucide-react';
 
+// 배경 미니 차트용 SVG 경로 (Recharts 없이 그림 -> 첫 화면 번들에 차트 라이브러리를 넣지 않음)
+// viewBox 100 x 100 기준, 최소 / 최대값으로 세로 범위 맞춤
+const sparklinePaths = (history) => {
+    const values = history.map((point) => point.value).filter((v) => typeof v === 'number');
+    if (values.length < 2) return null;
+    const min = Math.min(...values);
+    const range = Math.max(...values) - min || 1;
+    const points = values.map((v, i) => `${(i / (values.length - 1)) * 100},${95 - ((v - min) / range) * 90}`);
+    const line = `M${points.join('L')}`;
+    return { line, area: `${line}L100,100L0,100Z` };
+};
+
 const MetricCard = memo(({ title, name, ticker, value, change, changePercent, change_percent, displayChange, history }) => {
     // 1. 데이터 안전장치 & 포맷팅
     // 이름이 없으면 티커라도 보여주고, 그것도 없으면 Loading
@@ -11,7 +22,6 @@ const MetricCard = memo(({ title, name, ticker, value, change, changePercent, ch
     const safeValue = typeof value === 'number' ? value : 0;
     const safeChange = typeof change === 'number' ? change : 0;
     const safePercent = typeof changePercent === 'number' ? changePercent : (typeof change_percent === 'number' ? change_percent : 0);
-    const safeHistory = history || [];
 
     // 2. 숫자 예쁘게 다듬기 (소수점 2자리, 콤마 찍기)
     const formattedValue = safeValue.toLocaleString(undefined, { minimumFractionDigits: 2, maximumFractionDigits: 2 });
@@ -30,6 +40,7 @@ const MetricCard = memo(({ title, name, ticker, value, change, changePercent, ch
 
     // 그라데이션 ID (ticker 기반 안정적 ID - 리렌더 시 SVG 재생성 방지)
     const gradientId = `gradient-${(ticker || 'unknown').replace(/\W/g, '')}`;
+    const paths = useMemo(() => sparklinePaths(history || []), [history]);
 
     return (
         <div className="bg-white dark:bg-gray-800 rounded-xl p-5 border border-gray-200 dark:border-gray-700 shadow-lg flex flex-col justify-between h-[180px] relative overflow-hidden group hover:border-gray-300 dark:hover:border-gray-600 transition-all duration-300">
@@ -57,25 +68,18 @@ const MetricCard = memo(({ title, name, ticker, value, change, changePercent, ch
 
             {/* 배경 미니 차트 */}
             <div className="absolute bottom-0 left-0 right-0 w-full opacity-30 dark:opacity-40 group-hover:opacity-60 dark:group-hover:opacity-70 transition-opacity" style={{ height: '100px' }}>
-                <ResponsiveContainer width="100%" height="100%">
-                    <AreaChart data={safeHistory}>
+                {paths && (
+                    <svg width="100%" height="100%" viewBox="0 0 100 100" preserveAspectRatio="none">
                         <defs>
                             <linearGradient id={gradientId} x1="0" y1="0" x2="0" y2="1">
                                 <stop offset="5%" stopColor={color} stopOpacity={0.5} />
                                 <stop offset="95%" stopColor={color} stopOpacity={0} />
                             </linearGradient>
                         </defs>
-                        <YAxis domain={['auto', 'auto']} hide />
-                        <Area
-                            type="monotone"
-                            dataKey="value"
-                            stroke={color}
-                            strokeWidth={2}
-                            fill={`url(#${gradientId})`}
-                            animationDuration={1500}
-                        />
-                    </AreaChart>
-                </ResponsiveContainer>
+                        <path d={paths.area} fill={`url(#${gradientId})`} stroke="none" />
+                        <path d={paths.line} fill="none" stroke={color} strokeWidth={2} vectorEffect="non-scaling-stroke" />
+                    </svg>
+                )}
             </div>
         </div>
     );
@@ -3,6 +3,7 @@ import {
     ComposedChart, Line, Area, XAxis, YAxis, CartesianGrid,
     Tooltip, ResponsiveContainer, Legend
 } from 'recharts';
+import { filterByRange } from '../dates';
 
 // 🎨 커스텀 툴팁
 const CustomTooltip = ({ active, payload, label }) => {
@@ -28,18 +29,8 @@ const RiskChart = ({ data, isDarkMode = true }) => {
 
     // 2. 기간 필터링 로직
     const filteredData = useMemo(() => {
-        if (!data || data.length === 0) return [];
-        if (timeRange === 'ALL') return data;
-
-        const now = new Date();
-        const cutoffDate = new Date();
-
-        // 기간별 날짜 계산
-        if (timeRange === '1Y') cutoffDate.setFullYear(now.getFullYear() - 1);
-        else if (timeRange === '5Y') cutoffDate.setFullYear(now.getFullYear() - 5);
-        else if (timeRange === '10Y') cutoffDate.setFullYear(now.getFullYear() - 10);
-
-        return data.filter(item => new Date(item.date) >= cutoffDate);
+        // 응답을 받을 때 계산해 둔 epochDay로 시작 위치만 찾아 자름 (행마다 new Date() 생성 안 함)
+        return filterByRange(data, timeRange);
     }, [data, timeRange]);
 
     if (!data || data.length === 0) {
@@ -3,6 +3,7 @@ import {
     ComposedChart, Line, Bar, XAxis, YAxis, CartesianGrid, Tooltip,
     ResponsiveContainer, Legend, ReferenceLine, Cell
 } from 'recharts';
+import { filterByRange } from '../dates';
 
 const getSpreadStatus = (spread) => {
     if (spread >= 0.10) return { status: '안전', color: '#10b981', message: '충분한 유동성' };
@@ -47,17 +48,8 @@ const USRateSpreadChart = ({ data = [], isDarkMode = true }) => {
     const filteredData = useMemo(() => {
         if (!data || data.length === 0) return [];
 
-        let targetData = data;
-
-        // 1. 기간 필터링
-        if (timeRange !== 'ALL') {
-            const now = new Date();
-            const cutoffDate = new Date();
-            if (timeRange === '1Y') cutoffDate.setFullYear(now.getFullYear() - 1);
-            else if (timeRange === '5Y') cutoffDate.setFullYear(now.getFullYear() - 5);
-
-            targetData = data.filter(item => new Date(item.date) >= cutoffDate);
-        }
+        // 1. 기간 필터링 (응답을 받을 때 계산해 둔 epochDay로 시작 위치만 찾아 자름)
+        const targetData = filterByRange(data, timeRange);
 
         // 2. 데이터 다운샘플링 (렌더링 성능 최적화)
         // 포인트가 너무 많으면(예: 500개 이상) Recharts 렌더링 부하 발생
@@ -0,0 +1,50 @@
+import api from './api';
+import { getCached, putCached } from './cache';
+import { withEpochDays } from './dates';
+
+// 데이터셋 불러오기 (IndexedDB 캐시 + 서버 버전 확인)
+// 1. /api/versions 로 데이터셋별 현재 버전 확인 (작은 응답 1회)
+// 2. 캐시에 같은 버전이 있으면 캐시 사용, 없거나 바뀐 데이터셋만 요청
+// 3. 받은 응답은 epochDay를 계산한 뒤 캐시에 저장 (다음 방문 때는 계산도 생략)
+// /api/versions 실패 시 캐시 없이 모두 요청
+
+export const DATASETS = {
+    market_pulse: '/api/market/pulse',
+    cpi: '/api/macro/cpi',
+    unrate: '/api/macro/unrate',
+    risk_ratio: '/api/macro/risk-ratio',
+    credit_spread: '/api/market/credit-spread',
+    yield_gap: '/api/market/yield-gap',
+    rate_spread: '/api/macro/rate-spread',
+    us_rate_spread: '/api/macro/us-rate-spread',
+};
+
+export const fetchVersions = async () => {
+    try {
+        const res = await api.get('/api/versions');
+        return res.data;
+    } catch (err) {
+        console.warn('[Cache] 버전 확인 실패 -> 캐시 없이 요청:', err);
+        return null;
+    }
+};
+
+// versions: fetchVersions() 결과 (null이면 캐시 사용 안 함)
+export const loadDataset = async (key, versions) => {
+    const version = versions?.versions?.[key];
+    // 버전 0 = 서버가 아직 refresh 전 (빈 값은 캐시하지 않음)
+    const tag = version ? `${versions.epoch}:${version}` : null;
+    if (tag) {
+        const cached = await getCached(key);
+        if (cached?.tag === tag) return cached.data;
+    }
+
+    const res = await api.get(DATASETS[key]);
+    const data = withEpochDays(res.data);
+    if (versions) {
+        // 버전 확인 이후 refresh가 끝났을 수 있으므로 응답 헤더의 버전을 우선 사용
+        const served = Number(res.headers['x-data-version']) || version;
+        if (served) putCached(key, `${versions.epoch}:${served}`, data);
+    }
+    return data;
+};
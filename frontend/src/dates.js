@@ -0,0 +1,51 @@
+// 날짜 처리 (차트 기간 필터링용)
+// - 응답을 받을 때 행마다 epochDay(1970-01-01부터 일수)를 한 번만 계산해 둠
+//   -> 기간 변경 시 행마다 new Date()를 만들지 않고 숫자 비교 + 이진 탐색으로 잘라냄
+
+const MS_PER_DAY = 86400000;
+
+// 'YYYY-MM-DD' / 'YYYY-MM' -> epoch day (UTC 기준, 형식이 다르면 NaN)
+export const toEpochDay = (str) => {
+    const year = Number(str.slice(0, 4));
+    const month = Number(str.slice(5, 7));
+    const day = str.length >= 10 ? Number(str.slice(8, 10)) : 1;
+    return Date.UTC(year, month - 1, day) / MS_PER_DAY;
+};
+
+// 행 목록(date 필드)에 epochDay 추가 (응답 JSON을 그대로 수정)
+const annotate = (rows) => {
+    for (const row of rows) {
+        if (row && typeof row.date === 'string') row.epochDay = toEpochDay(row.date);
+    }
+    return rows;
+};
+
+// 응답(행 목록 또는 { data: 행 목록 }) -> epochDay가 추가된 같은 응답
+export const withEpochDays = (payload) => {
+    if (Array.isArray(payload)) return annotate(payload);
+    if (payload && Array.isArray(payload.data)) annotate(payload.data);
+    return payload;
+};
+
+// 기간 버튼('1Y', '5Y', '10Y') -> 시작 epoch day (전체 기간이면 null)
+export const rangeStartDay = (range) => {
+    const years = { '1Y': 1, '5Y': 5, '10Y': 10 }[range];
+    if (!years) return null;
+    const now = new Date();
+    return Date.UTC(now.getFullYear() - years, now.getMonth(), now.getDate()) / MS_PER_DAY;
+};
+
+// 날짜 오름차순 행 목록 -> 기간 안의 행 (epochDay가 없는 행은 date 문자열로 계산)
+export const filterByRange = (rows, range) => {
+    const start = rangeStartDay(range);
+    if (!rows || rows.length === 0 || start === null) return rows || [];
+    const dayOf = (row) => row.epochDay ?? toEpochDay(row.date);
+    let lo = 0;
+    let hi = rows.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (dayOf(rows[mid]) < start) lo = mid + 1;
+        else hi = mid;
+    }
+    return lo === 0 ? rows : rows.slice(lo);
+};